@@ -0,0 +1,472 @@
+"""End-to-end WebSocket load test for concierge.
+
+Starts concierge under uvicorn in a child process, with the fake LLM
+provider and the fake spacecadet MCP server, then drives many concurrent
+``/ws`` clients that type bursts of messages with human-like cadence::
+
+    python -m benchmarks.load --clients 1000 --duration 60 --out load.json
+    python -m benchmarks.load --clients 200 --baseline load.json
+
+Reports p50/p95/p99 for message → DELIVERED, end of burst → first
+response, and end of burst → full acknowledgement (back to idle), plus
+event-loop lag and memory of the server process. Results are written as
+JSON with a stable layout so runs can be diffed across commits.
+
+``--url`` points the clients at a server that is already running instead;
+server-side stats are then only reported if it was started by this script.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKE_SPACECADET = ROOT / "concierge" / "fake_spacecadet.py"
+
+# Messages per burst, weighted towards single messages
+BURST_SIZES = (1, 2, 3, 4)
+BURST_WEIGHTS = (50, 30, 15, 5)
+
+
+# -- statistics ---------------------------------------------------------------
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(ordered) - 1, round(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(values: list[float]) -> dict[str, Any]:
+    """Latency summary in milliseconds."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def ms(seconds: float) -> float:
+        return round(seconds * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "mean": ms(sum(ordered) / len(ordered)),
+        "p50": ms(percentile(ordered, 0.50)),
+        "p95": ms(percentile(ordered, 0.95)),
+        "p99": ms(percentile(ordered, 0.99)),
+        "max": ms(ordered[-1]),
+    }
+
+
+class LagProbe:
+    """Measures event-loop lag as the overshoot of a periodic short sleep."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+
+def memory_mb() -> dict[str, float | None]:
+    """Current and peak RSS of this process, in MiB."""
+    rss = peak = None
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) / 1024
+            elif line.startswith("VmHWM:"):
+                peak = int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "rss": round(rss, 1) if rss is not None else None,
+        "peak": round(peak, 1) if peak is not None else None,
+    }
+
+
+# -- server -------------------------------------------------------------------
+
+def serve(port: int) -> None:
+    """Child process: concierge under uvicorn, plus a stats endpoint."""
+    import logging
+
+    import uvicorn
+
+    from concierge.main import app
+
+    # Per-connection INFO lines would swamp the output with thousands of clients
+    logging.getLogger("concierge").setLevel(logging.WARNING)
+    probe = LagProbe()
+
+    @app.get("/bench/stats")
+    async def bench_stats(reset: bool = False):
+        stats = {"loop_lag_ms": summarize(probe.samples), "memory_mb": memory_mb()}
+        if reset:
+            probe.reset()
+        return stats
+
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", backlog=4096,
+    )
+    server = uvicorn.Server(config)
+
+    async def main() -> None:
+        probe.start()
+        await server.serve()
+
+    asyncio.run(main())
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace, port: int, inbox_dir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "CONCIERGE_LLM_PROVIDER": "fake",
+        "CONCIERGE_FAKE_LLM_LATENCY": args.llm_latency,
+        "CONCIERGE_FAKE_LLM_SEED": str(args.seed),
+        "CONCIERGE_SPACECADET_PATH": str(FAKE_SPACECADET),
+        "CONCIERGE_SPACECADET_ARGS": (
+            f"--tasks {args.tasks} --seed {args.seed} --latency {args.spacecadet_latency}"
+        ),
+        "CONCIERGE_MAX_CONNECTIONS": str(args.clients + 16),
+        "CONCIERGE_MAX_INFLIGHT_BURSTS": str(args.max_bursts),
+        "CONCIERGE_QUIET_WINDOW": str(args.quiet_window),
+        "CONCIERGE_INBOX_DIR": inbox_dir,
+        "CONCIERGE_ORG_DIR": "",
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load", "serve", "--port", str(port)],
+        cwd=ROOT, env=env,
+    )
+
+
+async def http_get(host: str, port: int, path: str) -> Any:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    if b" 200 " not in head.split(b"\r\n", 1)[0]:
+        return None
+    return json.loads(body)
+
+
+async def wait_ready(host: str, port: int, proc: subprocess.Popen | None, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode}")
+        try:
+            if await http_get(host, port, "/api/spacecadet") is not None:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+# -- clients ------------------------------------------------------------------
+
+class Results:
+    def __init__(self):
+        self.delivered: list[float] = []
+        self.first_response: list[float] = []
+        self.ack: list[float] = []
+        self.messages = 0
+        self.bursts = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.connect_errors = 0
+        self.disconnects = 0
+
+
+class Typist:
+    """Generates what one simulated user types, and how fast."""
+
+    def __init__(self, rng: random.Random, headings: list[str], args: argparse.Namespace):
+        self._rng = rng
+        self._headings = headings
+        self._args = args
+
+    def message(self) -> str:
+        from concierge.fake_spacecadet import WORDS
+
+        rng = self._rng
+        roll = rng.random()
+        if roll < 0.15:
+            return rng.choice(("what's on my list", "show my tasks", "any deadlines this week?"))
+        if roll < 0.30 and self._headings:
+            return f"done: {rng.choice(self._headings).lower()}"
+        if roll < 0.35 and self._headings:
+            return f"urgent: {rng.choice(self._headings).lower()}"
+        if roll < 0.40:
+            return rng.choice(("thanks", "hello"))
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+        return words + rng.choice(("", " tomorrow", " by friday", " next week"))
+
+    def typing_time(self, text: str) -> float:
+        # Characters per second varies per message; stay inside the quiet
+        # window so messages typed together land in one burst
+        cps = self._rng.lognormvariate(1.8, 0.3)
+        return min(len(text) / cps, self._args.quiet_window * 0.8)
+
+    def think_time(self) -> float:
+        return self._rng.expovariate(1.0 / self._args.think)
+
+    def burst_size(self) -> int:
+        return self._rng.choices(BURST_SIZES, BURST_WEIGHTS)[0]
+
+
+async def run_client(
+    index: int, url: str, args: argparse.Namespace, headings: list[str],
+    results: Results, stop_at: float,
+) -> None:
+    from websockets.asyncio.client import connect
+
+    rng = random.Random(args.seed * 100_003 + index)
+    typist = Typist(rng, headings, args)
+    await asyncio.sleep(args.ramp * index / max(1, args.clients))
+
+    sent_at: dict[str, float] = {}
+    burst: dict[str, Any] = {}
+    acked = asyncio.Event()
+
+    def handle(frame: dict[str, Any]) -> None:
+        now = time.perf_counter()
+        kind, data = frame.get("type"), frame.get("data", {})
+        if kind == "batch":
+            for inner in data.get("frames", []):
+                handle(inner)
+        elif kind == "status_update" and data.get("status") == "delivered":
+            start = sent_at.pop(data.get("message_id"), None)
+            if start is not None:
+                results.delivered.append(now - start)
+        elif kind in ("response", "task_list", "error"):
+            if kind == "error":
+                results.errors += 1
+            if "last_sent" in burst and "first" not in burst:
+                burst["first"] = now
+                results.first_response.append(now - burst["last_sent"])
+        elif kind == "system_status" and data.get("status") == "idle":
+            if "first" in burst and not acked.is_set():
+                results.ack.append(now - burst["last_sent"])
+                acked.set()
+
+    try:
+        ws = await connect(url, open_timeout=60, max_size=None)
+    except Exception:
+        results.connect_errors += 1
+        return
+
+    async def reader() -> None:
+        async for raw in ws:
+            handle(json.loads(raw))
+
+    reading = asyncio.create_task(reader())
+    try:
+        counter = 0
+        while time.monotonic() < stop_at and not reading.done():
+            await asyncio.sleep(typist.think_time())
+            if time.monotonic() >= stop_at:
+                break
+            burst.clear()
+            acked.clear()
+            size = typist.burst_size()
+            for n in range(size):
+                text = typist.message()
+                counter += 1
+                message_id = f"c{index}m{counter}"
+                sent_at[message_id] = time.perf_counter()
+                await ws.send(json.dumps({"type": "message", "text": text, "id": message_id}))
+                results.messages += 1
+                if n < size - 1:
+                    await asyncio.sleep(typist.typing_time(text))
+            burst["last_sent"] = time.perf_counter()
+            results.bursts += 1
+            try:
+                await asyncio.wait_for(acked.wait(), timeout=args.timeout)
+            except asyncio.TimeoutError:
+                results.timeouts += 1
+    except Exception:
+        results.disconnects += 1
+    finally:
+        reading.cancel()
+        await ws.close()
+
+
+# -- driver -------------------------------------------------------------------
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+        )
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    lines = []
+    for metric, stats in current["latency_ms"].items():
+        base = baseline.get("latency_ms", {}).get(metric, {})
+        for q in ("p50", "p95", "p99"):
+            if q in stats and base.get(q):
+                change = (stats[q] - base[q]) / base[q] * 100
+                lines.append(f"{metric:>15} {q}: {base[q]:9.1f} → {stats[q]:9.1f} ms ({change:+.1f}%)")
+    return lines
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    from concierge.fake_spacecadet import generate_tasks
+
+    proc = None
+    tmp = tempfile.TemporaryDirectory(prefix="concierge-load-")
+    if args.url:
+        url = args.url
+        host, _, port_str = url.split("://", 1)[1].split("/", 1)[0].partition(":")
+        port = int(port_str or 80)
+    else:
+        host, port = "127.0.0.1", free_port()
+        url = f"ws://{host}:{port}/ws?batch=1"
+        proc = start_server(args, port, tmp.name)
+
+    try:
+        await wait_ready(host, port, proc, timeout=60)
+        # Same seed as the server's fake spacecadet, so "done: ..." finds tasks
+        headings = [t["heading"] for t in generate_tasks(args.tasks, args.seed)]
+        server_before = await http_get(host, port, "/bench/stats?reset=true")
+
+        probe = LagProbe()
+        probe.start()
+        results = Results()
+        started = time.monotonic()
+        stop_at = started + args.ramp + args.duration
+        await asyncio.gather(*(
+            run_client(i, url, args, headings, results, stop_at) for i in range(args.clients)
+        ))
+        elapsed = time.monotonic() - started
+        probe.stop()
+        server_after = await http_get(host, port, "/bench/stats")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        tmp.cleanup()
+
+    return {
+        "version": 1,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {k: v for k, v in sorted(vars(args).items()) if k not in ("out", "baseline")},
+        "elapsed_s": round(elapsed, 2),
+        "counts": {
+            "messages": results.messages,
+            "bursts": results.bursts,
+            "timeouts": results.timeouts,
+            "errors": results.errors,
+            "connect_errors": results.connect_errors,
+            "disconnects": results.disconnects,
+        },
+        "latency_ms": {
+            "delivered": summarize(results.delivered),
+            "first_response": summarize(results.first_response),
+            "ack": summarize(results.ack),
+        },
+        "server": {
+            "loop_lag_ms": server_after["loop_lag_ms"] if server_after else None,
+            "memory_mb": server_after["memory_mb"] if server_after else None,
+            "memory_mb_idle": server_before["memory_mb"] if server_before else None,
+        },
+        "client": {"loop_lag_ms": summarize(probe.samples), "memory_mb": memory_mb()},
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        parser = argparse.ArgumentParser(prog="benchmarks.load serve")
+        parser.add_argument("--port", type=int, required=True)
+        serve(parser.parse_args(argv[1:]).port)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100, help="concurrent WebSocket clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load after ramp-up")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which clients connect")
+    parser.add_argument("--think", type=float, default=5.0, help="mean seconds between bursts")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for an ack")
+    parser.add_argument("--quiet-window", type=float, default=0.6)
+    parser.add_argument("--max-bursts", type=int, default=8, help="server CONCIERGE_MAX_INFLIGHT_BURSTS")
+    parser.add_argument("--llm-latency", default="lognormal:-1.2,0.4",
+                        help="fake LLM latency per call (median ~0.3s by default)")
+    parser.add_argument("--spacecadet-latency", default="lognormal:-4.5,0.5",
+                        help="fake spacecadet latency per tool call")
+    parser.add_argument("--tasks", type=int, default=500, help="tasks in the fake spacecadet")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="existing server, e.g. ws://127.0.0.1:8000/ws?batch=1")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    counts, latency = report["counts"], report["latency_ms"]
+    print(
+        f"{counts['messages']} messages in {counts['bursts']} bursts, "
+        f"{counts['timeouts']} timeouts, {counts['errors']} errors",
+        file=sys.stderr,
+    )
+    for metric, stats in latency.items():
+        if stats["count"]:
+            print(f"{metric:>15}: p50 {stats['p50']} ms  p95 {stats['p95']} ms  "
+                  f"p99 {stats['p99']} ms", file=sys.stderr)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        for line in compare(report, baseline):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Timing harness for the micro-benchmarks.
+
+Run with ``pytest benchmarks/micro`` (they are not part of the default
+test run). Each benchmark's best per-call time is compared with
+``baselines.json``, scaled by a calibration loop so baselines recorded on
+a faster or slower machine still mean something. A benchmark fails when it
+is more than ``threshold`` times slower than its baseline.
+
+Options:
+
+- ``--bench-save``: record this run's timings as the new baselines.
+- ``--bench-threshold=X``: allowed slowdown ratio (default 2.0, or
+  ``CONCIERGE_BENCH_THRESHOLD``); a ``threshold`` on an individual
+  baseline entry overrides it.
+- ``--bench-scale=full``: also run sizes marked ``full`` (e.g. 1M inbox
+  messages), which take minutes and a lot of disk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+# Smallest total time per round; short calls are repeated to reach it
+MIN_ROUND_SECONDS = 0.05
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("micro-benchmarks")
+    group.addoption("--bench-save", action="store_true", help="store timings as new baselines")
+    group.addoption(
+        "--bench-threshold", type=float,
+        default=float(os.environ.get("CONCIERGE_BENCH_THRESHOLD", "2.0")),
+        help="fail when slower than baseline by more than this ratio",
+    )
+    group.addoption("--bench-scale", choices=("quick", "full"), default="quick")
+
+
+def _calibrate() -> float:
+    """Best time of a fixed pure-Python workload, as a machine speed yardstick."""
+    def work():
+        total = 0
+        for i in range(200_000):
+            total += i % 7
+        return total
+
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class BenchSession:
+    def __init__(self, config):
+        self.save = config.getoption("--bench-save")
+        self.threshold = config.getoption("--bench-threshold")
+        self.scale = config.getoption("--bench-scale")
+        self.stored: dict[str, Any] = {}
+        if BASELINES.exists():
+            self.stored = json.loads(BASELINES.read_text(encoding="utf-8"))
+        self.calibration = _calibrate()
+        self.results: dict[str, dict[str, float]] = {}
+
+    def speed_factor(self) -> float:
+        """How much slower this machine is than the one that made the baselines."""
+        base = self.stored.get("calibration")
+        return self.calibration / base if base else 1.0
+
+    def check(self, name: str, seconds: float) -> str | None:
+        entry = self.stored.get("benchmarks", {}).get(name)
+        expected = entry["seconds"] * self.speed_factor() if entry else None
+        self.results[name] = {"seconds": seconds, "expected": expected}
+        if expected is None or self.save:
+            return None
+        threshold = entry.get("threshold", self.threshold)
+        ratio = seconds / expected
+        if ratio > threshold:
+            return (
+                f"{name}: {seconds * 1e3:.3f} ms per call is {ratio:.2f}x the baseline "
+                f"{expected * 1e3:.3f} ms (threshold {threshold}x)"
+            )
+        return None
+
+    def write(self) -> None:
+        benchmarks = dict(self.stored.get("benchmarks", {}))
+        for name, result in self.results.items():
+            entry = dict(benchmarks.get(name, {}))
+            entry["seconds"] = float(f"{result['seconds']:.6g}")
+            benchmarks[name] = entry
+        data = {"calibration": round(self.calibration, 6), "benchmarks": dict(sorted(benchmarks.items()))}
+        BASELINES.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def pytest_configure(config):
+    config._bench = None
+    config.addinivalue_line("markers", "full: only runs with --bench-scale=full")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--bench-scale") == "full":
+        return
+    skip = pytest.mark.skip(reason="needs --bench-scale=full")
+    for item in items:
+        if "full" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def bench_session(request) -> BenchSession:
+    if request.config._bench is None:
+        request.config._bench = BenchSession(request.config)
+    return request.config._bench
+
+
+@pytest.fixture
+def bench(request, bench_session) -> Callable[..., float]:
+    """Time ``fn()`` and check it against its baseline.
+
+    Returns the best per-call time in seconds over ``rounds`` rounds.
+    ``number`` fixes the calls per round; by default it is picked so a
+    round lasts at least ``MIN_ROUND_SECONDS``.
+    """
+    name = f"{request.node.module.__name__.rsplit('.', 1)[-1]}::{request.node.name}"
+
+    def run(fn: Callable[[], Any], number: int | None = None, rounds: int = 5) -> float:
+        if number is None:
+            number = 1
+            while True:
+                start = time.perf_counter()
+                for _ in range(number):
+                    fn()
+                if time.perf_counter() - start >= MIN_ROUND_SECONDS:
+                    break
+                number *= 2
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - start) / number)
+        failure = bench_session.check(name, best)
+        if failure:
+            pytest.fail(failure)
+        return best
+
+    return run
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    session: BenchSession | None = config._bench
+    if session is None or not session.results:
+        return
+    terminalreporter.section("micro-benchmarks")
+    terminalreporter.write_line(f"calibration {session.calibration * 1e3:.2f} ms "
+                                f"(speed factor {session.speed_factor():.2f})")
+    for name, result in session.results.items():
+        expected = result["expected"]
+        versus = f"  {result['seconds'] / expected:5.2f}x baseline" if expected else "  (no baseline)"
+        terminalreporter.write_line(f"{result['seconds'] * 1e3:12.4f} ms  {name}{versus}")
+    if session.save:
+        session.write()
+        terminalreporter.write_line(f"baselines written to {BASELINES}")
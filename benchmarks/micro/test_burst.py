@@ -0,0 +1,21 @@
+import pytest
+
+from concierge.burst import BurstDetector
+from concierge.models import Message
+
+
+@pytest.mark.parametrize("count", [1, 100, 1000])
+def test_push_and_fire(bench, loop, count):
+    # Every push cancels and re-arms the quiet-window timer
+    messages = [Message(text=f"message {i}") for i in range(count)]
+
+    async def on_burst(burst):
+        pass
+
+    async def run():
+        detector = BurstDetector(on_burst=on_burst, quiet_window=60, max_wait=120)
+        for m in messages:
+            detector.push(m)
+        await detector._fire()
+
+    bench(lambda: loop.run_until_complete(run()))
@@ -0,0 +1,25 @@
+import pytest
+
+from concierge.acknowledger import _format_task_list
+from concierge.fake_spacecadet import generate_tasks
+from concierge.models import MessageStatus, ws_response, ws_status_update, ws_task_list
+from concierge.task_record import parse_tasks
+
+
+@pytest.mark.parametrize("count", [10, 1_000])
+def test_format_task_list(bench, count):
+    result = generate_tasks(count)
+    bench(lambda: _format_task_list(result))
+
+
+def test_task_list_frame(bench):
+    tasks = parse_tasks(generate_tasks(50))
+    bench(lambda: ws_task_list(tasks, header="50 task(s)").to_json())
+
+
+def test_status_update_frame(bench):
+    bench(lambda: ws_status_update("m1", MessageStatus.DELIVERED).to_json())
+
+
+def test_response_frame(bench):
+    bench(lambda: ws_response("Added: Call dentist [#B] due 2025-01-15").to_json())
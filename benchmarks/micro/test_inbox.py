@@ -0,0 +1,35 @@
+import itertools
+
+import pytest
+
+from concierge.inbox import Inbox
+from concierge.models import Message
+
+SIZES = [10_000, pytest.param(100_000, marks=pytest.mark.full),
+         pytest.param(1_000_000, marks=pytest.mark.full)]
+
+
+def make_messages(count):
+    return [Message(id=f"m{i:07d}", text=f"buy milk number {i}") for i in range(count)]
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_append(bench, tmp_path, count):
+    messages = make_messages(count)
+    rounds = itertools.count()
+
+    def run():
+        inbox = Inbox(str(tmp_path / str(next(rounds))))
+        for m in messages:
+            inbox.append(m)
+
+    bench(run, number=1, rounds=3)
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_read_all(bench, tmp_path, count):
+    inbox = Inbox(str(tmp_path))
+    for m in make_messages(count):
+        inbox.append(m)
+
+    bench(inbox.read_all, number=1, rounds=3)
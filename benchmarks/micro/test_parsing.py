@@ -0,0 +1,34 @@
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from concierge.llm.ollama_provider import OllamaProvider
+from concierge.llm.openai_provider import OpenAIProvider
+from concierge.models import Burst, Message
+
+INTENTS = [
+    {"intent": "new_task", "heading": f"Call dentist {i}", "priority": "B",
+     "deadline": "2025-01-15", "tags": ["health", "errand"], "raw_text": f"call dentist {i}"}
+    for i in range(5)
+]
+FENCED = "```json\n" + json.dumps(INTENTS, indent=2) + "\n```"
+
+
+@pytest.mark.parametrize("provider_class", [OpenAIProvider, OllamaProvider])
+def test_classification_parsing(bench, loop, provider_class):
+    provider = provider_class()
+
+    async def chat(system, user, max_tokens=1024):
+        return FENCED
+
+    provider._chat = chat
+    now = datetime.now(UTC)
+    burst = Burst(messages=[Message(text="call the dentist")], started_at=now, ended_at=now)
+
+    def run():
+        intents = loop.run_until_complete(provider.classify_intent(burst))
+        assert len(intents) == 5
+
+    bench(run)
+    loop.run_until_complete(provider._client.aclose())
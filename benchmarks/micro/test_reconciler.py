@@ -0,0 +1,22 @@
+import pytest
+
+from concierge.fake_spacecadet import generate_tasks
+from concierge.models import IntentClassification, IntentType
+from concierge.reconciler import Reconciler
+
+
+class FakeClient:
+    def __init__(self, tasks):
+        self._tasks = tasks
+
+    async def list_tasks(self):
+        return self._tasks
+
+
+@pytest.mark.parametrize("count", [1_000, 10_000, 100_000])
+def test_resolve_task(bench, loop, count):
+    tasks = generate_tasks(count)
+    reconciler = Reconciler(FakeClient(tasks))
+    intent = IntentClassification(intent=IntentType.MODIFY_TASK, heading=tasks[-1]["heading"])
+
+    bench(lambda: loop.run_until_complete(reconciler._resolve_task(intent)))
@@ -0,0 +1,148 @@
+"""Cold-start timing for concierge.
+
+Each run is a fresh interpreter, so nothing is already imported::
+
+    python -m benchmarks.startup --runs 5 --out startup.json
+    python -m benchmarks.startup --provider anthropic
+
+Reports:
+
+- import time of ``concierge.main``, split by top-level package (fastapi,
+  pydantic, anthropic, ...) and by concierge module, from ``python -X
+  importtime``. Times are self time, so the packages add up to the total.
+- lifespan time until requests are served and until /readyz would pass,
+  per component (provider, spacecadet, task_cache, llm, ...) from
+  ``app.state.startup_timings``, and the packages first imported during
+  the lifespan (e.g. ``mcp`` when spacecadet connects). Warm-up steps run
+  concurrently, so the components add up to more than the total.
+
+Each figure is the median over ``--runs``. The fake spacecadet is used
+unless ``--spacecadet none`` is passed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKE_SPACECADET = ROOT / "concierge" / "fake_spacecadet.py"
+
+# Separates -X importtime lines of the module import from those of the
+# deferred imports that happen during the lifespan
+MARKER = "-- lifespan --"
+
+# Run in the child: time the import, then the lifespan, and print JSON
+CHILD = f"MARKER = {MARKER!r}\n" + """\
+import asyncio, json, sys, time
+start = time.perf_counter()
+import concierge.main as m
+imported = time.perf_counter() - start
+print(MARKER, file=sys.stderr, flush=True)
+
+async def run():
+    start = time.perf_counter()
+    async with m.lifespan(m.app):
+        serving = time.perf_counter() - start
+        await m.app.state.readiness.wait()
+        ready = time.perf_counter() - start
+    return serving, ready, dict(m.app.state.startup_timings)
+
+lifespan, ready, components = asyncio.run(run())
+print(json.dumps({"import": imported, "lifespan": lifespan, "ready": ready, "components": components}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, float]:
+    """Self time in seconds per module from ``-X importtime`` output."""
+    modules: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        modules[fields[2].strip()] = int(fields[0]) / 1e6
+    return modules
+
+
+def by_package(modules: dict[str, float]) -> dict[str, float]:
+    """Self times summed per top-level package; concierge modules stay separate."""
+    totals: dict[str, float] = defaultdict(float)
+    for name, seconds in modules.items():
+        key = name if name.startswith("concierge") else name.split(".", 1)[0]
+        totals[key] += seconds
+    return totals
+
+
+def run_once(env: dict[str, str]) -> dict[str, Any]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup run failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    before, _, after = proc.stderr.partition(MARKER)
+    result["packages"] = by_package(parse_importtime(before))
+    result["lifespan_packages"] = by_package(parse_importtime(after))
+    return result
+
+
+def _median_ms(values: list[float]) -> float:
+    return round(statistics.median(values) * 1000, 2)
+
+
+def summarize(runs: list[dict[str, Any]], top: int = 15) -> dict[str, Any]:
+    def medians(key: str) -> dict[str, float]:
+        names = {name for run in runs for name in run[key]}
+        values = {name: _median_ms([run[key].get(name, 0.0) for run in runs]) for name in names}
+        return dict(sorted(values.items(), key=lambda kv: -kv[1]))
+
+    packages = medians("packages")
+    return {
+        "runs": len(runs),
+        "import_ms": _median_ms([r["import"] for r in runs]),
+        "lifespan_ms": _median_ms([r["lifespan"] for r in runs]),
+        "ready_ms": _median_ms([r["ready"] for r in runs]),
+        "lifespan_components_ms": medians("components"),
+        "lifespan_imports_ms": dict(list(medians("lifespan_packages").items())[:top]),
+        "import_packages_ms": dict(list(packages.items())[:top]),
+        "import_other_ms": round(sum(list(packages.values())[top:]), 2),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--provider", default="fake", help="CONCIERGE_LLM_PROVIDER for the runs")
+    parser.add_argument("--spacecadet", choices=("fake", "none"), default="fake")
+    parser.add_argument("--top", type=int, default=15, help="packages listed individually")
+    parser.add_argument("--out", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env.update({
+        "CONCIERGE_LLM_PROVIDER": args.provider,
+        "CONCIERGE_SPACECADET_PATH": str(FAKE_SPACECADET) if args.spacecadet == "fake" else "",
+        "CONCIERGE_SPACECADET_ARGS": "",
+        "CONCIERGE_ORG_DIR": "",
+        "CONCIERGE_LOOP_MONITOR_INTERVAL": "0",
+    })
+    runs = [run_once(env) for _ in range(args.runs)]
+    report = {"provider": args.provider, "spacecadet": args.spacecadet, **summarize(runs, args.top)}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,18 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+from . import tracing
 from .llm.base import LLMProvider
 from .models import IntentClassification, IntentType
+from .task_record import parse_tasks
 
 logger = logging.getLogger("concierge")
 
 PRIORITY_LABELS = {"A": "!!!", "B": "!!", "C": "!", "D": ""}
 
+# Longest task list spelled out in a text reply
+MAX_LISTED_TASKS = 25
+
 
 def _task_summary(intent: IntentClassification) -> str:
     parts = []
@@ -27,27 +32,24 @@ def _task_summary(intent: IntentClassification) -> str:
 
 
 def _format_task_list(result) -> str:
-    tasks = result if isinstance(result, list) else result.get("tasks", [])
+    tasks = parse_tasks(result)
     if not tasks:
         return "No tasks found."
 
     lines = [f"You have {len(tasks)} task(s):"]
-    for t in tasks:
-        state = t.get("state", "TODO")
-        heading = t.get("heading", "???")
-        pri = t.get("priority", "")
-        pri_mark = PRIORITY_LABELS.get(pri, "")
-
-        parts = [f"  {state} {pri_mark} {heading}".rstrip()]
-        deadline = t.get("deadline")
-        scheduled = t.get("scheduled")
-        if deadline:
-            parts.append(f"due {deadline}")
-        if scheduled:
-            parts.append(f"@ {scheduled}")
+    for t in tasks[:MAX_LISTED_TASKS]:
+        pri_mark = PRIORITY_LABELS.get(t.priority, "")
+
+        parts = [f"  {t.state} {pri_mark} {t.heading or '???'}".rstrip()]
+        if t.deadline:
+            parts.append(f"due {t.deadline}")
+        if t.scheduled:
+            parts.append(f"@ {t.scheduled}")
 
         lines.append(" — ".join(parts))
 
+    if len(tasks) > MAX_LISTED_TASKS:
+        lines.append(f"  … and {len(tasks) - MAX_LISTED_TASKS} more")
     return "\n".join(lines)
 
 
@@ -101,10 +103,11 @@ class Acknowledger:
 
         # Multi-intent or complex: use LLM
         try:
-            ack = await self._provider.generate_acknowledgement(
-                [i for i, _ in non_chat],
-                [r for _, r in non_chat],
-            )
+            with tracing.span("acknowledge"):
+                ack = await self._provider.generate_acknowledgement(
+                    [i for i, _ in non_chat],
+                    [r for _, r in non_chat],
+                )
         except Exception as e:
             logger.error("Acknowledgement generation failed: %s", e)
             count = len(non_chat) - len(errors)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from datetime import UTC, datetime
 from typing import Callable, Coroutine, Any
 
+from . import tracing
 from .config import settings
 from .models import Message, Burst
 
@@ -20,6 +22,7 @@ class BurstDetector:
         self._max_wait = max_wait or settings.max_wait
         self._buffer: list[Message] = []
         self._started_at: datetime | None = None
+        self._first_push = 0.0
         self._quiet_timer: asyncio.TimerHandle | None = None
         self._max_timer: asyncio.TimerHandle | None = None
         self._loop: asyncio.AbstractEventLoop | None = None
@@ -30,6 +33,7 @@ class BurstDetector:
 
         if not self._buffer:
             self._started_at = datetime.now(UTC)
+            self._first_push = time.monotonic()
             self._max_timer = self._loop.call_later(
                 self._max_wait, self._fire_sync
             )
@@ -66,4 +70,7 @@ class BurstDetector:
         self._buffer.clear()
         self._started_at = None
 
-        await self._on_burst(burst)
+        # The trace starts with the first message, so it covers the quiet window
+        with tracing.trace("burst", start=self._first_push, messages=len(burst.messages)) as t:
+            t.record("quiet_window", self._first_push)
+            await self._on_burst(burst)
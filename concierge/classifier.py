@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 
+from . import tracing
 from .llm.base import LLMProvider
 from .models import Burst, IntentClassification
 
@@ -14,7 +15,9 @@ class Classifier:
 
     async def classify(self, burst: Burst) -> list[IntentClassification]:
         try:
-            intents = await self._provider.classify_intent(burst)
+            with tracing.span("classify") as span:
+                intents = await self._provider.classify_intent(burst)
+                span.set(intents=len(intents))
         except Exception as e:
             logger.error("Classification failed: %s", e)
             return []
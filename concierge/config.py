@@ -5,6 +5,8 @@ class Settings(BaseSettings):
     model_config = {"env_prefix": "CONCIERGE_", "env_file": ".env"}
 
     llm_provider: str = "anthropic"
+    # Open the provider's connection (Ollama: load the model) during startup
+    llm_warmup: bool = True
 
     anthropic_api_key: str = ""
     anthropic_model: str = "claude-haiku-4-20250414"
@@ -16,7 +18,74 @@ class Settings(BaseSettings):
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "llama3.2"
 
+    # llm_provider="fake": scripted intents after a sampled delay, no API calls
+    fake_llm_latency: str = "fixed:0"
+    fake_llm_script: str = ""
+    fake_llm_seed: int = 0
+
+    # Cassettes: llm_record saves every LLM call to llm_cassette;
+    # llm_provider="replay" serves them back offline
+    llm_cassette: str = ""
+    llm_record: bool = False
+    llm_replay_latency: str = "original"  # original | none | scale factor, e.g. 0.5
+
+    # Adaptive limit on concurrent LLM calls (llm_concurrency_max=0 turns it
+    # off); shrinks on 429s and on calls slower than tolerance x the usual
+    llm_concurrency_initial: int = 8
+    llm_concurrency_min: int = 1
+    llm_concurrency_max: int = 16
+    llm_latency_tolerance: float = 2.0
+
     spacecadet_path: str = ""
+    spacecadet_args: str = ""
+    spacecadet_pool_size: int = 1
+    spacecadet_health_interval: float = 30.0
+    spacecadet_call_timeout: float = 30.0
+    spacecadet_standby: bool = False
+    spacecadet_backoff_max: float = 30.0
+    spacecadet_write_retries: int = 2
+
+    task_cache_ttl: float = 30.0
+    task_changelog_size: int = 5000
+    org_dir: str = ""
+    org_watch_interval: float = 1.0
+    # "mcp" reads tasks through spacecadet; "org" parses org_dir directly
+    task_read_backend: str = "mcp"
+    org_todo_keywords: str = "TODO,NEXT,WAITING,DONE,CANCELLED"
+
+    event_buffer_size: int = 256
+    ws_outbox_size: int = 512
+    ws_overflow_policy: str = "merge"  # drop | merge | disconnect
+    ws_task_list_page: int = 50
+    ws_task_list_max: int = 1000
+
+    # Multi-worker mode (uvicorn --workers N): shared directory for the owner
+    # lock, its RPC socket and the task snapshot. Empty runs single-process.
+    worker_dir: str = ""
+    worker_rpc_timeout: float = 30.0
+    worker_snapshot_poll: float = 0.2
+
+    max_connections: int = 200
+    max_inflight_bursts: int = 8
+
+    # Fraction of bursts traced per stage; 0 turns tracing off
+    trace_sample_rate: float = 1.0
+    trace_file: str = ""
+
+    # Event-loop lag sampling (0 disables) and the stall that gets its stack logged
+    loop_monitor_interval: float = 0.1
+    loop_lag_threshold: float = 0.25
+    # Bearer token for /debug endpoints; they are disabled while empty
+    debug_token: str = ""
+
+    # Acknowledge task changes once they are in the local intent journal, and
+    # apply them to spacecadet in the background (retrying through outages)
+    optimistic_ack: bool = False
+    journal_path: str = "./intents.sqlite"
+    journal_max_attempts: int = 5
+    journal_poll: float = 1.0
+    # Applied and failed entries are deleted this many seconds after settling
+    journal_retention: float = 7 * 24 * 3600
 
     quiet_window: float = 0.6
     max_wait: float = 8.0
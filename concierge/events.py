@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any
+
+from .config import settings
+
+logger = logging.getLogger("concierge")
+
+
+class Event:
+    """A published event, serialized once and shared by every subscriber."""
+
+    __slots__ = ("type", "frame", "_sse")
+
+    def __init__(self, type: str, data: dict[str, Any]):
+        self.type = type
+        # Same {"type", "data"} envelope as WSOutgoing so /ws can forward it as-is
+        self.frame = json.dumps({"type": type, "data": data}, separators=(",", ":"))
+        self._sse: bytes | None = None
+
+    @property
+    def sse(self) -> bytes:
+        if self._sse is None:
+            self._sse = f"event: {self.type}\ndata: {self.frame}\n\n".encode()
+        return self._sse
+
+
+RESYNC = Event("resync", {})
+
+
+class Subscription:
+    """Bounded per-client buffer of events.
+
+    When a slow client falls ``maxsize`` events behind, its backlog is
+    replaced by a single ``resync`` event: the client re-fetches state
+    instead of the hub holding unbounded history or stalling the others.
+    """
+
+    def __init__(self, hub: EventHub, maxsize: int):
+        self._hub = hub
+        self._maxsize = maxsize
+        self._queue: deque[Event] = deque()
+        self._ready = asyncio.Event()
+        self.overflows = 0
+
+    def _push(self, event: Event) -> None:
+        if len(self._queue) >= self._maxsize:
+            self._queue.clear()
+            self._queue.append(RESYNC)
+            self.overflows += 1
+        else:
+            self._queue.append(event)
+        self._ready.set()
+
+    async def get(self) -> Event:
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventHub:
+    """In-process pub/sub for task-change events."""
+
+    def __init__(self, buffer_size: int | None = None):
+        self._buffer_size = buffer_size or settings.event_buffer_size
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        sub = Subscription(self, self._buffer_size)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def publish(self, type: str, data: dict[str, Any]) -> Event | None:
+        if not self._subscribers:
+            return None
+        event = Event(type, data)
+        for sub in self._subscribers:
+            sub._push(event)
+        return event
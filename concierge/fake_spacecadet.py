@@ -0,0 +1,286 @@
+"""Stand-in for spacecadet, for tests and load benchmarks without Emacs.
+
+Run as an MCP stdio server by pointing concierge at this file::
+
+    CONCIERGE_SPACECADET_PATH=concierge/fake_spacecadet.py
+    CONCIERGE_SPACECADET_ARGS="--tasks 100000 --latency lognormal:-3,0.6 --error-rate 0.01"
+
+or use ``FakeSpacecadetClient`` in-process, which has the same interface
+as ``SpacecadetClient`` and skips the subprocess entirely.
+
+This module only depends on the standard library and ``mcp`` so it can run
+as a plain script.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+STATES = ("TODO", "NEXT", "WAITING", "DONE", "CANCELLED")
+PRIORITIES = ("A", "B", "C", "D", None)
+TAGS = ("work", "home", "errand", "admin", "health", "finance")
+WORDS = (
+    "call", "email", "buy", "fix", "review", "plan", "book", "pay", "renew", "draft",
+    "dentist", "taxes", "milk", "report", "garage", "passport", "invoice", "slides",
+)
+
+
+class FakeToolError(Exception):
+    pass
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Parse ``kind:args`` into a sampler returning seconds.
+
+    Kinds: ``fixed:s``, ``uniform:lo,hi``, ``normal:mu,sigma``,
+    ``lognormal:mu,sigma`` (of the underlying normal) and ``exp:mean``.
+    """
+    kind, _, raw = spec.partition(":")
+    args = [float(a) for a in raw.split(",") if a]
+    samplers = {
+        "fixed": lambda rng: args[0],
+        "uniform": lambda rng: rng.uniform(args[0], args[1]),
+        "normal": lambda rng: max(0.0, rng.gauss(args[0], args[1])),
+        "lognormal": lambda rng: rng.lognormvariate(args[0], args[1]),
+        "exp": lambda rng: rng.expovariate(1.0 / args[0]),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution: {spec}")
+    return samplers[kind]
+
+
+def generate_tasks(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    today = date(2025, 1, 1)
+    tasks = []
+    for i in range(count):
+        deadline = today + timedelta(days=rng.randint(0, 365)) if rng.random() < 0.4 else None
+        scheduled = today + timedelta(days=rng.randint(0, 365)) if rng.random() < 0.2 else None
+        tasks.append({
+            "id": f"fake-{i:06d}",
+            "heading": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).capitalize(),
+            "todo": rng.choices(STATES, weights=(50, 15, 10, 20, 5))[0],
+            "priority": rng.choice(PRIORITIES),
+            "tags": rng.sample(TAGS, rng.randint(0, 2)),
+            "deadline": deadline.isoformat() if deadline else None,
+            "scheduled": scheduled.isoformat() if scheduled else None,
+        })
+    return tasks
+
+
+class TaskStore:
+    """In-memory task store, optionally persisted to a JSON file."""
+
+    def __init__(self, tasks: list[dict[str, Any]] | None = None, path: str | None = None):
+        self._path = Path(path) if path else None
+        if self._path is not None and self._path.exists():
+            tasks = json.loads(self._path.read_text(encoding="utf-8"))
+        self._tasks: dict[str, dict[str, Any]] = {t["id"]: t for t in tasks or []}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(list(self._tasks.values())), encoding="utf-8")
+        os.replace(tmp, self._path)
+
+    def _get(self, task_id: str) -> dict[str, Any]:
+        task = self._tasks.get(task_id)
+        if task is None:
+            raise FakeToolError(f"Task not found: {task_id}")
+        return task
+
+    def list_tasks(self, state: str | None = None, priority: str | None = None,
+                   tag: str | None = None, **_) -> list[dict[str, Any]]:
+        return [
+            t for t in self._tasks.values()
+            if (state is None or t["todo"] == state)
+            and (priority is None or t.get("priority") == priority)
+            and (tag is None or tag in (t.get("tags") or []))
+        ]
+
+    def get_task(self, id: str, **_) -> dict[str, Any]:
+        return self._get(id)
+
+    def add_task(self, heading: str, priority: str | None = None, deadline: str | None = None,
+                 scheduled: str | None = None, tags: list[str] | None = None,
+                 state: str = "TODO", **_) -> dict[str, Any]:
+        task = {
+            "id": uuid.uuid4().hex[:12],
+            "heading": heading,
+            "todo": state,
+            "priority": priority,
+            "tags": tags or [],
+            "deadline": deadline,
+            "scheduled": scheduled,
+        }
+        self._tasks[task["id"]] = task
+        self._save()
+        return {"status": "ok", "id": task["id"], "heading": heading}
+
+    def update_task(self, id: str, state: str | None = None, new_state: str | None = None,
+                    **changes) -> dict[str, Any]:
+        task = self._get(id)
+        if state or new_state:
+            task["todo"] = new_state or state
+        for key in ("heading", "priority", "deadline", "scheduled", "tags"):
+            if changes.get(key) is not None:
+                task[key] = changes[key]
+        self._save()
+        return {"status": "ok", "id": id}
+
+    def delete_task(self, id: str, **_) -> dict[str, Any]:
+        self._get(id)
+        del self._tasks[id]
+        self._save()
+        return {"status": "ok", "id": id}
+
+
+TOOLS = ("list_tasks", "get_task", "add_task", "update_task", "delete_task")
+
+
+class FaultInjector:
+    """Latency and error injection shared by the server and in-process client."""
+
+    def __init__(
+        self,
+        latency: dict[str, str] | None = None,
+        error_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        latency = latency or {}
+        default = parse_latency(latency.get("default", "fixed:0"))
+        self._latency = {tool: parse_latency(latency[tool]) if tool in latency else default
+                         for tool in TOOLS}
+        self._error_rate = error_rate
+        self._hang_rate = hang_rate
+        self._rng = random.Random(seed)
+
+    async def before(self, tool: str) -> None:
+        if self._hang_rate and self._rng.random() < self._hang_rate:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self._latency[tool](self._rng))
+        if self._error_rate and self._rng.random() < self._error_rate:
+            raise FakeToolError(f"Injected failure in {tool}")
+
+
+async def dispatch(store: TaskStore, faults: FaultInjector, name: str, args: dict[str, Any]) -> Any:
+    if name not in TOOLS:
+        raise FakeToolError(f"Unknown tool: {name}")
+    await faults.before(name)
+    return getattr(store, name)(**args)
+
+
+class FakeSpacecadetClient:
+    """In-process replacement for ``SpacecadetClient`` backed by a ``TaskStore``."""
+
+    def __init__(self, store: TaskStore | None = None, faults: FaultInjector | None = None):
+        self.store = store if store is not None else TaskStore()
+        self.faults = faults or FaultInjector()
+        self.alive = False
+
+    async def connect(self) -> None:
+        self.alive = True
+
+    async def close(self, timeout: float = 5.0) -> None:
+        self.alive = False
+
+    async def ping(self) -> None:
+        pass
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> Any:
+        clean_args = {k: v for k, v in args.items() if v is not None}
+        try:
+            result = await dispatch(self.store, self.faults, name, clean_args)
+        except (FakeToolError, TypeError) as e:
+            return {"error": str(e)}
+        # Round-trip through JSON like the real client, so callers can't
+        # mutate the store through the returned objects
+        return json.loads(json.dumps(result))
+
+    async def list_tasks(self, **kwargs) -> Any:
+        return await self.call_tool("list_tasks", kwargs)
+
+    async def add_task(self, **kwargs) -> dict:
+        return await self.call_tool("add_task", kwargs)
+
+    async def update_task(self, **kwargs) -> dict:
+        return await self.call_tool("update_task", kwargs)
+
+    async def delete_task(self, **kwargs) -> dict:
+        return await self.call_tool("delete_task", kwargs)
+
+    async def get_task(self, **kwargs) -> dict:
+        return await self.call_tool("get_task", kwargs)
+
+
+def build_server(store: TaskStore, faults: FaultInjector):
+    from mcp.server.lowlevel import Server
+    from mcp.types import TextContent, Tool
+
+    server = Server("fake-spacecadet")
+
+    @server.list_tools()
+    async def list_tools() -> list[Tool]:
+        schema = {"type": "object", "additionalProperties": True}
+        return [Tool(name=name, description=f"fake {name}", inputSchema=schema) for name in TOOLS]
+
+    @server.call_tool(validate_input=False)
+    async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
+        try:
+            result = await dispatch(store, faults, name, arguments or {})
+        except TypeError as e:
+            raise FakeToolError(str(e)) from e
+        # Whole result as one JSON text block, which is what SpacecadetClient parses
+        return [TextContent(type="text", text=json.dumps(result))]
+
+    return server
+
+
+async def serve(store: TaskStore, faults: FaultInjector) -> None:
+    from mcp.server.stdio import stdio_server
+
+    server = build_server(store, faults)
+    async with stdio_server() as (read_stream, write_stream):
+        await server.run(read_stream, write_stream, server.create_initialization_options())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50, help="synthetic tasks to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--store", help="JSON file to load from and persist writes to")
+    parser.add_argument(
+        "--latency", action="append", default=[], metavar="[TOOL=]DIST",
+        help="latency distribution, e.g. lognormal:-3,0.6 or list_tasks=uniform:0.1,0.4",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    latency = {}
+    for spec in args.latency:
+        tool, sep, dist = spec.partition("=")
+        latency[tool if sep else "default"] = dist if sep else spec
+
+    store = TaskStore(generate_tasks(args.tasks, args.seed), path=args.store)
+    faults = FaultInjector(latency, args.error_rate, args.hang_rate, seed=args.seed)
+    print(f"fake spacecadet serving {len(store)} tasks", file=sys.stderr)
+    asyncio.run(serve(store, faults))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Iterator
 
 from .config import settings
 from .models import Message
@@ -21,9 +22,10 @@ class Inbox:
         )
         return path
 
-    def read_all(self) -> list[Message]:
-        messages = []
+    def iter_messages(self) -> Iterator[Message]:
+        """Yield messages one file at a time, in filename (arrival second) order."""
         for path in sorted(self.directory.glob("*.json")):
-            data = json.loads(path.read_text(encoding="utf-8"))
-            messages.append(Message(**data))
-        return messages
+            yield Message.model_validate_json(path.read_bytes())
+
+    def read_all(self) -> list[Message]:
+        return list(self.iter_messages())
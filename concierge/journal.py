@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any
+
+from .config import settings
+from .metrics import REGISTRY
+from .models import Burst, IntentClassification, IntentType, ws_correction
+from .reconciler import Reconciler, new_task_heading
+from .sessions import Session, SessionRegistry
+from .task_record import parse_tasks
+
+logger = logging.getLogger("concierge")
+
+PENDING = REGISTRY.gauge("journal_pending", "Journaled intents not yet applied to spacecadet")
+APPLIED = REGISTRY.counter("journal_applied_total", "Journaled intents applied to spacecadet")
+FAILED = REGISTRY.counter("journal_failed_total", "Journaled intents that could not be applied")
+RETRIES = REGISTRY.counter("journal_retries_total", "Failed attempts to apply a journaled intent")
+
+# Intents that change tasks; these are journaled and applied later
+MUTATIONS = frozenset({
+    IntentType.NEW_TASK,
+    IntentType.GENERAL_NOTE,
+    IntentType.MODIFY_TASK,
+    IntentType.PRIORITY_CHANGE,
+    IntentType.CANCEL_TASK,
+})
+ADDS = frozenset({IntentType.NEW_TASK, IntentType.GENERAL_NOTE})
+# How often the applier prunes settled entries, in seconds
+PRUNE_INTERVAL = 3600.0
+
+# Identifies this process in journal entries; unlike a pid, never reused
+BOOT_ID = uuid.uuid4().hex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS intents (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    worker TEXT NOT NULL,
+    session INTEGER NOT NULL,
+    user TEXT NOT NULL,
+    intent TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    existing TEXT,
+    result TEXT,
+    notified INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS intents_state ON intents (state, id);
+"""
+
+
+class JournalConflict(ValueError):
+    """An idempotency key was journaled again with a different intent."""
+
+
+class IntentJournal:
+    """Write-ahead log of task intents, in a SQLite file.
+
+    An intent is committed (and fsynced) before the user is told it was
+    saved, then moves from ``pending`` to ``applied`` or ``failed``. Each
+    entry has an idempotency key, so journaling the same burst twice
+    records it once; the same key with a different intent is a
+    ``JournalConflict``. Applied and failed entries are kept for
+    ``settings.journal_retention`` and then pruned. The connection is
+    shared between threads; calls go through ``asyncio.to_thread`` so
+    fsyncs don't block the event loop.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.journal_path
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._db.execute(sql, params)
+
+    def append(self, key: str, session: Session, intent: IntentClassification) -> int:
+        """Journal ``intent``; returns its entry id, the existing one for a known key.
+
+        Raises ``JournalConflict`` if ``key`` is already journaled for a
+        different intent.
+        """
+        now = time.time()
+        payload = intent.model_dump_json()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO intents (key, worker, session, user, intent, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, BOOT_ID, session.id, session.user, payload, now, now),
+            )
+            row = self._db.execute(
+                "SELECT id, intent FROM intents WHERE key = ?", (key,)
+            ).fetchone()
+        if row["intent"] != payload:
+            raise JournalConflict(f"Journal key {key!r} is already used by entry {row['id']}")
+        return row["id"]
+
+    def pending(self, limit: int = 100) -> list[sqlite3.Row]:
+        return self._execute(
+            "SELECT * FROM intents WHERE state = 'pending' ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+
+    def counts(self) -> dict[str, int]:
+        rows = self._execute("SELECT state, COUNT(*) FROM intents GROUP BY state").fetchall()
+        return {state: n for state, n in rows}
+
+    def set_existing(self, entry_id: int, ids: list[str]) -> None:
+        self._execute("UPDATE intents SET existing = ? WHERE id = ?", (json.dumps(ids), entry_id))
+
+    def record_attempt(self, entry_id: int, error: str) -> None:
+        self._execute(
+            "UPDATE intents SET attempts = attempts + 1, error = ?, updated_at = ? WHERE id = ?",
+            (error, time.time(), entry_id),
+        )
+
+    def mark_applied(self, entry_id: int, result: Any) -> None:
+        self._execute(
+            "UPDATE intents SET state = 'applied', result = ?, updated_at = ? WHERE id = ?",
+            (json.dumps(result, default=str), time.time(), entry_id),
+        )
+
+    def mark_failed(self, entry_id: int, error: str) -> None:
+        self._execute(
+            "UPDATE intents SET state = 'failed', error = ?, updated_at = ? WHERE id = ?",
+            (error, time.time(), entry_id),
+        )
+
+    def undelivered(self) -> list[sqlite3.Row]:
+        """Failed entries whose correction hasn't reached the user yet."""
+        return self._execute(
+            "SELECT * FROM intents WHERE state = 'failed' AND notified = 0 ORDER BY id"
+        ).fetchall()
+
+    def claim_delivery(self, entry_id: int) -> bool:
+        """True for exactly one caller, even across worker processes."""
+        cursor = self._execute(
+            "UPDATE intents SET notified = 1 WHERE id = ? AND notified = 0", (entry_id,)
+        )
+        return cursor.rowcount == 1
+
+    def prune(self, older_than: float) -> int:
+        """Delete entries applied or failed before ``older_than``; returns how many."""
+        cursor = self._execute(
+            "DELETE FROM intents WHERE state != 'pending' AND updated_at < ?", (older_than,)
+        )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _summary(intent: IntentClassification) -> str:
+    if intent.intent in ADDS:
+        return f"add '{new_task_heading(intent)}'"
+    target = intent.heading or intent.task_id or "the task"
+    if intent.intent == IntentType.CANCEL_TASK:
+        return f"cancel '{target}'"
+    return f"update '{target}'"
+
+
+class JournalApplier:
+    """Journals task intents and applies them to spacecadet in the background.
+
+    ``submit`` journals the mutating intents of a burst and returns at once
+    with an ``accepted`` result for each; reads and chat are reconciled
+    inline as before. The applier then works through the journal in order.
+    While spacecadet is down it waits, so intents from an outage are
+    applied once it returns. A call that raises is retried with backoff
+    up to ``max_attempts``; an error result (e.g. no task matches) fails
+    the entry straight away. For a failed entry the user gets a
+    ``correction`` frame, on the original session if it is still open,
+    or else on any other session of the same user.
+
+    spacecadet has no idempotency keys, so a retried add could create the
+    task twice when the first attempt landed but its reply was lost. Before
+    an add is first tried, the ids of tasks with the same heading (read from
+    spacecadet, not the task cache) are saved; a retry that finds a new one
+    counts as applied instead.
+
+    With ``apply=False`` (follower workers in multi-worker mode), intents
+    are only journaled; the owner applies them and the worker whose session
+    it was delivers the correction.
+    """
+
+    def __init__(
+        self,
+        journal: IntentJournal,
+        reconciler: Reconciler,
+        client,
+        sessions: SessionRegistry,
+        task_cache=None,
+        apply: bool = True,
+        max_attempts: int | None = None,
+        poll: float | None = None,
+    ):
+        self._journal = journal
+        self._reconciler = reconciler
+        self._client = client
+        self._sessions = sessions
+        self._task_cache = task_cache
+        self._apply_entries = apply
+        self._max_attempts = max_attempts or settings.journal_max_attempts
+        self._poll = poll or settings.journal_poll
+        self._wake = asyncio.Event()
+        self._retry_at = 0.0
+        self._prune_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._journal.close()
+
+    async def submit(
+        self, intents: list[IntentClassification], session: Session, burst: Burst
+    ) -> list[dict[str, Any]]:
+        """Results for ``intents``, in order, journaling the mutating ones."""
+        # Message ids come from the client; without them the burst can't be
+        # recognised if it is submitted again. The user and the burst's
+        # server-side start keep one client's ids from matching another's.
+        ids = [m.id for m in burst.messages]
+        burst_key = "|".join(ids) if all(ids) else uuid.uuid4().hex
+        burst_key = f"{session.user}|{burst.started_at.isoformat()}|{burst_key}"
+        results: list[dict[str, Any] | None] = [None] * len(intents)
+        inline = []
+        for n, intent in enumerate(intents):
+            if intent.intent not in MUTATIONS:
+                inline.append(n)
+                continue
+            try:
+                entry_id = await asyncio.to_thread(
+                    self._journal.append, f"{burst_key}#{n}", session, intent
+                )
+            except JournalConflict as e:
+                logger.error("%s", e)
+                results[n] = {"error": str(e)}
+                continue
+            results[n] = {
+                "status": "accepted",
+                "journal_id": entry_id,
+                "note": "saved; it will be applied to spacecadet in the background",
+            }
+        if inline:
+            reconciled = await self._reconciler.reconcile([intents[n] for n in inline])
+            for n, result in zip(inline, reconciled):
+                results[n] = result
+        if len(inline) < len(intents):
+            self._wake.set()
+        return results
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                delay = await self._drain() if self._apply_entries else None
+                await self._deliver_corrections()
+                await self._prune()
+            except Exception as e:
+                logger.error("Intent journal error: %s", e)
+                delay = None
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay or self._poll)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _drain(self) -> float | None:
+        """Apply pending entries in order; returns a backoff delay if one must be retried."""
+        backoff = self._retry_at - time.monotonic()
+        if backoff > 0:
+            return backoff
+        counts = await asyncio.to_thread(self._journal.counts)
+        PENDING.set(counts.get("pending", 0))
+        for entry in await asyncio.to_thread(self._journal.pending):
+            wait_connected = getattr(self._client, "wait_connected", None)
+            if wait_connected is not None:
+                await wait_connected()
+            retry_in = await self._apply(entry)
+            if retry_in is not None:
+                # Later intents may depend on this one; keep the order
+                self._retry_at = time.monotonic() + retry_in
+                return retry_in
+        return None
+
+    async def _apply(self, entry: sqlite3.Row) -> float | None:
+        intent = IntentClassification.model_validate_json(entry["intent"])
+        try:
+            if intent.intent in ADDS:
+                if entry["existing"] is None:
+                    # No baseline yet means no add was sent, whatever the
+                    # attempt count: an earlier try failed before it
+                    existing = await self._same_heading(intent)
+                    await asyncio.to_thread(self._journal.set_existing, entry["id"], existing)
+                else:
+                    landed = await self._landed_add(intent, json.loads(entry["existing"]))
+                    if landed is not None:
+                        await self._applied(entry, {"id": landed, "deduplicated": True})
+                        return None
+            result = await self._reconciler.apply(intent)
+        except Exception as e:
+            RETRIES.inc()
+            attempts = entry["attempts"] + 1
+            error = str(e) or type(e).__name__
+            logger.warning(
+                "Applying journaled intent %d failed (attempt %d): %s",
+                entry["id"], attempts, error,
+            )
+            await asyncio.to_thread(self._journal.record_attempt, entry["id"], error)
+            if attempts < self._max_attempts:
+                return min(0.5 * 2 ** attempts, settings.spacecadet_backoff_max)
+            await self._failed(entry, error)
+            return None
+
+        if isinstance(result, dict) and "error" in result:
+            await self._failed(entry, str(result["error"]))
+        else:
+            await self._applied(entry, result)
+        return None
+
+    async def _prune(self) -> None:
+        now = time.monotonic()
+        if now < self._prune_at:
+            return
+        self._prune_at = now + PRUNE_INTERVAL
+        pruned = await asyncio.to_thread(
+            self._journal.prune, time.time() - settings.journal_retention
+        )
+        if pruned:
+            logger.info("Pruned %d settled journal entries", pruned)
+
+    async def _same_heading(self, intent: IntentClassification) -> list[str]:
+        # Straight from spacecadet: a stale cache would miss a matching task
+        # and a retry would then take it for the one this add created
+        heading = new_task_heading(intent)
+        tasks = parse_tasks(await self._client.list_tasks())
+        return [t.id for t in tasks if t.heading == heading]
+
+    async def _landed_add(self, intent: IntentClassification, existing: list[str]) -> str | None:
+        """Id of a task an earlier attempt created, if any."""
+        heading = new_task_heading(intent)
+        for task in parse_tasks(await self._client.list_tasks()):
+            if task.heading == heading and task.id not in existing:
+                return task.id
+        return None
+
+    async def _applied(self, entry: sqlite3.Row, result: Any) -> None:
+        await asyncio.to_thread(self._journal.mark_applied, entry["id"], result)
+        APPLIED.inc()
+        if self._task_cache is not None:
+            self._task_cache.request_refresh()
+
+    async def _failed(self, entry: sqlite3.Row, error: str) -> None:
+        logger.error("Journaled intent %d could not be applied: %s", entry["id"], error)
+        await asyncio.to_thread(self._journal.mark_failed, entry["id"], error)
+        FAILED.inc()
+
+    async def _deliver_corrections(self) -> None:
+        for entry in await asyncio.to_thread(self._journal.undelivered):
+            targets = []
+            # Session ids only mean something in the process that made them
+            if entry["worker"] == BOOT_ID:
+                session = self._sessions.get(entry["session"])
+                if session is not None:
+                    targets = [session]
+            candidates = targets or self._sessions.for_user(entry["user"])
+            targets = [s for s in candidates if s.outbox is not None]
+            # Nobody to tell yet; try again when the user reconnects
+            if not targets:
+                continue
+            if not await asyncio.to_thread(self._journal.claim_delivery, entry["id"]):
+                continue
+            intent = IntentClassification.model_validate_json(entry["intent"])
+            targets[0].outbox.put(ws_correction(
+                f"Sorry — I couldn't {_summary(intent)} after all: {entry['error']}",
+                entry["id"],
+                entry["error"],
+            ))
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import importlib
+
+# Provider name -> "module:Class". Only the selected module is imported, so
+# the SDKs of the other providers never load.
+PROVIDERS = {
+    "anthropic": ".anthropic_provider:AnthropicProvider",
+    "openai": ".openai_provider:OpenAIProvider",
+    "ollama": ".ollama_provider:OllamaProvider",
+    "fake": ".fake_provider:FakeProvider",
+}
+
+
+def provider_class(name: str) -> type:
+    try:
+        target = PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown LLM provider: {name}") from None
+    module, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module, __name__), attr)
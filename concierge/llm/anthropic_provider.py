@@ -5,9 +5,11 @@ import logging
 
 import anthropic
 
+from .. import tracing
 from ..config import settings
 from ..models import Burst, IntentClassification
 from .base import LLMProvider
+from .limiter import record_usage
 
 logger = logging.getLogger("concierge")
 
@@ -39,20 +41,33 @@ Be factual and specific. No emoji. No pleasantries.\
 
 class AnthropicProvider:
     def __init__(self):
-        self._client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+        self._sdk_client: anthropic.AsyncAnthropic | None = None
         self._model = settings.anthropic_model
 
+    @property
+    def _client(self) -> anthropic.AsyncAnthropic:
+        # Built on first use; constructing the SDK client is not free
+        if self._sdk_client is None:
+            self._sdk_client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+        return self._sdk_client
+
+    async def warm_up(self) -> None:
+        """Open a pooled connection (and check the key) before the first burst."""
+        await self._client.models.list(limit=1)
+
     async def classify_intent(self, burst: Burst) -> list[IntentClassification]:
         combined = "\n".join(
             f"[{m.timestamp.strftime('%H:%M:%S')}] {m.text}" for m in burst.messages
         )
 
-        response = await self._client.messages.create(
-            model=self._model,
-            max_tokens=1024,
-            system=CLASSIFY_SYSTEM,
-            messages=[{"role": "user", "content": combined}],
-        )
+        with tracing.span("llm.anthropic", model=self._model, call="classify"):
+            response = await self._client.messages.create(
+                model=self._model,
+                max_tokens=1024,
+                system=CLASSIFY_SYSTEM,
+                messages=[{"role": "user", "content": combined}],
+            )
+        record_usage(response.usage.input_tokens, response.usage.output_tokens)
 
         raw = response.content[0].text.strip()
         try:
@@ -81,11 +96,13 @@ class AnthropicProvider:
             indent=2,
         )
 
-        response = await self._client.messages.create(
-            model=self._model,
-            max_tokens=128,
-            system=ACK_SYSTEM,
-            messages=[{"role": "user", "content": summary}],
-        )
+        with tracing.span("llm.anthropic", model=self._model, call="acknowledge"):
+            response = await self._client.messages.create(
+                model=self._model,
+                max_tokens=128,
+                system=ACK_SYSTEM,
+                messages=[{"role": "user", "content": summary}],
+            )
+        record_usage(response.usage.input_tokens, response.usage.output_tokens)
 
         return response.content[0].text.strip()
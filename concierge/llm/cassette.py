@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+from ..config import settings
+from ..metrics import REGISTRY
+from ..models import Burst, IntentClassification
+from .base import LLMProvider
+
+logger = logging.getLogger("concierge")
+
+MISSES = REGISTRY.counter("llm_cassette_misses_total", "Replayed LLM calls with no recording")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    method TEXT NOT NULL,
+    request BLOB NOT NULL,
+    response BLOB NOT NULL,
+    latency REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_fingerprint ON calls (fingerprint, id);
+"""
+
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(
+        json.dumps(value, separators=(",", ":"), sort_keys=True, default=str).encode()
+    )
+
+
+def _unpack(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+def classify_request(burst: Burst) -> dict[str, Any]:
+    # Message text only: ids and timestamps differ every time traffic is replayed
+    return {"messages": [m.text for m in burst.messages]}
+
+
+def acknowledge_request(intents: list[IntentClassification], results: list[dict]) -> dict[str, Any]:
+    return {
+        "intents": [i.model_dump(mode="json", exclude={"raw_text"}) for i in intents],
+        "results": results,
+    }
+
+
+def fingerprint(method: str, request: dict[str, Any]) -> str:
+    canonical = json.dumps([method, request], separators=(",", ":"), sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+class CassetteStore:
+    """Recorded LLM calls in a SQLite file, indexed by request fingerprint.
+
+    Requests and responses are stored as zlib-compressed JSON. A fingerprint
+    can be recorded several times; replay hands the recordings out in order
+    and then starts over. The connection may be used from worker threads,
+    so the recorder can write off the event loop.
+    """
+
+    def __init__(self, path: str, create: bool = True):
+        if not path:
+            raise ValueError("No cassette path configured (CONCIERGE_LLM_CASSETTE)")
+        if not create and not Path(path).exists():
+            raise FileNotFoundError(f"Cassette not found: {path}")
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._cursors: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM calls").fetchone()[0]
+
+    def record(self, method: str, request: dict[str, Any], response: Any, latency: float) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO calls (fingerprint, method, request, response, latency, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (fingerprint(method, request), method, _pack(request), _pack(response),
+                 latency, time.time()),
+            )
+
+    def lookup(self, method: str, request: dict[str, Any]) -> tuple[Any, float] | None:
+        """Next recorded ``(response, latency)`` for this request, or ``None``."""
+        key = fingerprint(method, request)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT response, latency FROM calls WHERE fingerprint = ? ORDER BY id", (key,)
+            ).fetchall()
+        if not rows:
+            return None
+        n = self._cursors.get(key, 0)
+        self._cursors[key] = n + 1
+        response, latency = rows[n % len(rows)]
+        return _unpack(response), latency
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class RecordingProvider:
+    """Wraps a provider and records every successful call with its latency.
+
+    Rows are written (and committed) in a worker thread, off the event loop.
+    A failed write is logged; the call's result is returned regardless.
+    """
+
+    def __init__(self, inner: LLMProvider, store: CassetteStore):
+        self._inner = inner
+        self._store = store
+        # Only offer a warm-up when the wrapped provider has one
+        warm_up = getattr(inner, "warm_up", None)
+        if warm_up is not None:
+            self.warm_up = warm_up
+
+    async def _record(
+        self, method: str, request: dict[str, Any], response: Any, latency: float
+    ) -> None:
+        try:
+            await asyncio.to_thread(self._store.record, method, request, response, latency)
+        except Exception as e:
+            logger.warning("Could not record %s to %s: %s", method, self._store.path, e)
+
+    async def classify_intent(self, burst: Burst) -> list[IntentClassification]:
+        start = time.perf_counter()
+        intents = await self._inner.classify_intent(burst)
+        await self._record(
+            "classify_intent",
+            classify_request(burst),
+            [i.model_dump(mode="json") for i in intents],
+            time.perf_counter() - start,
+        )
+        return intents
+
+    async def generate_acknowledgement(
+        self, intents: list[IntentClassification], results: list[dict]
+    ) -> str:
+        start = time.perf_counter()
+        ack = await self._inner.generate_acknowledgement(intents, results)
+        await self._record(
+            "generate_acknowledgement",
+            acknowledge_request(intents, results),
+            ack,
+            time.perf_counter() - start,
+        )
+        return ack
+
+
+def parse_latency_mode(mode: str) -> float:
+    """``original`` → 1.0, ``none`` → 0.0, or a scale factor such as ``0.25``."""
+    if mode == "original":
+        return 1.0
+    if mode == "none":
+        return 0.0
+    try:
+        scale = float(mode)
+    except ValueError:
+        raise ValueError(f"Unknown replay latency: {mode}") from None
+    if scale < 0:
+        raise ValueError(f"Replay latency scale must be >= 0: {mode}")
+    return scale
+
+
+class ReplayProvider:
+    """Serves recorded responses, optionally with their recorded latency.
+
+    A call that was never recorded raises ``LookupError``; the classifier
+    and acknowledger treat that like any other provider failure.
+    """
+
+    def __init__(self, store: CassetteStore, latency: str | None = None):
+        self._store = store
+        self._scale = parse_latency_mode(latency or settings.llm_replay_latency)
+
+    async def _replay(self, method: str, request: dict[str, Any]) -> Any:
+        hit = self._store.lookup(method, request)
+        if hit is None:
+            MISSES.inc()
+            logger.warning("No recorded %s for %s", method, fingerprint(method, request))
+            raise LookupError(f"no recorded {method} response")
+        response, latency = hit
+        if self._scale:
+            await asyncio.sleep(latency * self._scale)
+        return response
+
+    async def classify_intent(self, burst: Burst) -> list[IntentClassification]:
+        data = await self._replay("classify_intent", classify_request(burst))
+        return [IntentClassification(**item) for item in data]
+
+    async def generate_acknowledgement(
+        self, intents: list[IntentClassification], results: list[dict]
+    ) -> str:
+        return await self._replay("generate_acknowledgement", acknowledge_request(intents, results))
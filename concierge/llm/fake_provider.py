@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import re
+from pathlib import Path
+
+from .. import tracing
+from ..config import settings
+from ..fake_spacecadet import parse_latency
+from ..models import Burst, IntentClassification
+
+logger = logging.getLogger("concierge")
+
+# Default rules, tried in order; the first pattern that matches a message wins
+DEFAULT_SCRIPT = [
+    {"match": r"^(what|show|list|any)\b", "intent": {"intent": "status_query"}},
+    {"match": r"^(?:done|finished):?\s+(.+)",
+     "intent": {"intent": "modify_task", "state": "DONE", "heading": r"\1"}},
+    {"match": r"^(?:urgent|asap):?\s+(.+)",
+     "intent": {"intent": "priority_change", "priority": "A", "heading": r"\1"}},
+    {"match": r"^(hi|hello|thanks)\b", "intent": {"intent": "chat", "note": "Hi!"}},
+    {"match": r"", "intent": {"intent": "new_task"}},
+]
+
+
+class FakeProvider:
+    """Deterministic LLM stand-in for load tests and offline development.
+
+    Each message is matched against a script of ``{"match": regex,
+    "intent": {...}}`` rules, and the first match becomes one intent.
+    ``heading`` defaults to the message text; string fields may refer to
+    regex groups (``\\1``). Calls sleep for a sampled latency (same
+    ``kind:args`` specs as the fake spacecadet) to mimic a real provider's
+    round trip.
+    """
+
+    def __init__(
+        self,
+        latency: str | None = None,
+        script: list[dict] | str | None = None,
+        seed: int | None = None,
+    ):
+        self._latency = parse_latency(latency or settings.fake_llm_latency)
+        self._rng = random.Random(settings.fake_llm_seed if seed is None else seed)
+        script = script if script is not None else (settings.fake_llm_script or DEFAULT_SCRIPT)
+        if isinstance(script, str):
+            script = json.loads(Path(script).read_text(encoding="utf-8"))
+        self._rules = [(re.compile(r["match"], re.IGNORECASE), r["intent"]) for r in script]
+
+    async def _wait(self, call: str) -> None:
+        with tracing.span("llm.fake", call=call):
+            await asyncio.sleep(self._latency(self._rng))
+
+    def _classify(self, text: str) -> IntentClassification | None:
+        for pattern, intent in self._rules:
+            m = pattern.search(text)
+            if m:
+                fields = {"heading": text[:80], "raw_text": text}
+                for key, value in intent.items():
+                    fields[key] = m.expand(value) if isinstance(value, str) and "\\" in value else value
+                return IntentClassification(**fields)
+        return None
+
+    async def classify_intent(self, burst: Burst) -> list[IntentClassification]:
+        await self._wait("classify")
+        intents = []
+        for m in burst.messages:
+            intent = self._classify(m.text)
+            if intent is not None:
+                intents.append(intent)
+        return intents
+
+    async def generate_acknowledgement(
+        self, intents: list[IntentClassification], results: list[dict]
+    ) -> str:
+        await self._wait("acknowledge")
+        done = sum(1 for r in results if "error" not in r)
+        kinds = ", ".join(sorted({i.intent.value for i in intents}))
+        return f"Done: {done}/{len(intents)} action(s) ({kinds})"
+
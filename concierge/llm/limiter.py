@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, TypeVar
+
+from .. import tracing
+from ..config import settings
+from ..metrics import REGISTRY
+from ..models import Burst, IntentClassification
+from .base import LLMProvider
+
+logger = logging.getLogger("concierge")
+
+T = TypeVar("T")
+
+# Who the current LLM call is for; waiting calls are admitted one key at a time
+caller: ContextVar[str] = ContextVar("concierge_llm_caller", default="")
+
+# HTTP statuses meaning "too much traffic": rate limited, or (Anthropic) overloaded
+OVERLOAD_STATUSES = frozenset({429, 529})
+# Multiplicative decrease on an overload response, and on a call that was slow
+OVERLOAD_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.9
+# Weight of each call in its kind's moving-average latency
+BASELINE_WEIGHT = 0.05
+# Latency differences below this are scheduling noise, not a queue at the model
+LATENCY_SLACK = 0.05
+
+
+class Usage:
+    """Tokens reported by the provider for the call in progress."""
+
+    __slots__ = ("input_tokens", "output_tokens")
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+
+_usage: ContextVar[Usage | None] = ContextVar("concierge_llm_usage", default=None)
+
+
+def record_usage(input_tokens: int | None, output_tokens: int | None) -> None:
+    """Called by providers with the token counts from a response's metadata."""
+    usage = _usage.get()
+    if usage is not None:
+        usage.input_tokens += input_tokens or 0
+        usage.output_tokens += output_tokens or 0
+
+
+def is_overloaded(exc: BaseException) -> bool:
+    """True for an SDK or httpx error carrying a 429 (or 529) status."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status in OVERLOAD_STATUSES
+
+
+class AdaptiveLimiter:
+    """Concurrency limit on one provider's calls, adjusted by AIMD.
+
+    Each call that finishes within ``tolerance`` times the usual latency of
+    its kind (classify, acknowledge) while the limit is fully used raises the
+    limit by ``1 / limit``, about one slot per round of calls. A 429 halves it,
+    and a slow call shrinks it by 10%. Only calls started after the last
+    decrease can shrink it again, so one overload isn't counted once per call
+    that was already in flight. The usual latency is a moving average over
+    the recent calls of that kind.
+
+    Calls over the limit wait in a queue that admits one call per caller in
+    turn, so one busy user doesn't hold everyone else's bursts back.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int | None = None,
+        minimum: int | None = None,
+        maximum: int | None = None,
+        tolerance: float | None = None,
+    ):
+        self.name = name
+        self.minimum = max(1, minimum or settings.llm_concurrency_min)
+        self.maximum = max(self.minimum, maximum or settings.llm_concurrency_max)
+        initial = initial or settings.llm_concurrency_initial
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.tolerance = tolerance or settings.llm_latency_tolerance
+        self.baselines: dict[str, float] = {}
+        self._in_flight = 0
+        # caller -> calls waiting, in arrival order; callers rotate round-robin
+        self._waiting: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        self._decreased_at = 0.0
+
+        labels = {"provider": name}
+        self._limit_gauge = REGISTRY.gauge(
+            "llm_concurrency_limit", "Current adaptive limit on concurrent LLM calls", labels=labels
+        )
+        self._in_flight_gauge = REGISTRY.gauge(
+            "llm_in_flight", "LLM calls in progress", labels=labels
+        )
+        self._queued_gauge = REGISTRY.gauge(
+            "llm_queued", "LLM calls waiting for a slot", labels=labels
+        )
+        self._queue_seconds = REGISTRY.histogram(
+            "llm_queue_seconds", "Time LLM calls waited for a slot", labels=labels
+        )
+        self._overloads = REGISTRY.counter(
+            "llm_overloaded_total", "LLM calls rejected with 429/529", labels=labels
+        )
+        self._publish()
+
+    @property
+    def capacity(self) -> int:
+        return int(self.limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._waiting.values())
+
+    async def run(self, call: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()`` in a slot, feeding its latency (or 429) back into the limit."""
+        queued = time.monotonic()
+        await self._acquire(caller.get())
+        started = time.monotonic()
+        self._queue_seconds.observe(started - queued)
+        tracing.record("llm.queue", queued, started)
+
+        usage = Usage()
+        token = _usage.set(usage)
+        try:
+            result = await fn()
+        except BaseException as e:
+            if is_overloaded(e):
+                self._overloads.inc()
+                self._decrease(started, OVERLOAD_BACKOFF)
+                logger.warning(
+                    "LLM %s overloaded (%s): limit now %d", self.name, e, self.capacity
+                )
+            raise
+        else:
+            self._completed(call, time.monotonic() - started, started)
+            return result
+        finally:
+            _usage.reset(token)
+            self._count_usage(call, usage)
+            self._release()
+
+    def _completed(self, call: str, latency: float, started: float) -> None:
+        REGISTRY.histogram(
+            "llm_call_seconds", "LLM call time, excluding queueing",
+            labels={"provider": self.name, "call": call},
+        ).observe(latency)
+
+        baseline = self.baselines.get(call)
+        if baseline is None:
+            self.baselines[call] = latency
+        else:
+            self.baselines[call] = baseline + (latency - baseline) * BASELINE_WEIGHT
+
+        if baseline is not None and latency > baseline * self.tolerance + LATENCY_SLACK:
+            self._decrease(started, LATENCY_BACKOFF)
+        elif self._in_flight >= self.capacity or self._waiting:
+            # Only grow while the limit is what holds calls back
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._publish()
+
+    def _decrease(self, started: float, factor: float) -> None:
+        if started < self._decreased_at:
+            return
+        self.limit = max(self.minimum, self.limit * factor)
+        self._decreased_at = time.monotonic()
+        self._publish()
+
+    def _count_usage(self, call: str, usage: Usage) -> None:
+        if not (usage.input_tokens or usage.output_tokens):
+            return
+        for kind, n in (("input", usage.input_tokens), ("output", usage.output_tokens)):
+            REGISTRY.counter(
+                "llm_tokens_total", "Tokens used by LLM calls",
+                labels={"provider": self.name, "call": call, "kind": kind},
+            ).inc(n)
+        # Per-burst totals, across its classify and acknowledge calls
+        current = tracing.current()
+        if current is not None:
+            attrs = current.attrs
+            attrs["llm_input_tokens"] = attrs.get("llm_input_tokens", 0) + usage.input_tokens
+            attrs["llm_output_tokens"] = attrs.get("llm_output_tokens", 0) + usage.output_tokens
+
+    async def _acquire(self, key: str) -> None:
+        if self._in_flight < self.capacity and not self._waiting:
+            self._in_flight += 1
+            self._publish()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(key, deque()).append(future)
+        self._publish()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as we were cancelled: hand it on
+                self._release()
+            else:
+                self._remove_waiter(key, future)
+            raise
+
+    def _remove_waiter(self, key: str, future: asyncio.Future) -> None:
+        queue = self._waiting.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiting[key]
+        self._publish()
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._admit()
+
+    def _admit(self) -> None:
+        # Fills the slots the limit allows, taking the next caller in rotation
+        while self._waiting and self._in_flight < self.capacity:
+            key, queue = next(iter(self._waiting.items()))
+            future = queue.popleft()
+            if queue:
+                self._waiting.move_to_end(key)
+            else:
+                del self._waiting[key]
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
+        self._publish()
+
+    def _publish(self) -> None:
+        self._limit_gauge.set(self.capacity)
+        self._in_flight_gauge.set(self._in_flight)
+        self._queued_gauge.set(self.queued)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "provider": self.name,
+            "limit": round(self.limit, 2),
+            "min": self.minimum,
+            "max": self.maximum,
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "baseline_seconds": {k: round(v, 4) for k, v in self.baselines.items()},
+        }
+
+
+class LimitedProvider:
+    """Wraps a provider so its calls go through an ``AdaptiveLimiter``."""
+
+    def __init__(self, inner: LLMProvider, limiter: AdaptiveLimiter):
+        self._inner = inner
+        self.limiter = limiter
+        # Only offer a warm-up when the wrapped provider has one
+        warm_up = getattr(inner, "warm_up", None)
+        if warm_up is not None:
+            self.warm_up = warm_up
+
+    async def classify_intent(self, burst: Burst) -> list[IntentClassification]:
+        return await self.limiter.run("classify", lambda: self._inner.classify_intent(burst))
+
+    async def generate_acknowledgement(
+        self, intents: list[IntentClassification], results: list[dict]
+    ) -> str:
+        return await self.limiter.run(
+            "acknowledge", lambda: self._inner.generate_acknowledgement(intents, results)
+        )
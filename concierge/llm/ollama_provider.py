@@ -5,9 +5,11 @@ import logging
 
 import httpx
 
+from .. import tracing
 from ..config import settings
 from ..models import Burst, IntentClassification
 from .base import LLMProvider
+from .limiter import record_usage
 
 logger = logging.getLogger("concierge")
 
@@ -41,23 +43,39 @@ class OllamaProvider:
     def __init__(self):
         self._base_url = settings.ollama_base_url.rstrip("/")
         self._model = settings.ollama_model
-        self._client = httpx.AsyncClient(timeout=60.0)
+        self._http: httpx.AsyncClient | None = None
 
-    async def _chat(self, system: str, user: str, max_tokens: int = 1024) -> str:
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=60.0)
+        return self._http
+
+    async def warm_up(self) -> None:
+        """Load the model into memory; a generate call without a prompt only does that."""
         response = await self._client.post(
-            f"{self._base_url}/api/chat",
-            json={
-                "model": self._model,
-                "messages": [
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user},
-                ],
-                "stream": False,
-                "options": {"num_predict": max_tokens},
-            },
+            f"{self._base_url}/api/generate", json={"model": self._model}
         )
         response.raise_for_status()
-        return response.json()["message"]["content"].strip()
+
+    async def _chat(self, system: str, user: str, max_tokens: int = 1024) -> str:
+        with tracing.span("llm.ollama", model=self._model, max_tokens=max_tokens):
+            response = await self._client.post(
+                f"{self._base_url}/api/chat",
+                json={
+                    "model": self._model,
+                    "messages": [
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": user},
+                    ],
+                    "stream": False,
+                    "options": {"num_predict": max_tokens},
+                },
+            )
+        response.raise_for_status()
+        data = response.json()
+        record_usage(data.get("prompt_eval_count"), data.get("eval_count"))
+        return data["message"]["content"].strip()
 
     async def classify_intent(self, burst: Burst) -> list[IntentClassification]:
         combined = "\n".join(
@@ -6,8 +6,10 @@ import re
 
 import httpx
 
+from .. import tracing
 from ..config import settings
 from ..models import Burst, IntentClassification
+from .limiter import record_usage
 
 logger = logging.getLogger("concierge")
 
@@ -54,26 +56,43 @@ class OpenAIProvider:
         self._api_key = settings.openai_api_key
         self._model = settings.openai_model
         self._base_url = settings.openai_base_url.rstrip("/")
-        self._client = httpx.AsyncClient(timeout=60.0)
+        self._http: httpx.AsyncClient | None = None
+
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=60.0)
+        return self._http
+
+    async def warm_up(self) -> None:
+        """Open a pooled connection (and check the key) before the first burst."""
+        response = await self._client.get(
+            f"{self._base_url}/models", headers={"Authorization": f"Bearer {self._api_key}"}
+        )
+        response.raise_for_status()
 
     async def _chat(self, system: str, user: str, max_tokens: int = 1024) -> str:
-        response = await self._client.post(
-            f"{self._base_url}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": self._model,
-                "messages": [
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user},
-                ],
-                "max_tokens": max_tokens,
-            },
-        )
+        with tracing.span("llm.openai", model=self._model, max_tokens=max_tokens):
+            response = await self._client.post(
+                f"{self._base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self._api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": self._model,
+                    "messages": [
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": user},
+                    ],
+                    "max_tokens": max_tokens,
+                },
+            )
         response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"].strip()
+        data = response.json()
+        usage = data.get("usage") or {}
+        record_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return data["choices"][0]["message"]["content"].strip()
 
     async def classify_intent(self, burst: Burst) -> list[IntentClassification]:
         from datetime import UTC, datetime
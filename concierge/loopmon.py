@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+
+from .config import settings
+from .metrics import REGISTRY
+
+logger = logging.getLogger("concierge")
+
+LAG_SECONDS = REGISTRY.histogram("event_loop_lag_seconds", "Event-loop scheduling delay")
+STALLS = REGISTRY.counter("event_loop_stalls_total", "Times the event loop was blocked past the threshold")
+
+
+class LoopMonitor:
+    """Samples event-loop scheduling delay and reports stalls.
+
+    A task on the loop sleeps for ``interval`` and records how late it wakes
+    up. A watchdog thread checks that those wake-ups keep happening; when
+    the loop has been stuck for longer than ``threshold`` it logs the loop
+    thread's current stack, i.e. the callback that is blocking everyone.
+    """
+
+    def __init__(self, interval: float | None = None, threshold: float | None = None):
+        self._interval = interval or settings.loop_monitor_interval
+        self._threshold = threshold or settings.loop_lag_threshold
+        self._heartbeat = 0.0
+        self._thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self._thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self._interval)
+            self._heartbeat = now = time.monotonic()
+            LAG_SECONDS.observe(max(0.0, now - start - self._interval))
+
+    def _watch(self) -> None:
+        reported = 0.0
+        while not self._stop.wait(self._threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self._interval
+            if stalled < self._threshold or heartbeat == reported:
+                continue
+            # One report per stall, taken while the loop is still stuck
+            reported = heartbeat
+            STALLS.inc()
+            frame = sys._current_frames().get(self._thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>\n"
+            logger.warning("Event loop blocked for %.3fs, currently in:\n%s", stalled, stack.rstrip())
+
+
+def _frame_label(frame: FrameType, prefixes: list[str]) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for prefix in prefixes:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip(os.sep)
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def sample_stacks(thread_id: int, seconds: float, interval: float = 0.005) -> Counter[str]:
+    """Sample a thread's stack for ``seconds``; blocking, run it in a thread.
+
+    Returns folded stacks (root first, frames joined by ``;``) mapped to
+    sample counts.
+    """
+    # Longest first, so frames are labelled relative to the most specific path
+    prefixes = sorted({p for p in sys.path if p}, key=len, reverse=True)
+    counts: Counter[str] = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame, prefixes))
+            frame = frame.f_back
+        if stack:
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return counts
+
+
+def collapsed(counts: Counter[str]) -> str:
+    """Brendan Gregg's folded-stack format, read by flamegraph.pl, speedscope and inferno."""
+    return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
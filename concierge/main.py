@@ -1,23 +1,37 @@
 from __future__ import annotations
 
 import asyncio
+import hmac
 import logging
+import os
+import threading
 import time
+import zlib
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, Request, WebSocket
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
+from . import tracing
 from .acknowledger import Acknowledger
 from .classifier import Classifier
 from .config import settings
-from .llm.anthropic_provider import AnthropicProvider
-from .llm.ollama_provider import OllamaProvider
-from .llm.openai_provider import OpenAIProvider
+from .events import EventHub
+from .llm import provider_class
+from .llm.limiter import AdaptiveLimiter, LimitedProvider
+from .journal import IntentJournal, JournalApplier
+from .loopmon import LoopMonitor, collapsed, sample_stacks
+from .metrics import REGISTRY
+from .multiworker import WorkerClient, acquire_owner, follow_snapshot
+from .org_reader import OrgReadClient
+from .readiness import SERVING, Readiness
 from .reconciler import Reconciler
-from .spacecadet_client import SpacecadetClient
+from .sessions import SessionRegistry
+from .spacecadet_pool import SpacecadetPool
+from .supervisor import SupervisedClient
+from .task_cache import OrgWatcher, TaskCache
 from .websocket_handler import websocket_endpoint
 
 logger = logging.getLogger("concierge")
@@ -26,49 +40,193 @@ STATIC_DIR = Path(__file__).parent.parent / "static"
 
 
 def _build_provider():
-    if settings.llm_provider == "openai":
-        return OpenAIProvider()
-    if settings.llm_provider == "ollama":
-        return OllamaProvider()
-    return AnthropicProvider()
+    provider = _build_backend()
+    if settings.llm_concurrency_max > 0:
+        # Outermost, so recorded latencies don't include time spent queued
+        provider = LimitedProvider(provider, AdaptiveLimiter(settings.llm_provider))
+    return provider
+
+
+def _build_backend():
+    if settings.llm_provider == "replay":
+        from .llm.cassette import CassetteStore, ReplayProvider
+        return ReplayProvider(CassetteStore(settings.llm_cassette, create=False))
+
+    # Imports only the selected backend's module (and SDK)
+    try:
+        cls = provider_class(settings.llm_provider)
+    except ValueError:
+        logger.warning("Unknown LLM provider %r — using anthropic", settings.llm_provider)
+        cls = provider_class("anthropic")
+    provider = cls()
+
+    if settings.llm_record and settings.llm_cassette:
+        from .llm.cassette import CassetteStore, RecordingProvider
+        logger.info("Recording LLM calls to %s", settings.llm_cassette)
+        provider = RecordingProvider(provider, CassetteStore(settings.llm_cassette))
+    return provider
+
+
+async def _prefill_cache(cache: TaskCache, sc) -> None:
+    """Load the task list and build its index before the first request needs them.
+
+    Keeps retrying, with backoff, while spacecadet is unavailable.
+    """
+    delay = 1.0
+    while True:
+        wait_connected = getattr(sc, "wait_connected", None)
+        if wait_connected is not None:
+            await wait_connected()
+        await cache.refresh()
+        if cache.tasks is not None:
+            logger.info("Task cache warm with %d task(s)", len(cache.tasks))
+            return
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, settings.spacecadet_backoff_max)
+
+
+async def _log_when_settled(readiness: Readiness, started: float) -> None:
+    await readiness.wait()
+    elapsed = time.perf_counter() - started
+    if readiness.ready:
+        logger.info("Ready after %.3fs", elapsed)
+    else:
+        failed = [n for n, c in readiness.components.items() if c.state not in SERVING]
+        logger.warning("Not ready after %.3fs: %s failed", elapsed, ", ".join(failed))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logging.basicConfig(level=logging.INFO, format="%(name)s | %(message)s")
 
-    provider = _build_provider()
-    sc = SpacecadetClient()
-
-    if settings.spacecadet_path:
-        try:
+    started = time.perf_counter()
+    readiness = Readiness()
+    app.state.readiness = readiness
+    app.state.startup_timings = readiness.timings
+    # Warm-up steps that carry on while requests are already being served;
+    # /readyz reports 503 until they are done.
+    background: list[asyncio.Task] = []
+
+    with readiness.timed("provider"):
+        provider = _build_provider()
+    app.state.llm_limiter = getattr(provider, "limiter", None)
+    warm_up = getattr(provider, "warm_up", None)
+    if not settings.llm_warmup:
+        readiness.skip("llm", "CONCIERGE_LLM_WARMUP is off")
+    elif warm_up is None:
+        readiness.skip("llm", "provider has no warm-up")
+    else:
+        readiness.add("llm", required=False)
+        background.append(asyncio.create_task(readiness.run("llm", warm_up)))
+
+    # With --workers N, one worker owns spacecadet and the writes; the
+    # others reach it through the worker directory.
+    owner = follower = None
+    if settings.worker_dir and settings.spacecadet_path:
+        owner = acquire_owner(settings.worker_dir)
+        if owner is None:
+            follower = WorkerClient(settings.worker_dir)
+        logger.info("Worker %d %s", os.getpid(), "owns spacecadet" if owner else "follows the owner")
+
+    # Supervised sessions keep retrying in the background, so a spacecadet
+    # that is down at startup is picked up once it comes back.
+    sc = SpacecadetPool(client_factory=SupervisedClient)
+
+    if follower:
+        sc = follower
+        with readiness.timed("spacecadet"):
             await sc.connect()
-            logger.info("spacecadet connected")
-        except Exception as e:
-            logger.warning("spacecadet not available: %s", e)
-            sc = None
+    elif settings.spacecadet_path:
+        with readiness.timed("spacecadet"):
+            await sc.connect()
+        if settings.task_read_backend == "org":
+            if settings.org_dir:
+                sc = OrgReadClient(sc)
+                logger.info("Reading tasks directly from %s", settings.org_dir)
+            else:
+                logger.warning("CONCIERGE_TASK_READ_BACKEND=org needs CONCIERGE_ORG_DIR — using MCP")
     else:
         logger.warning("CONCIERGE_SPACECADET_PATH not set — running without spacecadet")
+        readiness.skip("spacecadet", "CONCIERGE_SPACECADET_PATH not set")
         sc = None
 
-    app.state.spacecadet_client = sc
-    app.state.classifier = Classifier(provider)
-    app.state.reconciler = Reconciler(sc) if sc else None
-    app.state.acknowledger = Acknowledger(provider)
-    app.state.task_cache = None
-    app.state.task_cache_time = 0
-    app.state.task_cache_lock = asyncio.Lock()
-    app.state.write_queue = asyncio.Queue()
+    with readiness.timed("pipeline"):
+        app.state.spacecadet_client = sc
+        app.state.classifier = Classifier(provider)
+        app.state.event_hub = EventHub()
+        app.state.task_cache = TaskCache(
+            sc, hub=app.state.event_hub, on_refresh=owner.publish_tasks if owner else None
+        ) if sc else None
+        app.state.reconciler = Reconciler(sc) if sc else None
+        app.state.acknowledger = Acknowledger(provider)
+        app.state.write_queue = asyncio.Queue()
+        app.state.sessions = SessionRegistry()
+
+    cache = app.state.task_cache
+    if cache:
+        readiness.add("task_cache")
+        background.append(
+            asyncio.create_task(readiness.run("task_cache", lambda: _prefill_cache(cache, sc)))
+        )
+    else:
+        readiness.skip("task_cache", "no spacecadet")
+
+    journal = None
+    if settings.optimistic_ack and app.state.reconciler is not None:
+        with readiness.timed("journal"):
+            journal = JournalApplier(
+                IntentJournal(),
+                app.state.reconciler,
+                sc,
+                app.state.sessions,
+                task_cache=cache,
+                apply=not follower,
+            )
+            journal.start()
+    app.state.intent_journal = journal
+
+    if owner:
+        with readiness.timed("worker_rpc"):
+            await owner.serve(sc, _apply_remote_writes)
+    elif follower:
+        background.append(asyncio.create_task(follow_snapshot(follower, cache)))
+
+    watcher = None
+    if sc and settings.org_dir and not follower:
+        with readiness.timed("org_watcher"):
+            watcher = OrgWatcher(cache)
+            watcher.start()
 
     writer_task = asyncio.create_task(_write_worker())
 
+    monitor = None
+    if settings.loop_monitor_interval > 0:
+        with readiness.timed("loop_monitor"):
+            monitor = LoopMonitor()
+            monitor.start()
+
+    logger.info("Serving after %.3fs", time.perf_counter() - started)
+    background.append(asyncio.create_task(_log_when_settled(readiness, started)))
     yield
 
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    if monitor:
+        await monitor.stop()
     writer_task.cancel()
     try:
         await writer_task
     except asyncio.CancelledError:
         pass
+    if watcher:
+        await watcher.stop()
+    if app.state.task_cache:
+        await app.state.task_cache.close()
+    if journal:
+        await journal.stop()
+    if owner:
+        await owner.close()
     if sc:
         await sc.close()
 
@@ -91,57 +249,210 @@ async def tasks_page():
     return FileResponse(STATIC_DIR / "tasks.html", headers=NO_CACHE)
 
 
-CACHE_TTL = 30  # seconds
+def _refresh_cache():
+    # Refresh once the queue drains so an intermediate snapshot doesn't
+    # clobber optimistic updates for writes that haven't landed yet.
+    if app.state.task_cache is not None and app.state.write_queue.empty():
+        app.state.task_cache.request_refresh()
 
 
-async def _get_tasks():
-    """Return cached task list, refreshing if stale."""
-    sc = app.state.spacecadet_client
-    if sc is None:
-        return None
-    now = time.monotonic()
-    if app.state.task_cache is not None and now - app.state.task_cache_time < CACHE_TTL:
-        return app.state.task_cache
-    async with app.state.task_cache_lock:
-        # Double-check after acquiring lock
-        now = time.monotonic()
-        if app.state.task_cache is not None and now - app.state.task_cache_time < CACHE_TTL:
-            return app.state.task_cache
-        result = await sc.list_tasks()
-        app.state.task_cache = result if isinstance(result, list) else []
-        app.state.task_cache_time = time.monotonic()
-        return app.state.task_cache
-
-
-def _invalidate_cache():
-    app.state.task_cache = None
-    app.state.task_cache_time = 0
+def _publish_write_failed(tool_name: str, kwargs: dict, error: str) -> None:
+    # Lets clients roll back optimistic updates; the refresh that follows
+    # will also deliver the task's real state as a task_changes event.
+    app.state.event_hub.publish(
+        "task_write_failed",
+        {"tool": tool_name, "id": kwargs.get("id"), "error": error},
+    )
 
 
 async def _write_worker():
-    """Process spacecadet writes sequentially in the background."""
+    """Process spacecadet writes sequentially in the background.
+
+    Each queue item is a batch of ``(tool_name, kwargs)`` writes that is
+    applied in order and followed by a single cache refresh.
+    """
     while True:
-        tool_name, kwargs = await app.state.write_queue.get()
+        batch = await app.state.write_queue.get()
         try:
-            sc = app.state.spacecadet_client
-            if sc:
-                result = await sc.call_tool(tool_name, kwargs)
-                if isinstance(result, dict) and "error" in result:
-                    logger.error("Background write %s failed: %s", tool_name, result)
-                _invalidate_cache()
-        except Exception as e:
-            logger.error("Background write %s error: %s", tool_name, e)
-            _invalidate_cache()
+            with tracing.trace("write_batch", writes=len(batch)):
+                for tool_name, kwargs, error in await _apply_writes(batch):
+                    _publish_write_failed(tool_name, kwargs, error)
+            _refresh_cache()
         finally:
             app.state.write_queue.task_done()
 
 
+# Serializes this worker's queued writes with those sent by other workers
+_write_lock = asyncio.Lock()
+
+
+async def _apply_writes(batch: list[tuple[str, dict]]) -> list[tuple[str, dict, str]]:
+    """Apply ``batch`` in order; return the writes that failed, with their error."""
+    sc = app.state.spacecadet_client
+    if not sc:
+        return []
+    write_batch = getattr(sc, "write_batch", None)
+    if write_batch is not None:
+        # A follower worker: the owner applies the batch
+        try:
+            return await write_batch(batch)
+        except Exception as e:
+            logger.error("Background write batch error: %s", e)
+            return [(tool_name, kwargs, str(e)) for tool_name, kwargs in batch]
+
+    failures = []
+    async with _write_lock:
+        # Hold queued writes while spacecadet restarts rather than failing them
+        wait_connected = getattr(sc, "wait_connected", None)
+        if wait_connected is not None:
+            await wait_connected()
+        for tool_name, kwargs in batch:
+            try:
+                result = await sc.call_tool(tool_name, kwargs)
+            except Exception as e:
+                logger.error("Background write %s error: %s", tool_name, e)
+                failures.append((tool_name, kwargs, str(e)))
+                continue
+            if isinstance(result, dict) and "error" in result:
+                logger.error("Background write %s failed: %s", tool_name, result)
+                failures.append((tool_name, kwargs, result["error"]))
+    return failures
+
+
+async def _apply_remote_writes(batch: list[tuple[str, dict]]) -> list[tuple[str, dict, str]]:
+    """A batch from a follower worker; it reports the failures to its own clients."""
+    failures = await _apply_writes(batch)
+    _refresh_cache()
+    return failures
+
+
+# Fields accepted by the PATCH endpoints: name -> (cache field, update_task arg)
+TASK_UPDATE_FIELDS = {
+    "state": ("state", "new_state"),
+    "priority": ("priority", "priority"),
+}
+
+
+TASK_PRIORITIES = frozenset({"A", "B", "C", "D"})
+
+
+def _task_update(task_id: str, changes: dict) -> tuple[dict, dict]:
+    """Split PATCH ``changes`` into cache changes and update_task kwargs.
+
+    Raises ``ValueError`` for unknown fields and for values spacecadet
+    wouldn't accept: a state outside the configured TODO keywords, or a
+    priority other than A, B or C.
+    """
+    unknown = set(changes) - set(TASK_UPDATE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported fields: {sorted(unknown)}")
+    keywords = {k.strip() for k in settings.org_todo_keywords.split(",") if k.strip()}
+    cache_changes: dict = {}
+    kwargs: dict = {"id": task_id}
+    for name, value in changes.items():
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"{name} must be a non-empty string")
+        if name == "state" and value not in keywords:
+            raise ValueError(f"Unknown state: {value!r}")
+        if name == "priority" and value not in TASK_PRIORITIES:
+            raise ValueError(f"Unknown priority: {value!r}")
+        cache_field, arg = TASK_UPDATE_FIELDS[name]
+        cache_changes[cache_field] = value
+        kwargs[arg] = value
+    return cache_changes, kwargs
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+
 @app.get("/api/tasks")
-async def api_tasks(state: str | None = None, priority: str | None = None):
-    tasks = await _get_tasks()
-    if tasks is None:
+async def api_tasks(
+    request: Request,
+    state: str | None = None,
+    priority: str | None = None,
+    tag: str | None = None,
+    deadline_from: str | None = None,
+    deadline_to: str | None = None,
+    sort: str | None = None,
+    order: str = "asc",
+    cursor: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+):
+    cache = app.state.task_cache
+    if cache is None:
+        return JSONResponse({"error": "spacecadet not connected"}, status_code=503)
+    index = await cache.get_index()
+    # Same revision + same query always renders the same bytes, so the
+    # ETag can be strong without hashing the body.
+    query_hash = zlib.crc32(request.url.query.encode())
+    etag = f'"{cache.revision}-{query_hash:08x}"'
+    headers = {"ETag": etag, "X-Revision": str(cache.revision), "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    try:
+        tasks, next_cursor, total = index.query(
+            state=state,
+            priority=priority,
+            tag=tag,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+            sort=sort,
+            descending=order == "desc",
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    # Pagination metadata travels in headers so the body stays a plain list
+    headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return JSONResponse([t.to_dict() for t in tasks], headers=headers)
+
+
+@app.get("/api/tasks/changes")
+async def api_task_changes(since: int):
+    cache = app.state.task_cache
+    if cache is None:
         return JSONResponse({"error": "spacecadet not connected"}, status_code=503)
-    return tasks
+    await cache.get()
+    changes = cache.changes_since(since)
+    if changes is None:
+        return {"revision": cache.revision, "reset": True}
+    return changes
+
+
+SSE_KEEPALIVE = 15.0  # seconds
+
+
+@app.get("/api/tasks/events")
+async def api_task_events(request: Request):
+    cache = app.state.task_cache
+    if cache is None:
+        return JSONResponse({"error": "spacecadet not connected"}, status_code=503)
+    await cache.get()
+    sub = app.state.event_hub.subscribe()
+
+    async def stream():
+        with sub:
+            yield f"event: hello\ndata: {cache.revision}\n\n".encode()
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.get(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield event.sse
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.patch("/api/tasks/{task_id}")
@@ -153,17 +464,136 @@ async def api_update_task(task_id: str, request: Request):
     new_state = body.get("state")
     if not new_state:
         return JSONResponse({"error": "state is required"}, status_code=400)
+    try:
+        cache_changes, kwargs = _task_update(task_id, {"state": new_state})
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
     # Optimistically update cache
     if app.state.task_cache is not None:
-        for t in app.state.task_cache:
-            if t.get("id") == task_id:
-                t["todo"] = new_state
-                break
+        app.state.task_cache.update(task_id, cache_changes)
     # Enqueue the slow spacecadet write and return immediately
-    app.state.write_queue.put_nowait(("update_task", {"id": task_id, "new_state": new_state}))
+    app.state.write_queue.put_nowait([("update_task", kwargs)])
     return {"status": "ok", "queued": True}
 
 
+@app.patch("/api/tasks")
+async def api_update_tasks(request: Request):
+    """Bulk update: body is a list of ``{"id": ..., "changes": {...}}``."""
+    sc = app.state.spacecadet_client
+    if sc is None:
+        return JSONResponse({"error": "spacecadet not connected"}, status_code=503)
+    body = await request.json()
+    if not isinstance(body, list):
+        return JSONResponse({"error": "expected a list of {id, changes}"}, status_code=400)
+
+    cache = app.state.task_cache
+    index = cache.index if cache is not None else None
+    results = []
+    # Coalesce repeated ids so each task gets one update_task call
+    merged: dict[str, dict] = {}
+    for item in body:
+        task_id = item.get("id") if isinstance(item, dict) else None
+        changes = item.get("changes") if isinstance(item, dict) else None
+        if not task_id or not isinstance(changes, dict) or not changes:
+            results.append({"id": task_id, "status": "invalid", "error": "id and changes are required"})
+            continue
+        try:
+            _task_update(task_id, changes)
+        except ValueError as e:
+            results.append({"id": task_id, "status": "invalid", "error": str(e)})
+            continue
+        if index is not None and index.get(task_id) is None:
+            results.append({"id": task_id, "status": "not_found"})
+            continue
+        merged.setdefault(task_id, {}).update(changes)
+        results.append({"id": task_id, "status": "queued"})
+
+    writes = []
+    updates = []
+    for task_id, changes in merged.items():
+        cache_changes, kwargs = _task_update(task_id, changes)
+        updates.append((task_id, cache_changes))
+        writes.append(("update_task", kwargs))
+
+    if writes:
+        if cache is not None:
+            cache.update_many(updates)
+        app.state.write_queue.put_nowait(writes)
+    return {"results": results, "queued": len(writes)}
+
+
+@app.get("/api/sessions")
+async def api_sessions():
+    return app.state.sessions.snapshot()
+
+
+@app.get("/api/metrics")
+async def api_metrics():
+    return REGISTRY.snapshot()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(
+        REGISTRY.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/api/llm")
+async def api_llm():
+    limiter = getattr(app.state, "llm_limiter", None)
+    if limiter is None:
+        return JSONResponse({"error": "no LLM concurrency limit"}, status_code=404)
+    return limiter.snapshot()
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: always 200 while the process serves requests, with each component's state."""
+    return {"status": "ok", **app.state.readiness.snapshot()}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 503 until spacecadet is connected and the task cache and LLM are warm."""
+    snapshot = app.state.readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+@app.get("/api/spacecadet")
+async def api_spacecadet():
+    sc = app.state.spacecadet_client
+    if sc is None:
+        return JSONResponse({"error": "spacecadet not connected"}, status_code=503)
+    return {"sessions": sc.stats(), "write_queue": app.state.write_queue.qsize()}
+
+
+_profile_lock = asyncio.Lock()
+
+
+def _check_debug_token(request: Request) -> None:
+    if not settings.debug_token:
+        raise HTTPException(status_code=404)
+    supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(supplied.encode(), settings.debug_token.encode()):
+        raise HTTPException(status_code=401, detail="invalid debug token")
+
+
+@app.get("/debug/profile")
+async def debug_profile(request: Request, seconds: float = Query(10.0, gt=0, le=120)):
+    """Sample the event-loop thread for ``seconds`` and return folded stacks.
+
+    Feed the output to flamegraph.pl, inferno or speedscope.
+    """
+    _check_debug_token(request)
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="a profile is already running")
+    async with _profile_lock:
+        counts = await asyncio.to_thread(sample_stacks, threading.get_ident(), seconds)
+    return Response(collapsed(counts), media_type="text/plain; charset=utf-8")
+
+
 @app.websocket("/ws")
 async def ws(websocket: WebSocket):
     await websocket_endpoint(websocket)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _label_str(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def snapshot(self) -> Any:
+        return self.value
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{_label_str(self.labels)} {_num(self.value)}"]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Any:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+    def samples(self) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, n in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += n
+            le = f'le="{_num(bound)}"'
+            lines.append(f"{self.name}_bucket{_label_str(self.labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_label_str(self.labels)} {_num(self.sum)}")
+        lines.append(f"{self.name}_count{_label_str(self.labels)} {self.count}")
+        return lines
+
+
+class Registry:
+    """Process-wide metrics, looked up by name so modules can share them."""
+
+    def __init__(self):
+        self._metrics: dict[tuple[str, Labels], Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, labels: dict[str, str] | None, **kwargs):
+        key = (name, tuple(sorted((labels or {}).items())))
+        metric = self._metrics.get(key)
+        if metric is not None and type(metric) is cls:
+            return metric
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = cls(name, help, key[1], **kwargs)
+            elif type(metric) is not cls:
+                raise TypeError(f"Metric {name} is already a {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str, help: str = "", labels: dict[str, str] | None = None) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = "", labels: dict[str, str] | None = None) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(
+        self, name: str, help: str = "", labels: dict[str, str] | None = None, **kwargs
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labels, **kwargs)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            name + _label_str(labels): m.snapshot()
+            for (name, labels), m in sorted(self._metrics.items())
+        }
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        seen: set[str] = set()
+        for (name, _), metric in sorted(self._metrics.items()):
+            if name not in seen:
+                seen.add(name)
+                if metric.help:
+                    lines.append(f"# HELP {name} {metric.help}")
+                lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
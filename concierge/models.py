@@ -5,7 +5,9 @@ from datetime import UTC, datetime
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .task_record import Task
 
 
 class MessageStatus(str, Enum):
@@ -67,6 +69,20 @@ class WSOutgoing(BaseModel):
     type: str
     data: dict[str, Any] = Field(default_factory=dict)
 
+    def to_json(self) -> str:
+        return self.model_dump_json()
+
+
+class _StaticFrame(WSOutgoing):
+    """A frame that never changes, serialized once and reused."""
+
+    _json: str = PrivateAttr(default="")
+
+    def to_json(self) -> str:
+        if not self._json:
+            self._json = self.model_dump_json()
+        return self._json
+
 
 def ws_status_update(message_id: str, status: MessageStatus) -> WSOutgoing:
     return WSOutgoing(
@@ -75,11 +91,14 @@ def ws_status_update(message_id: str, status: MessageStatus) -> WSOutgoing:
     )
 
 
+_SYSTEM_STATUS_FRAMES = {
+    status: _StaticFrame(type="system_status", data={"status": status.value})
+    for status in SystemStatus
+}
+
+
 def ws_system_status(status: SystemStatus) -> WSOutgoing:
-    return WSOutgoing(
-        type="system_status",
-        data={"status": status.value},
-    )
+    return _SYSTEM_STATUS_FRAMES[status]
 
 
 def ws_response(text: str) -> WSOutgoing:
@@ -89,10 +108,48 @@ def ws_response(text: str) -> WSOutgoing:
     )
 
 
-def ws_task_list(tasks: list[dict], header: str = "") -> WSOutgoing:
+def ws_task_list(
+    tasks: list[Task],
+    header: str = "",
+    list_id: str | None = None,
+    total: int | None = None,
+    omitted: int = 0,
+) -> WSOutgoing:
+    """First page of a task list.
+
+    ``total`` is how many tasks the client can page through with
+    ``task_list_more``; ``omitted`` counts matches beyond the server cap.
+    """
     return WSOutgoing(
         type="task_list",
-        data={"tasks": tasks, "header": header, "timestamp": datetime.now(UTC).isoformat()},
+        data={
+            "tasks": [t.to_dict() for t in tasks],
+            "header": header,
+            "list_id": list_id,
+            "total": len(tasks) if total is None else total,
+            "omitted": omitted,
+            "timestamp": datetime.now(UTC).isoformat(),
+        },
+    )
+
+
+def ws_task_list_chunk(list_id: str, tasks: list[Task], offset: int) -> WSOutgoing:
+    return WSOutgoing(
+        type="task_list_chunk",
+        data={"list_id": list_id, "offset": offset, "tasks": [t.to_dict() for t in tasks]},
+    )
+
+
+def ws_correction(text: str, journal_id: int, error: str) -> WSOutgoing:
+    """An earlier acknowledgement turned out wrong: the change was not applied."""
+    return WSOutgoing(
+        type="correction",
+        data={
+            "text": text,
+            "journal_id": journal_id,
+            "error": error,
+            "timestamp": datetime.now(UTC).isoformat(),
+        },
     )
 
 
@@ -0,0 +1,435 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import itertools
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from .config import settings
+from .task_record import Task, dumps, loads
+
+logger = logging.getLogger("concierge")
+
+LOCK_FILE = "owner.lock"
+SOCKET_FILE = "owner.sock"
+SNAPSHOT_FILE = "tasks.snapshot"
+
+# Snapshot file: magic, sequence (odd while a write is in progress),
+# revision, payload length; the JSON task list follows.
+HEADER = struct.Struct("<8sQQQ")
+MAGIC = b"CCSNAP01"
+SEQ_OFFSET = 8
+REVISION_LENGTH = struct.Struct("<QQ")
+REVISION_OFFSET = 16
+U64 = struct.Struct("<Q")
+MIN_SNAPSHOT_SIZE = 64 * 1024
+# Tries at a consistent snapshot read before giving up; reads run on the
+# event loop, so they never wait for the owner to finish writing
+SNAPSHOT_READ_ATTEMPTS = 100
+
+# RPC frames: a 4-byte length, then a JSON message
+FRAME = struct.Struct("<I")
+
+WriteFailure = tuple[str, dict, str]
+
+
+class RemoteError(RuntimeError):
+    """The owner worker could not be reached or its call failed."""
+
+
+class SnapshotWriter:
+    """Publishes the task list to an mmap'd file for the other workers.
+
+    Uses a sequence lock: the sequence number is odd while the payload is
+    being rewritten, and readers retry until they copy the payload between
+    two identical even values. A new owner reuses the file in place, so
+    workers that already mapped it see its updates without reopening.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < MIN_SNAPSHOT_SIZE:
+            os.ftruncate(self._fd, MIN_SNAPSHOT_SIZE)
+        self._map = mmap.mmap(self._fd, 0)
+        magic, seq, revision, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            seq = revision = 0
+            HEADER.pack_into(self._map, 0, MAGIC, 0, 0, 0)
+        # Carry on from a previous owner so followers keep seeing changes
+        self._seq = seq + (seq & 1)
+        self.revision = revision
+        self._last: bytes | None = None
+
+    def publish(self, payload: bytes) -> int:
+        if payload == self._last:
+            return self.revision
+        needed = HEADER.size + len(payload)
+        if needed > len(self._map):
+            self._map.close()
+            os.ftruncate(self._fd, 1 << (needed - 1).bit_length())
+            self._map = mmap.mmap(self._fd, 0)
+        self._seq += 1
+        U64.pack_into(self._map, SEQ_OFFSET, self._seq)
+        self._map[HEADER.size:needed] = payload
+        self.revision += 1
+        REVISION_LENGTH.pack_into(self._map, REVISION_OFFSET, self.revision, len(payload))
+        self._seq += 1
+        U64.pack_into(self._map, SEQ_OFFSET, self._seq)
+        self._last = payload
+        return self.revision
+
+    def publish_tasks(self, tasks: list[Task]) -> None:
+        try:
+            self.publish(dumps([t.to_dict() for t in tasks]))
+        except OSError as e:
+            logger.warning("Could not publish task snapshot: %s", e)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+class SnapshotReader:
+    """Reads the owner's task snapshot; see ``SnapshotWriter``."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._map: mmap.mmap | None = None
+
+    def _open(self) -> bool:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        try:
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return False
+        return True
+
+    def revision(self) -> int | None:
+        """The published revision, or ``None`` before the first publish."""
+        if self._map is None and not self._open():
+            return None
+        magic, _, revision, _ = HEADER.unpack_from(self._map, 0)
+        return revision if magic == MAGIC and revision else None
+
+    def read(self) -> tuple[int, bytes] | None:
+        """A consistent ``(revision, payload)``, or ``None`` before the first publish.
+
+        Also ``None`` when the owner is mid-write on every attempt; callers
+        then ask the owner directly instead of waiting for it.
+        """
+        if self._map is None and not self._open():
+            return None
+        for _ in range(SNAPSHOT_READ_ATTEMPTS):
+            magic, seq, revision, length = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or not revision:
+                return None
+            if seq & 1:
+                continue
+            if HEADER.size + length > len(self._map):
+                # The owner grew the file; map it again at its new size
+                self._open()
+                continue
+            payload = self._map[HEADER.size:HEADER.size + length]
+            if U64.unpack_from(self._map, SEQ_OFFSET)[0] == seq:
+                return revision, payload
+        logger.debug("Task snapshot busy after %d reads — asking the owner", SNAPSHOT_READ_ATTEMPTS)
+        return None
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Any:
+    (size,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return loads(await reader.readexactly(size))
+
+
+def _frame(message: dict[str, Any]) -> bytes:
+    data = dumps(message)
+    return FRAME.pack(len(data)) + data
+
+
+class Owner:
+    """The worker holding the owner lock: it runs spacecadet and the writes.
+
+    The lock is an ``flock`` on a file in the worker directory, held for the
+    life of the process; the kernel drops it when the process dies, and the
+    worker uvicorn starts in its place takes over. The owner publishes the
+    task list (``publish_tasks``) and answers the other workers' calls on a
+    Unix socket (``serve``).
+    """
+
+    def __init__(self, directory: str | Path, lock_fd: int):
+        self.directory = Path(directory)
+        self._lock_fd = lock_fd
+        self.snapshot = SnapshotWriter(self.directory / SNAPSHOT_FILE)
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._client = None
+        self._write_batch: Callable[[list], Awaitable[list[WriteFailure]]] | None = None
+
+    def publish_tasks(self, tasks: list[Task]) -> None:
+        self.snapshot.publish_tasks(tasks)
+
+    async def serve(
+        self, client, write_batch: Callable[[list], Awaitable[list[WriteFailure]]]
+    ) -> None:
+        self._client = client
+        self._write_batch = write_batch
+        path = self.directory / SOCKET_FILE
+        # Left over from an owner that died; holding the lock makes it ours
+        path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._serve, path=str(path))
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+
+        async def answer(request: dict[str, Any]) -> None:
+            response: dict[str, Any] = {"id": request.get("id")}
+            try:
+                response["result"] = await self._dispatch(request["method"], request.get("params", {}))
+            except Exception as e:
+                response["error"] = f"{type(e).__name__}: {e}"
+            try:
+                async with lock:
+                    writer.write(_frame(response))
+                    await writer.drain()
+            except ConnectionError:
+                # The worker went away; a write it sent has still been applied
+                pass
+
+        try:
+            while True:
+                task = asyncio.create_task(answer(await _read_frame(reader)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # Calls in flight finish either way, so a batch is never half-applied
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, method: str, params: dict[str, Any]) -> Any:
+        if method == "call_tool":
+            return await self._client.call_tool(params["name"], params["args"])
+        if method == "write_batch":
+            return await self._write_batch([tuple(w) for w in params["batch"]])
+        if method == "ping":
+            return {"pid": os.getpid(), "revision": self.snapshot.revision}
+        raise ValueError(f"unknown method {method!r}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            (self.directory / SOCKET_FILE).unlink(missing_ok=True)
+        self.snapshot.close()
+        os.close(self._lock_fd)
+
+
+def acquire_owner(directory: str | Path) -> Owner | None:
+    """Become the owner if no other worker is; ``None`` means follow."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    fd = os.open(directory / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    os.ftruncate(fd, 0)
+    os.write(fd, f"{os.getpid()}\n".encode())
+    return Owner(directory, fd)
+
+
+class WorkerClient:
+    """The ``SpacecadetClient`` interface for workers that don't own spacecadet.
+
+    ``list_tasks`` without arguments is read from the owner's snapshot
+    (unless it is mid-write, then it is asked for like everything else); all
+    other calls, and queued write batches, go to the owner over its Unix
+    socket. When the owner goes away the connection is re-established in
+    the background, and calls wait for it for up to ``timeout``.
+    """
+
+    def __init__(self, directory: str | Path, timeout: float | None = None):
+        self.directory = Path(directory)
+        self._timeout = timeout or settings.worker_rpc_timeout
+        self._snapshot = SnapshotReader(self.directory / SNAPSHOT_FILE)
+        self._writer: asyncio.StreamWriter | None = None
+        self._receiver: asyncio.Task | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._connected = asyncio.Event()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._closing = False
+        self.calls = 0
+        self.errors = 0
+        self.reconnects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    async def connect(self) -> None:
+        """Connect if the owner is up; otherwise keep retrying in the background."""
+        try:
+            await self._open()
+        except OSError as e:
+            logger.info("Owner worker not reachable yet (%s) — retrying in background", e)
+            self._schedule_reconnect()
+
+    async def wait_connected(self) -> None:
+        await self._connected.wait()
+
+    async def _open(self) -> None:
+        reader, self._writer = await asyncio.open_unix_connection(
+            str(self.directory / SOCKET_FILE)
+        )
+        self._receiver = asyncio.create_task(self._receive(reader))
+        self._connected.set()
+
+    async def _receive(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                message = await _read_frame(reader)
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(RemoteError(message["error"]))
+                else:
+                    future.set_result(message.get("result"))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            if not self._closing:
+                logger.warning("Lost connection to the owner worker: %s", e)
+        finally:
+            self._connected.clear()
+            self._writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(RemoteError("connection to the owner worker lost"))
+            self._pending.clear()
+            if not self._closing:
+                self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 0.1
+        while not self._closing:
+            await asyncio.sleep(delay)
+            try:
+                await self._open()
+            except OSError:
+                delay = min(delay * 2, settings.spacecadet_backoff_max)
+                continue
+            self.reconnects += 1
+            logger.info("Reconnected to the owner worker")
+            return
+
+    async def _call(self, method: str, params: dict[str, Any]) -> Any:
+        self.calls += 1
+        try:
+            await asyncio.wait_for(self._connected.wait(), self._timeout)
+        except asyncio.TimeoutError:
+            self.errors += 1
+            raise RemoteError(f"owner worker unavailable for {self._timeout:.0f}s") from None
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(_frame({"id": request_id, "method": method, "params": params}))
+            return await asyncio.wait_for(future, self._timeout)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    def snapshot_revision(self) -> int | None:
+        return self._snapshot.revision()
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> Any:
+        if name == "list_tasks" and not args:
+            snapshot = self._snapshot.read()
+            if snapshot is not None:
+                return loads(snapshot[1])
+        return await self._call("call_tool", {"name": name, "args": args})
+
+    async def write_batch(self, batch: list[tuple[str, dict]]) -> list[WriteFailure]:
+        """Have the owner apply ``batch``; returns the writes that failed."""
+        failures = await self._call("write_batch", {"batch": batch})
+        return [tuple(f) for f in failures]
+
+    async def list_tasks(self, **kwargs) -> Any:
+        return await self.call_tool("list_tasks", kwargs)
+
+    async def add_task(self, **kwargs) -> dict:
+        return await self.call_tool("add_task", kwargs)
+
+    async def update_task(self, **kwargs) -> dict:
+        return await self.call_tool("update_task", kwargs)
+
+    async def delete_task(self, **kwargs) -> dict:
+        return await self.call_tool("delete_task", kwargs)
+
+    async def get_task(self, **kwargs) -> dict:
+        return await self.call_tool("get_task", kwargs)
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [{
+            "name": "owner",
+            "connected": self.connected,
+            "calls": self.calls,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "snapshot_revision": self.snapshot_revision(),
+        }]
+
+    async def close(self) -> None:
+        self._closing = True
+        for task in (self._reconnect_task, self._receiver):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._writer is not None:
+            self._writer.close()
+        self._connected.clear()
+        self._snapshot.close()
+
+
+async def follow_snapshot(client: WorkerClient, cache, interval: float | None = None) -> None:
+    """Refresh ``cache`` whenever the owner publishes a new snapshot revision."""
+    interval = interval or settings.worker_snapshot_poll
+    seen = None
+    while True:
+        revision = client.snapshot_revision()
+        if revision is not None and revision != seen:
+            seen = revision
+            cache.request_refresh()
+        await asyncio.sleep(interval)
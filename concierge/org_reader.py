@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import mmap
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any
+
+from .config import settings
+from .spacecadet_client import READ_TOOLS
+
+logger = logging.getLogger("concierge")
+
+HEADLINE_RE = re.compile(rb"^(\*+)[ \t]+(.*?)[ \t]*$", re.MULTILINE)
+PRIORITY_RE = re.compile(r"^\[#([A-Z])\][ \t]*")
+TAGS_RE = re.compile(r"[ \t]+(:[^\s:]+(?::[^\s:]+)*:)$")
+PLANNING_RE = re.compile(rb"(SCHEDULED|DEADLINE):[ \t]*(<[^>]*>)")
+PLANNING_LINE_RE = re.compile(rb"^[ \t]*(?:SCHEDULED|DEADLINE|CLOSED):")
+ID_RE = re.compile(rb"^[ \t]*:ID:[ \t]*(\S+)[ \t]*$", re.MULTILINE)
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+MAX_META_BYTES = 2048
+
+
+def _parse_headline(text: str, keywords: frozenset[str]) -> dict[str, Any] | None:
+    keyword, _, rest = text.partition(" ")
+    if keyword not in keywords:
+        return None
+    rest = rest.strip()
+
+    priority = None
+    match = PRIORITY_RE.match(rest)
+    if match:
+        priority = match.group(1)
+        rest = rest[match.end():]
+
+    tags: list[str] = []
+    match = TAGS_RE.search(rest)
+    if match:
+        tags = [t for t in match.group(1).split(":") if t]
+        rest = rest[:match.start()]
+
+    return {"todo": keyword, "priority": priority, "heading": rest.strip(), "tags": tags}
+
+
+def _line_at(buf, pos: int, end: int) -> tuple[bytes, int]:
+    """The line starting at ``pos`` (stopping at ``end``) and the offset after it."""
+    if pos >= end:
+        return b"", end
+    newline = buf.find(b"\n", pos, end)
+    if newline == -1:
+        return buf[pos:end], end
+    return buf[pos:newline], newline + 1
+
+
+def _date(value: str | None) -> str | None:
+    # "<2025-01-10 Fri 09:00>" -> "2025-01-10", as spacecadet reports it
+    match = DATE_RE.search(value) if value else None
+    return match.group(0) if match else value
+
+
+def parse_org(buf, keywords: frozenset[str]) -> list[dict[str, Any]]:
+    """Extract TODO-keyword headlines from an org buffer (bytes or mmap).
+
+    Only the headline, the planning line right after it and the
+    ``:PROPERTIES:`` drawer after that are decoded; the regex runs over the
+    buffer in place, so body text between headlines is never copied out of
+    the mmap. Headlines without an ``:ID:`` are skipped, as spacecadet
+    skips them.
+    """
+    tasks = []
+    headlines = list(HEADLINE_RE.finditer(buf))
+    for i, match in enumerate(headlines):
+        task = _parse_headline(match.group(2).decode("utf-8", "replace"), keywords)
+        if task is None:
+            continue
+
+        end = headlines[i + 1].start() if i + 1 < len(headlines) else len(buf)
+        line, pos = _line_at(buf, match.end() + 1, end)
+        planning = {}
+        if PLANNING_LINE_RE.match(line):
+            planning = {k.decode().lower(): v.decode() for k, v in PLANNING_RE.findall(line)}
+            line, pos = _line_at(buf, pos, end)
+
+        id_match = None
+        if line.strip() == b":PROPERTIES:":
+            drawer = buf[pos:min(end, pos + MAX_META_BYTES)]
+            drawer_end = drawer.find(b":END:")
+            if drawer_end != -1:
+                id_match = ID_RE.search(drawer, 0, drawer_end)
+        if id_match is None:
+            continue
+
+        task["id"] = id_match.group(1).decode()
+        task["deadline"] = _date(planning.get("deadline"))
+        task["scheduled"] = _date(planning.get("scheduled"))
+        tasks.append(task)
+    return tasks
+
+
+def _read_file(path: Path, keywords: frozenset[str]) -> list[dict[str, Any]]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return parse_org(buf, keywords)
+
+
+class OrgTaskReader:
+    """Read-only task listing straight from the org files spacecadet manages.
+
+    Results are cached per file by ``(mtime_ns, size)``; a listing only
+    re-parses files that changed since the previous one.
+    """
+
+    def __init__(self, directory: str | None = None, keywords: str | None = None):
+        self._directory = Path(directory or settings.org_dir)
+        self._keywords = frozenset(
+            k.strip() for k in (keywords or settings.org_todo_keywords).split(",") if k.strip()
+        )
+        self._files: dict[Path, tuple[tuple[int, int], list[dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def list_tasks(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return self._list_tasks()
+
+    def _list_tasks(self) -> list[dict[str, Any]]:
+        seen: dict[Path, tuple[tuple[int, int], list[dict[str, Any]]]] = {}
+        tasks: list[dict[str, Any]] = []
+        for path in sorted(self._directory.rglob("*.org")):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            key = (st.st_mtime_ns, st.st_size)
+            cached = self._files.get(path)
+            if cached is None or cached[0] != key:
+                try:
+                    cached = (key, _read_file(path, self._keywords))
+                except OSError as e:
+                    logger.warning("Failed to read %s: %s", path, e)
+                    continue
+            seen[path] = cached
+            tasks.extend(dict(t) for t in cached[1])
+        self._files = seen
+        return tasks
+
+
+class OrgReadClient:
+    """Serve reads from the org files and send everything else to spacecadet.
+
+    Wraps any client with the ``SpacecadetClient`` interface. ``list_tasks``
+    without arguments and ``get_task`` by id are answered locally; calls
+    with filters the reader doesn't understand, and all mutations, go
+    through MCP as before.
+    """
+
+    def __init__(self, client, reader: OrgTaskReader | None = None):
+        self._client = client
+        self._reader = reader or OrgTaskReader()
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> Any:
+        if name == "list_tasks" and not args:
+            return await asyncio.to_thread(self._reader.list_tasks)
+        if name == "get_task" and set(args) == {"id"}:
+            tasks = await asyncio.to_thread(self._reader.list_tasks)
+            for task in tasks:
+                if task["id"] == args["id"]:
+                    return task
+        elif name in READ_TOOLS:
+            logger.debug("Org reader can't serve %s(%s) — using MCP", name, args)
+        return await self._client.call_tool(name, args)
+
+    async def list_tasks(self, **kwargs) -> Any:
+        return await self.call_tool("list_tasks", kwargs)
+
+    async def add_task(self, **kwargs) -> dict:
+        return await self.call_tool("add_task", kwargs)
+
+    async def update_task(self, **kwargs) -> dict:
+        return await self.call_tool("update_task", kwargs)
+
+    async def delete_task(self, **kwargs) -> dict:
+        return await self.call_tool("delete_task", kwargs)
+
+    async def get_task(self, **kwargs) -> dict:
+        return await self.call_tool("get_task", kwargs)
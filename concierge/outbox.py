@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable
+
+from .config import settings
+from .events import RESYNC, Event
+from .metrics import REGISTRY
+from .models import WSOutgoing
+
+logger = logging.getLogger("concierge")
+
+POLICIES = ("drop", "merge", "disconnect")
+
+DEPTH = REGISTRY.gauge("ws_outbox_depth", "Frames queued for WebSocket clients")
+SEND_SECONDS = REGISTRY.histogram("ws_send_seconds", "Time to hand one frame to the socket")
+QUEUE_SECONDS = REGISTRY.histogram("ws_queue_seconds", "Time frames wait in the outbox")
+COALESCED = REGISTRY.counter("ws_frames_coalesced_total", "Status frames superseded before sending")
+DROPPED = REGISTRY.counter("ws_frames_dropped_total", "Frames dropped on outbox overflow")
+MERGED = REGISTRY.counter("ws_frames_merged_total", "Task events folded into a resync on overflow")
+DISCONNECTS = REGISTRY.counter("ws_overflow_disconnects_total", "Clients disconnected on overflow")
+BATCH_FRAMES = REGISTRY.histogram(
+    "ws_batch_frames", "Frames per batched WebSocket send", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+MAX_BATCH = 128
+
+
+def coalesce_key(type: str, data: dict[str, Any]) -> Hashable | None:
+    """Frames with the same key supersede each other while still queued."""
+    if type == "system_status":
+        return type
+    if type == "status_update":
+        return (type, data.get("message_id"))
+    return None
+
+
+class _Entry:
+    __slots__ = ("text", "key", "event", "queued_at")
+
+    def __init__(self, text: str, key: Hashable | None, event: bool):
+        self.text: str | None = text
+        self.key = key
+        self.event = event
+        self.queued_at = time.monotonic()
+
+
+class Outbox:
+    """Outbound frame queue for one WebSocket, drained by its own writer task.
+
+    Producers never await the socket: ``put`` queues and returns, so a slow
+    or backgrounded tab can't stall the burst pipeline. While frames wait,
+    a newer ``system_status`` replaces the queued one and a newer
+    ``status_update`` replaces the queued one for the same message.
+
+    At ``maxsize`` queued frames the overflow policy applies:
+
+    - ``drop``: discard the oldest queued frame.
+    - ``merge``: fold queued task events into one ``resync`` (the client
+      re-fetches, so nothing is lost); falls back to ``drop`` when there
+      are no events to fold.
+    - ``disconnect``: call ``on_overflow`` so the caller can close the
+      socket; the client reconnects and starts fresh.
+
+    With ``batch`` enabled, everything queued during one event-loop tick
+    goes out as a single ``{"type": "batch", "data": {"frames": [...]}}``
+    frame, spliced together from the already-serialized frames.
+    """
+
+    def __init__(
+        self,
+        send_text: Callable[[str], Awaitable[None]],
+        maxsize: int | None = None,
+        policy: str | None = None,
+        on_overflow: Callable[[], None] | None = None,
+        batch: bool = False,
+    ):
+        self._send_text = send_text
+        self._maxsize = maxsize or settings.ws_outbox_size
+        self._policy = policy or settings.ws_overflow_policy
+        if self._policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {self._policy}")
+        self._on_overflow = on_overflow
+        self._batch = batch
+        self._entries: deque[_Entry] = deque()
+        self._pending: dict[Hashable, _Entry] = {}
+        self._live = 0
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._writer: asyncio.Task | None = None
+        self._closed = False
+        self.overflowed = False
+
+    def __len__(self) -> int:
+        return self._live
+
+    def start(self) -> None:
+        self._writer = asyncio.get_running_loop().create_task(self._run())
+
+    def put(self, msg: WSOutgoing) -> None:
+        self.put_frame(msg.to_json(), coalesce_key(msg.type, msg.data))
+
+    def put_event(self, event: Event) -> None:
+        self.put_frame(event.frame, event=True)
+
+    def put_frame(self, text: str, key: Hashable | None = None, event: bool = False) -> None:
+        if self._closed or self.overflowed:
+            return
+        if key is not None:
+            old = self._pending.pop(key, None)
+            if old is not None:
+                self._discard(old)
+                COALESCED.inc()
+        if self._live >= self._maxsize and not self._make_room():
+            return
+        entry = _Entry(text, key, event)
+        if key is not None:
+            self._pending[key] = entry
+        self._entries.append(entry)
+        self._live += 1
+        DEPTH.inc()
+        self._idle.clear()
+        self._ready.set()
+
+    def _discard(self, entry: _Entry) -> None:
+        # Entries are tombstoned rather than removed from the middle of the deque
+        entry.text = None
+        if entry.key is not None and self._pending.get(entry.key) is entry:
+            del self._pending[entry.key]
+        self._live -= 1
+        DEPTH.dec()
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy; return whether the new frame fits."""
+        if self._policy == "disconnect":
+            logger.warning("WebSocket outbox full (%d frames) — disconnecting client", self._live)
+            self.overflowed = True
+            DISCONNECTS.inc()
+            if self._on_overflow is not None:
+                self._on_overflow()
+            return False
+
+        if self._policy == "merge":
+            events = [e for e in self._entries if e.event and e.text is not None]
+            if events:
+                for entry in events:
+                    self._discard(entry)
+                MERGED.inc(len(events))
+                resync = _Entry(RESYNC.frame, None, True)
+                self._entries.append(resync)
+                self._live += 1
+                DEPTH.inc()
+                if self._live < self._maxsize:
+                    return True
+
+        while self._entries and self._live >= self._maxsize:
+            entry = self._entries.popleft()
+            if entry.text is not None:
+                self._discard(entry)
+                DROPPED.inc()
+        return True
+
+    def _take(self, limit: int) -> list[str]:
+        texts: list[str] = []
+        now = time.monotonic()
+        while self._entries and len(texts) < limit:
+            entry = self._entries.popleft()
+            if entry.text is not None:
+                texts.append(entry.text)
+                QUEUE_SECONDS.observe(now - entry.queued_at)
+                self._discard(entry)
+        return texts
+
+    async def _run(self) -> None:
+        while True:
+            while not self._entries:
+                self._idle.set()
+                self._ready.clear()
+                await self._ready.wait()
+            if self._batch:
+                # Let the rest of this tick's producers queue their frames
+                await asyncio.sleep(0)
+                texts = self._take(MAX_BATCH)
+                if not texts:
+                    continue
+                BATCH_FRAMES.observe(len(texts))
+                if len(texts) == 1:
+                    text = texts[0]
+                else:
+                    text = '{"type":"batch","data":{"frames":[' + ",".join(texts) + "]}}"
+            else:
+                texts = self._take(1)
+                if not texts:
+                    continue
+                text = texts[0]
+            start = time.perf_counter()
+            try:
+                await self._send_text(text)
+            except Exception as e:
+                logger.debug("WebSocket send failed, stopping writer: %s", e)
+                self._closed = True
+                self._idle.set()
+                return
+            SEND_SECONDS.observe(time.perf_counter() - start)
+
+    async def join(self) -> None:
+        """Wait until everything queued so far has been sent."""
+        await self._idle.wait()
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        for entry in self._entries:
+            if entry.text is not None:
+                self._discard(entry)
+        self._entries.clear()
+        self._pending.clear()
+        self._idle.set()
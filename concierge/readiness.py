@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger("concierge")
+
+PENDING = "pending"
+STARTING = "starting"
+READY = "ready"
+DEGRADED = "degraded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# States a component can still leave on its own
+UNSETTLED = frozenset({PENDING, STARTING})
+# States that don't hold readiness back
+SERVING = frozenset({READY, DEGRADED, SKIPPED})
+
+
+class Component:
+    __slots__ = ("name", "required", "state", "detail", "seconds")
+
+    def __init__(self, name: str, required: bool):
+        self.name = name
+        self.required = required
+        self.state = PENDING
+        self.detail = ""
+        self.seconds: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"state": self.state, "required": self.required}
+        if self.detail:
+            out["detail"] = self.detail
+        if self.seconds is not None:
+            out["seconds"] = round(self.seconds, 4)
+        return out
+
+
+class Readiness:
+    """Startup state of each component, reported by /healthz and /readyz.
+
+    Components start out ``pending``. ``timed`` wraps a step run inline and
+    ``run`` one run as a background task; both record how long it took (in
+    ``timings`` and the ``startup_seconds`` gauge) and end in ``ready`` or
+    ``failed``. A component that isn't ``required`` ends up ``degraded``
+    instead: a cold LLM connection costs the first burst some latency, it
+    shouldn't keep the instance out of rotation.
+    """
+
+    def __init__(self):
+        self.components: dict[str, Component] = {}
+        self.timings: dict[str, float] = {}
+        self._settled = asyncio.Event()
+        self._settled.set()
+
+    def add(self, name: str, required: bool = True) -> None:
+        self.components[name] = Component(name, required)
+        self._settled.clear()
+
+    def skip(self, name: str, reason: str) -> None:
+        component = self.components.setdefault(name, Component(name, required=False))
+        component.state = SKIPPED
+        component.detail = reason
+        self._check_settled()
+
+    @property
+    def ready(self) -> bool:
+        return all(c.state in SERVING for c in self.components.values())
+
+    async def wait(self) -> None:
+        """Wait until no component is pending or starting."""
+        await self._settled.wait()
+
+    def _check_settled(self) -> None:
+        if all(c.state not in UNSETTLED for c in self.components.values()):
+            self._settled.set()
+
+    @contextmanager
+    def timed(self, name: str, required: bool = True) -> Iterator[None]:
+        component = self.components.get(name)
+        if component is None:
+            self.add(name, required)
+            component = self.components[name]
+        component.state = STARTING
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            component.state = FAILED if component.required else DEGRADED
+            component.detail = str(e) or type(e).__name__
+            raise
+        else:
+            component.state = READY
+        finally:
+            component.seconds = self.timings[name] = elapsed = time.perf_counter() - start
+            REGISTRY.gauge(
+                "startup_seconds", "Time spent starting each component", labels={"component": name}
+            ).set(elapsed)
+            self._check_settled()
+
+    async def run(self, name: str, step: Callable[[], Awaitable[Any]]) -> None:
+        """Run ``step`` as component ``name``; failures are logged, not raised."""
+        try:
+            with self.timed(name):
+                await step()
+        except Exception as e:
+            logger.warning("Startup step %s failed: %s", name, e)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "components": {name: c.to_dict() for name, c in self.components.items()},
+        }
@@ -5,10 +5,19 @@ from typing import Any
 
 from .models import IntentClassification, IntentType
 from .spacecadet_client import SpacecadetClient
+from .task_record import task_dicts
 
 logger = logging.getLogger("concierge")
 
 
+def _match_heading(tasks: list[dict[str, Any]], query: str) -> list[dict[str, Any]]:
+    return [t for t in tasks if query in (t.get("heading") or "").lower()]
+
+
+def new_task_heading(intent: IntentClassification) -> str:
+    return intent.heading or intent.raw_text[:80]
+
+
 class Reconciler:
     def __init__(self, client: SpacecadetClient):
         self._client = client
@@ -26,6 +35,10 @@ class Reconciler:
             results.append(result)
         return results
 
+    async def apply(self, intent: IntentClassification) -> dict:
+        """Carry out one intent; unlike ``reconcile``, exceptions propagate."""
+        return await self._dispatch(intent)
+
     async def _dispatch(self, intent: IntentClassification) -> dict:
         match intent.intent:
             case IntentType.NEW_TASK:
@@ -48,11 +61,7 @@ class Reconciler:
                 return {"error": f"Unknown intent: {intent.intent}"}
 
     async def _new_task(self, intent: IntentClassification) -> dict:
-        args: dict[str, Any] = {}
-        if intent.heading:
-            args["heading"] = intent.heading
-        else:
-            args["heading"] = intent.raw_text[:80]
+        args: dict[str, Any] = {"heading": new_task_heading(intent)}
 
         if intent.priority:
             args["priority"] = intent.priority
@@ -101,22 +110,19 @@ class Reconciler:
         if not intent.heading:
             return {"error": "Cannot identify task — no ID or heading provided"}
 
-        # Search existing tasks by heading
-        result = await self._client.list_tasks()
-        tasks = result if isinstance(result, list) else result.get("tasks", [])
-
+        # Search spacecadet's current list by heading. Not the task cache: it
+        # can be a TTL old, still holding tasks deleted or renamed since, and
+        # the match is about to be written to. Only the matches would need
+        # records, so the dicts are searched as they come.
         query = intent.heading.lower()
-        matches = [
-            t for t in tasks
-            if query in t.get("heading", "").lower()
-        ]
+        matches = _match_heading(task_dicts(await self._client.list_tasks()), query)
 
         if len(matches) == 1:
-            return {"id": matches[0]["id"]}
+            return {"id": str(matches[0].get("id") or "")}
         elif len(matches) == 0:
             return {"error": f"No task found matching '{intent.heading}'"}
         else:
-            headings = [m.get("heading", "") for m in matches[:5]]
+            headings = [m.get("heading") for m in matches[:5]]
             return {
                 "error": f"Multiple tasks match '{intent.heading}': {headings}"
             }
@@ -0,0 +1,291 @@
+"""Replay a recorded inbox through the burst pipeline.
+
+    python -m concierge.replay --inbox ./inbox --workers 4 --out run.jsonl
+    python -m concierge.replay --inbox ./inbox --speed 60 --baseline run.jsonl
+
+Messages are regrouped into bursts by their recorded timestamps, with the
+same quiet-window and max-wait rules as ``BurstDetector``. Each burst runs
+through ``Classifier``, ``Reconciler`` and ``Acknowledger``, using the fake
+spacecadet and, by default, the fake LLM provider (``--provider
+configured`` uses the one from settings). Bursts are dealt round-robin to
+worker processes, and each worker has its own fake task store.
+
+``--speed`` compresses the original timeline: 60 replays an hour of
+traffic in a minute. ``--speed 0`` replays as fast as possible. The report
+covers throughput and per-stage latency. With ``--baseline``, it also
+lists bursts whose classification changed since an earlier ``--out`` file.
+Only compare runs made with the same ``--workers``, since the task stores
+differ otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from .config import settings
+from .inbox import Inbox
+from .models import Burst, IntentClassification, Message
+
+logger = logging.getLogger("concierge")
+
+STAGES = ("classify", "reconcile", "acknowledge", "total")
+
+
+def group_bursts(
+    messages: list[Message], quiet_window: float, max_wait: float
+) -> list[list[Message]]:
+    """Split timestamp-ordered messages into bursts the way BurstDetector would."""
+    bursts: list[list[Message]] = []
+    current: list[Message] = []
+    for m in messages:
+        if current:
+            gap = (m.timestamp - current[-1].timestamp).total_seconds()
+            age = (m.timestamp - current[0].timestamp).total_seconds()
+            if gap >= quiet_window or age >= max_wait:
+                bursts.append(current)
+                current = []
+        current.append(m)
+    if current:
+        bursts.append(current)
+    return bursts
+
+
+def _intent_summary(intent: IntentClassification) -> dict[str, Any]:
+    return intent.model_dump(mode="json", exclude={"raw_text"}, exclude_defaults=True)
+
+
+def _build_provider(options: dict[str, Any], shard: int):
+    if options["provider"] == "configured":
+        from .main import _build_provider
+        return _build_provider()
+    from .llm.fake_provider import FakeProvider
+    return FakeProvider(latency=options["llm_latency"], seed=options["seed"] + shard)
+
+
+async def _replay_shard(
+    shard: int, bursts: list[tuple[int, float, list[dict]]], options: dict[str, Any], start_at: float,
+) -> list[dict[str, Any]]:
+    from .acknowledger import Acknowledger
+    from .classifier import Classifier
+    from .fake_spacecadet import FakeSpacecadetClient, FaultInjector, TaskStore, generate_tasks
+    from .reconciler import Reconciler
+
+    provider = _build_provider(options, shard)
+    client = FakeSpacecadetClient(
+        TaskStore(generate_tasks(options["tasks"], options["seed"])),
+        FaultInjector({"default": options["spacecadet_latency"]}, seed=options["seed"] + shard),
+    )
+    classifier = Classifier(provider)
+    reconciler = Reconciler(client)
+    acknowledger = Acknowledger(provider)
+    slots = asyncio.Semaphore(options["concurrency"])
+    speed = options["speed"]
+
+    async def replay(index: int, fire_at: float, raw: list[dict]) -> dict[str, Any]:
+        if speed > 0:
+            await asyncio.sleep(max(0.0, start_at + fire_at / speed - time.time()))
+        messages = [Message(**m) for m in raw]
+        burst = Burst(
+            messages=messages, started_at=messages[0].timestamp, ended_at=messages[-1].timestamp,
+        )
+        async with slots:
+            t0 = time.perf_counter()
+            intents = await classifier.classify(burst)
+            t1 = time.perf_counter()
+            results = await reconciler.reconcile(intents) if intents else []
+            t2 = time.perf_counter()
+            ack = await acknowledger.acknowledge(intents, results) if intents else ""
+            t3 = time.perf_counter()
+        return {
+            "burst": index,
+            "first_message": messages[0].id,
+            "texts": [m.text for m in messages],
+            "intents": [_intent_summary(i) for i in intents],
+            "errors": sum(1 for r in results if isinstance(r, dict) and "error" in r),
+            "ack": ack,
+            "timings": {
+                "classify": t1 - t0, "reconcile": t2 - t1, "acknowledge": t3 - t2, "total": t3 - t0,
+            },
+        }
+
+    return await asyncio.gather(*(replay(*b) for b in bursts))
+
+
+def _run_shard(shard: int, bursts: list, options: dict[str, Any], start_at: float) -> list[dict]:
+    # Worker processes: quiet the per-call logging, it is all in the report
+    logging.getLogger("concierge").setLevel(logging.ERROR)
+    return asyncio.run(_replay_shard(shard, bursts, options, start_at))
+
+
+def _summary(values: list[float]) -> dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {"count": len(ordered), "p50": at(0.50), "p95": at(0.95), "p99": at(0.99),
+            "max": round(ordered[-1] * 1000, 2)}
+
+
+def diff_classifications(
+    records: list[dict[str, Any]], baseline: list[dict[str, Any]], examples: int = 10,
+) -> dict[str, Any]:
+    """Compare intents per burst (keyed by its first message) with an earlier run."""
+    before = {r["first_message"]: r for r in baseline}
+    compared = 0
+    changed = []
+    for record in records:
+        old = before.pop(record["first_message"], None)
+        if old is None:
+            continue
+        compared += 1
+        if old["intents"] != record["intents"]:
+            changed.append({
+                "first_message": record["first_message"],
+                "texts": record["texts"],
+                "before": old["intents"],
+                "after": record["intents"],
+            })
+    return {
+        "compared": compared,
+        "changed": len(changed),
+        "only_in_baseline": len(before),
+        "examples": changed[:examples],
+    }
+
+
+def replay(
+    messages: list[Message],
+    workers: int = 1,
+    speed: float = 0.0,
+    quiet_window: float | None = None,
+    max_wait: float | None = None,
+    provider: str = "fake",
+    llm_latency: str = "fixed:0",
+    spacecadet_latency: str = "fixed:0",
+    tasks: int = 200,
+    seed: int = 0,
+    concurrency: int = 64,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Replay ``messages``; return per-burst records and a summary report."""
+    quiet_window = quiet_window or settings.quiet_window
+    max_wait = max_wait or settings.max_wait
+    messages = sorted(messages, key=lambda m: m.timestamp)
+    bursts = group_bursts(messages, quiet_window, max_wait)
+    origin = messages[0].timestamp if messages else None
+
+    def fire_at(burst: list[Message]) -> float:
+        # Whichever BurstDetector timer would have gone off first
+        first = (burst[0].timestamp - origin).total_seconds()
+        last = (burst[-1].timestamp - origin).total_seconds()
+        return min(last + quiet_window, first + max_wait)
+
+    work = [(i, fire_at(b), [m.model_dump(mode="json") for m in b]) for i, b in enumerate(bursts)]
+    options = {
+        "provider": provider, "llm_latency": llm_latency, "spacecadet_latency": spacecadet_latency,
+        "tasks": tasks, "seed": seed, "speed": speed, "concurrency": concurrency,
+    }
+    workers = max(1, min(workers, len(work) or 1))
+    shards = [work[n::workers] for n in range(workers)]
+    start_at = time.time() + (0.5 if workers > 1 else 0.0)
+
+    if workers == 1:
+        records = asyncio.run(_replay_shard(0, shards[0], options, start_at))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_shard, n, shard, options, start_at)
+                       for n, shard in enumerate(shards)]
+            records = [r for f in futures for r in f.result()]
+    # Workers start together at start_at, after the pool has spun up
+    elapsed = time.time() - start_at
+
+    records.sort(key=lambda r: r["burst"])
+    timings = {stage: [r["timings"][stage] for r in records] for stage in STAGES}
+    kinds = Counter(i["intent"] for r in records for i in r["intents"])
+    report = {
+        "messages": len(messages),
+        "bursts": len(records),
+        "workers": workers,
+        "speed": speed,
+        "elapsed_s": round(elapsed, 3),
+        "throughput": {
+            "bursts_per_s": round(len(records) / elapsed, 2) if elapsed else None,
+            "messages_per_s": round(len(messages) / elapsed, 2) if elapsed else None,
+        },
+        "latency_ms": {stage: _summary(values) for stage, values in timings.items()},
+        "intents": dict(sorted(kinds.items())),
+        "unclassified_bursts": sum(1 for r in records if not r["intents"]),
+        "reconcile_errors": sum(r["errors"] for r in records),
+    }
+    return records, report
+
+
+def _read_jsonl(path: str) -> list[dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inbox", default=settings.inbox_dir, help="recorded inbox directory")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="timeline compression factor; 0 = as fast as possible")
+    parser.add_argument("--quiet-window", type=float, default=settings.quiet_window)
+    parser.add_argument("--max-wait", type=float, default=settings.max_wait)
+    parser.add_argument("--provider", choices=("fake", "configured"), default="fake")
+    parser.add_argument("--llm-latency", default="fixed:0", help="fake provider latency")
+    parser.add_argument("--spacecadet-latency", default="fixed:0")
+    parser.add_argument("--tasks", type=int, default=200, help="tasks in each fake task store")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=64, help="bursts in flight per worker")
+    parser.add_argument("--limit", type=int, help="replay only the first N messages")
+    parser.add_argument("--out", help="write per-burst results as JSONL")
+    parser.add_argument("--baseline", help="earlier --out file to diff classifications against")
+    args = parser.parse_args(argv)
+
+    inbox = Inbox(args.inbox)
+    messages = []
+    for m in inbox.iter_messages():
+        messages.append(m)
+        if args.limit and len(messages) >= args.limit:
+            break
+    if not messages:
+        parser.error(f"no messages in {args.inbox}")
+
+    records, report = replay(
+        messages,
+        workers=args.workers,
+        speed=args.speed,
+        quiet_window=args.quiet_window,
+        max_wait=args.max_wait,
+        provider=args.provider,
+        llm_latency=args.llm_latency,
+        spacecadet_latency=args.spacecadet_latency,
+        tasks=args.tasks,
+        seed=args.seed,
+        concurrency=args.concurrency,
+    )
+    if args.baseline:
+        report["diff"] = diff_classifications(records, _read_jsonl(args.baseline))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for record in records:
+                # Timings vary run to run; keep the file diffable
+                f.write(json.dumps({k: v for k, v in record.items() if k != "timings"}) + "\n")
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
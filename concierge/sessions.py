@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from .config import settings
+from .inbox import Inbox
+from .metrics import REGISTRY
+
+IN_FLIGHT = REGISTRY.gauge("bursts_in_flight", "Bursts being processed")
+QUEUED = REGISTRY.gauge("bursts_queued", "Bursts waiting for a processing slot")
+QUEUE_SECONDS = REGISTRY.histogram("burst_queue_seconds", "Time bursts waited for a slot")
+REJECTED = REGISTRY.counter("ws_connections_rejected_total", "Connections refused at the cap")
+
+_ids = itertools.count(1)
+
+
+class Session:
+    """One open /ws connection, as seen by the registry."""
+
+    def __init__(self, user: str):
+        self.id = next(_ids)
+        self.user = user
+        self.connected_at = time.monotonic()
+        self.stage = "idle"
+        self.stage_since = self.connected_at
+        self.queued_at: float | None = None
+        self.bursts = 0
+        self.outbox = None
+
+    def set_stage(self, stage: str) -> None:
+        self.stage = stage
+        self.stage_since = time.monotonic()
+
+    def info(self, now: float) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "user": self.user,
+            "connected_for": round(now - self.connected_at, 3),
+            "stage": self.stage,
+            "stage_for": round(now - self.stage_since, 3),
+            "queue_age": round(now - self.queued_at, 3) if self.queued_at is not None else None,
+            "bursts": self.bursts,
+            "outbox": len(self.outbox) if self.outbox is not None else 0,
+        }
+
+
+class SessionRegistry:
+    """Process-wide view of WebSocket sessions and the resources they share.
+
+    Admission: at most ``max_connections`` sessions are open at once.
+    Bursts: at most ``max_bursts`` run the LLM/spacecadet pipeline at once;
+    the rest wait in a queue that takes one burst per user in turn, so a
+    user firing many bursts can't starve everyone else.
+    """
+
+    def __init__(
+        self,
+        max_connections: int | None = None,
+        max_bursts: int | None = None,
+        inbox: Inbox | None = None,
+    ):
+        self.max_connections = max_connections or settings.max_connections
+        self.max_bursts = max_bursts or settings.max_inflight_bursts
+        self.inbox = inbox or Inbox()
+        self._sessions: dict[int, Session] = {}
+        self._in_flight = 0
+        # user -> bursts waiting, in arrival order; users rotate round-robin
+        self._waiting: OrderedDict[str, deque[tuple[Session, asyncio.Future, float]]]
+        self._waiting = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._waiting.values())
+
+    def open(self, user: str) -> Session | None:
+        """Register a new session, or return ``None`` when at capacity."""
+        if len(self._sessions) >= self.max_connections:
+            REJECTED.inc()
+            return None
+        session = Session(user)
+        self._sessions[session.id] = session
+        return session
+
+    def close(self, session: Session) -> None:
+        self._sessions.pop(session.id, None)
+
+    def get(self, session_id: int) -> Session | None:
+        return self._sessions.get(session_id)
+
+    def for_user(self, user: str) -> list[Session]:
+        return [s for s in self._sessions.values() if s.user == user]
+
+    @asynccontextmanager
+    async def burst_slot(self, session: Session) -> AsyncIterator[None]:
+        """Hold one of the ``max_bursts`` processing slots."""
+        await self._acquire(session)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, session: Session) -> None:
+        if self._in_flight < self.max_bursts and not self._waiting:
+            self._in_flight += 1
+            IN_FLIGHT.set(self._in_flight)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        queued_at = time.monotonic()
+        self._waiting.setdefault(session.user, deque()).append((session, future, queued_at))
+        if session.queued_at is None:
+            session.queued_at = queued_at
+        session.set_stage("queued")
+        QUEUED.inc()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as we were cancelled: hand it on
+                self._release()
+            else:
+                self._remove_waiter(session.user, future)
+            raise
+        finally:
+            QUEUE_SECONDS.observe(time.monotonic() - queued_at)
+            # Queue age tracks the session's oldest burst still waiting
+            session.queued_at = min(
+                (t for s, _, t in self._waiting.get(session.user, ()) if s is session),
+                default=None,
+            )
+
+    def _remove_waiter(self, user: str, future: asyncio.Future) -> None:
+        queue = self._waiting.get(user)
+        if queue is None:
+            return
+        for item in queue:
+            if item[1] is future:
+                queue.remove(item)
+                QUEUED.dec()
+                break
+        if not queue:
+            del self._waiting[user]
+
+    def _release(self) -> None:
+        # The slot passes straight to the next user in rotation
+        while self._waiting:
+            user, queue = next(iter(self._waiting.items()))
+            _, future, _ = queue.popleft()
+            QUEUED.dec()
+            if queue:
+                self._waiting.move_to_end(user)
+            else:
+                del self._waiting[user]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+        IN_FLIGHT.set(self._in_flight)
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "connections": len(self._sessions),
+            "max_connections": self.max_connections,
+            "bursts_in_flight": self._in_flight,
+            "max_bursts": self.max_bursts,
+            "bursts_queued": self.queued,
+            "sessions": [s.info(now) for s in self._sessions.values()],
+        }
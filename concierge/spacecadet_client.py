@@ -1,56 +1,108 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-from typing import Any
-
-from mcp import ClientSession
-from mcp.client.stdio import StdioServerParameters, stdio_client
+import shlex
+from typing import TYPE_CHECKING, Any
 
+from . import tracing
 from .config import settings
+from .task_record import loads
+
+if TYPE_CHECKING:
+    from mcp import ClientSession
+    from mcp.client.stdio import StdioServerParameters
 
 logger = logging.getLogger("concierge")
 
+READ_TOOLS = frozenset({"list_tasks", "get_task"})
+
 
 class SpacecadetClient:
-    def __init__(self, server_path: str | None = None):
+    def __init__(self, server_path: str | None = None, server_args: list[str] | None = None):
         self._server_path = server_path or settings.spacecadet_path
+        self._server_args = (
+            shlex.split(settings.spacecadet_args) if server_args is None else server_args
+        )
         self._session: ClientSession | None = None
-        self._cm = None
-        self._cm2 = None
+        self._runner: asyncio.Task | None = None
+        self._stop: asyncio.Event | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self._session is not None and self._runner is not None and not self._runner.done()
 
     async def connect(self) -> None:
         if not self._server_path:
             raise ValueError(
                 "CONCIERGE_SPACECADET_PATH must be set to the path of spacecadet server.py"
             )
+        # The mcp SDK takes about a second to import; defer it until a
+        # session is actually wanted
+        from mcp.client.stdio import StdioServerParameters
 
         params = StdioServerParameters(
             command="python3",
-            args=[self._server_path],
+            args=[self._server_path, *self._server_args],
         )
-        self._cm = stdio_client(params)
-        streams = await self._cm.__aenter__()
-        self._cm2 = ClientSession(*streams)
-        self._session = await self._cm2.__aenter__()
-        await self._session.initialize()
+        # The stdio transport is entered and exited in one dedicated task:
+        # anyio cancel scopes must not cross tasks, and this lets the
+        # session be closed from whichever task notices it has died.
+        ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._runner = asyncio.create_task(self._run(params, ready))
+        try:
+            await ready
+        except BaseException:
+            self._runner.cancel()
+            raise
         logger.info("Connected to spacecadet at %s", self._server_path)
 
-    async def close(self) -> None:
-        if self._cm2:
-            await self._cm2.__aexit__(None, None, None)
-        if self._cm:
-            await self._cm.__aexit__(None, None, None)
+    async def _run(self, params: StdioServerParameters, ready: asyncio.Future) -> None:
+        from mcp import ClientSession
+        from mcp.client.stdio import stdio_client
+
+        try:
+            async with stdio_client(params) as streams, ClientSession(*streams) as session:
+                await session.initialize()
+                self._session = session
+                ready.set_result(None)
+                await self._stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("spacecadet session ended: %s", e)
+        finally:
+            self._session = None
+
+    async def close(self, timeout: float = 5.0) -> None:
+        if self._runner is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._runner, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("spacecadet did not shut down within %.1fs", timeout)
+        except asyncio.CancelledError:
+            pass
+        self._runner = None
         self._session = None
         logger.info("Disconnected from spacecadet")
 
+    async def ping(self) -> None:
+        if self._session is None:
+            raise RuntimeError("Not connected to spacecadet")
+        await self._session.send_ping()
+
     async def call_tool(self, name: str, args: dict[str, Any]) -> dict:
         if self._session is None:
             raise RuntimeError("Not connected to spacecadet")
 
         clean_args = {k: v for k, v in args.items() if v is not None}
 
-        result = await self._session.call_tool(name, clean_args)
+        with tracing.span(f"spacecadet.{name}"):
+            result = await self._session.call_tool(name, clean_args)
 
         if result.isError:
             error_text = result.content[0].text if result.content else "Unknown error"
@@ -59,8 +111,8 @@ class SpacecadetClient:
 
         text = result.content[0].text if result.content else "{}"
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return loads(text)
+        except ValueError:
             return {"raw": text}
 
     async def list_tasks(self, **kwargs) -> dict:
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+from .config import settings
+from .spacecadet_client import READ_TOOLS, SpacecadetClient
+
+logger = logging.getLogger("concierge")
+
+
+class PooledSession:
+    """One spacecadet client in the pool, with its in-flight metrics."""
+
+    def __init__(self, name: str, client: SpacecadetClient):
+        self.name = name
+        self.client = client
+        self.healthy = True
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.last_latency = 0.0
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> dict:
+        self.in_flight += 1
+        self.calls += 1
+        start = time.monotonic()
+        try:
+            result = await self.client.call_tool(name, args)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.last_latency = time.monotonic() - start
+        if isinstance(result, dict) and "error" in result:
+            self.errors += 1
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        stats = {
+            "name": self.name,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "errors": self.errors,
+            "last_latency_ms": round(self.last_latency * 1000, 1),
+        }
+        if hasattr(self.client, "stats"):
+            stats.update(self.client.stats())
+        return stats
+
+
+class SpacecadetPool:
+    """N spacecadet subprocesses: one writer, reads spread across the rest.
+
+    Mutations always go to the writer and are serialized so their order is
+    preserved. Reads go to the least-busy healthy reader, so they don't
+    queue behind a slow Emacs write. With ``size == 1`` the single session
+    does both, which matches a plain ``SpacecadetClient``.
+    """
+
+    def __init__(
+        self,
+        size: int | None = None,
+        client_factory: Callable[[], SpacecadetClient] = SpacecadetClient,
+        health_interval: float | None = None,
+    ):
+        self._size = max(1, size or settings.spacecadet_pool_size)
+        self._client_factory = client_factory
+        self._health_interval = (
+            health_interval if health_interval is not None
+            else settings.spacecadet_health_interval
+        )
+        self._sessions: list[PooledSession] = []
+        self._write_lock = asyncio.Lock()
+        self._health_task: asyncio.Task | None = None
+
+    @property
+    def writer(self) -> PooledSession:
+        return self._sessions[0]
+
+    @property
+    def readers(self) -> list[PooledSession]:
+        return self._sessions[1:] or self._sessions
+
+    async def connect(self) -> None:
+        clients = [self._client_factory() for _ in range(self._size)]
+        results = await asyncio.gather(
+            *(c.connect() for c in clients), return_exceptions=True
+        )
+        for i, (client, result) in enumerate(zip(clients, results)):
+            if isinstance(result, Exception):
+                logger.warning("spacecadet pool session %d failed to connect: %s", i, result)
+                continue
+            name = "writer" if not self._sessions else f"reader-{len(self._sessions)}"
+            self._sessions.append(PooledSession(name, client))
+        if not self._sessions:
+            raise results[0]
+        logger.info("spacecadet pool ready with %d session(s)", len(self._sessions))
+
+        if self._health_interval > 0:
+            self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+        for session in self._sessions:
+            try:
+                await session.client.close()
+            except Exception as e:
+                logger.warning("Error closing spacecadet session %s: %s", session.name, e)
+        self._sessions = []
+
+    async def wait_connected(self) -> None:
+        """Wait until the writer session can accept calls."""
+        wait = getattr(self.writer.client, "wait_connected", None)
+        if wait is not None:
+            await wait()
+
+    def _pick_reader(self) -> PooledSession:
+        candidates = [
+            s for s in self.readers
+            if s.healthy and getattr(s.client, "connected", True)
+        ] or self.readers
+        return min(candidates, key=lambda s: s.in_flight)
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> dict:
+        if not self._sessions:
+            raise RuntimeError("Not connected to spacecadet")
+        if name in READ_TOOLS:
+            return await self._pick_reader().call_tool(name, args)
+        async with self._write_lock:
+            return await self.writer.call_tool(name, args)
+
+    async def _check(self, session: PooledSession) -> None:
+        try:
+            await asyncio.wait_for(session.client.ping(), timeout=self._health_interval)
+        except Exception as e:
+            if session.healthy:
+                logger.warning("spacecadet session %s failed health check: %s", session.name, e)
+            session.healthy = False
+        else:
+            if not session.healthy:
+                logger.info("spacecadet session %s healthy again", session.name)
+            session.healthy = True
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_interval)
+            await asyncio.gather(*(self._check(s) for s in self._sessions))
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [s.stats() for s in self._sessions]
+
+    async def list_tasks(self, **kwargs) -> dict:
+        return await self.call_tool("list_tasks", kwargs)
+
+    async def add_task(self, **kwargs) -> dict:
+        return await self.call_tool("add_task", kwargs)
+
+    async def update_task(self, **kwargs) -> dict:
+        return await self.call_tool("update_task", kwargs)
+
+    async def delete_task(self, **kwargs) -> dict:
+        return await self.call_tool("delete_task", kwargs)
+
+    async def get_task(self, **kwargs) -> dict:
+        return await self.call_tool("get_task", kwargs)
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+import anyio
+
+from .config import settings
+from .spacecadet_client import READ_TOOLS, SpacecadetClient
+
+logger = logging.getLogger("concierge")
+
+# Failures that mean the session itself is gone, as opposed to a tool error
+SESSION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    OSError,
+)
+
+
+# Raised writing to a stream that is already closed: the request never went out
+UNSENT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+# Writes that can't safely run twice (a second add duplicates, a second
+# delete fails for a task that is gone); replayed only if they were never sent
+NON_IDEMPOTENT_TOOLS = frozenset({"add_task", "delete_task"})
+
+
+class SpacecadetUnavailable(RuntimeError):
+    pass
+
+
+def _session_died(client: SpacecadetClient, e: BaseException) -> bool:
+    if isinstance(e, SESSION_ERRORS) or not getattr(client, "alive", True):
+        return True
+    # mcp.types builds a lot of pydantic models; only pay for it once a call fails
+    from mcp.shared.exceptions import McpError
+    from mcp.types import CONNECTION_CLOSED
+    return isinstance(e, McpError) and e.error.code == CONNECTION_CLOSED
+
+
+class SupervisedClient:
+    """A ``SpacecadetClient`` that survives spacecadet crashes and hangs.
+
+    Every call gets a deadline. A call that times out or fails at the
+    transport level marks the session dead; it is torn down and respawned
+    in the background with exponential backoff. With ``standby`` enabled a
+    second, already-initialised process is kept warm and promoted
+    immediately, so failover skips the Python + Emacs cold start.
+
+    Mutations in flight when the session dies are replayed on the new
+    session (up to ``write_retries`` times). spacecadet has no idempotency
+    keys, so a write that landed just before the crash may apply twice.
+    For update_task that is harmless. add_task would duplicate, and a
+    replayed delete_task would report an error for a task it did delete,
+    so these are only replayed when the request never left (the session's
+    stream was already closed); after a timeout or a mid-call crash they
+    fail with ``SpacecadetUnavailable`` instead.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], SpacecadetClient] = SpacecadetClient,
+        call_timeout: float | None = None,
+        standby: bool | None = None,
+        backoff_max: float | None = None,
+        write_retries: int | None = None,
+    ):
+        self._client_factory = client_factory
+        self._call_timeout = call_timeout or settings.spacecadet_call_timeout
+        self._use_standby = settings.spacecadet_standby if standby is None else standby
+        self._backoff_max = backoff_max or settings.spacecadet_backoff_max
+        self._write_retries = (
+            settings.spacecadet_write_retries if write_retries is None else write_retries
+        )
+        self._client: SpacecadetClient | None = None
+        self._standby: SpacecadetClient | None = None
+        self._connected = asyncio.Event()
+        self._respawn_task: asyncio.Task | None = None
+        self._standby_task: asyncio.Task | None = None
+        self._closing = False
+        self.restarts = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    async def connect(self) -> None:
+        """Connect if possible; otherwise keep retrying in the background."""
+        try:
+            self._client = await self._spawn()
+            self._connected.set()
+        except Exception as e:
+            logger.warning("spacecadet not available: %s — retrying in background", e)
+            self._schedule_respawn()
+        self._schedule_standby()
+
+    async def wait_connected(self) -> None:
+        await self._connected.wait()
+
+    async def close(self) -> None:
+        self._closing = True
+        for task in (self._respawn_task, self._standby_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        for client in (self._client, self._standby):
+            if client is not None:
+                await self._discard(client)
+        self._client = None
+        self._standby = None
+        self._connected.clear()
+
+    async def _spawn(self) -> SpacecadetClient:
+        client = self._client_factory()
+        await asyncio.wait_for(client.connect(), timeout=self._call_timeout)
+        return client
+
+    async def _discard(self, client: SpacecadetClient) -> None:
+        try:
+            await client.close(timeout=self._call_timeout)
+        except Exception as e:
+            logger.warning("Error closing dead spacecadet session: %s", e)
+
+    def _mark_dead(self, client: SpacecadetClient, reason: str) -> None:
+        if client is not self._client:
+            return  # another caller already replaced it
+        logger.warning("spacecadet session died (%s) — respawning", reason)
+        self._client = None
+        self._connected.clear()
+        asyncio.get_running_loop().create_task(self._discard(client))
+        self._schedule_respawn()
+
+    def _schedule_respawn(self) -> None:
+        if self._closing or (self._respawn_task is not None and not self._respawn_task.done()):
+            return
+        self._respawn_task = asyncio.get_running_loop().create_task(self._respawn())
+
+    def _schedule_standby(self) -> None:
+        if not self._use_standby or self._closing or self._standby is not None:
+            return
+        if self._standby_task is not None and not self._standby_task.done():
+            return
+        self._standby_task = asyncio.get_running_loop().create_task(self._fill_standby())
+
+    async def _take_standby(self) -> SpacecadetClient | None:
+        standby, self._standby = self._standby, None
+        if standby is None:
+            return None
+        try:
+            await asyncio.wait_for(standby.ping(), timeout=self._call_timeout)
+        except Exception as e:
+            logger.warning("spacecadet standby is unhealthy: %s", e)
+            asyncio.get_running_loop().create_task(self._discard(standby))
+            return None
+        return standby
+
+    async def _respawn(self) -> None:
+        delay = 0.5
+        while True:
+            client = await self._take_standby()
+            if client is not None:
+                logger.info("Promoted warm spacecadet standby")
+            else:
+                try:
+                    client = await self._spawn()
+                except Exception as e:
+                    logger.warning("spacecadet respawn failed: %s — retrying in %.1fs", e, delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self._backoff_max)
+                    continue
+            self._client = client
+            self.restarts += 1
+            self._connected.set()
+            self._schedule_standby()
+            return
+
+    async def _fill_standby(self) -> None:
+        delay = 0.5
+        while self._standby is None:
+            try:
+                self._standby = await self._spawn()
+            except Exception as e:
+                logger.warning("spacecadet standby spawn failed: %s — retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._backoff_max)
+
+    async def _live_client(self) -> SpacecadetClient:
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=self._call_timeout)
+        except asyncio.TimeoutError:
+            raise SpacecadetUnavailable("spacecadet is restarting") from None
+        return self._client
+
+    async def ping(self) -> None:
+        client = await self._live_client()
+        try:
+            await asyncio.wait_for(client.ping(), timeout=self._call_timeout)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) or _session_died(client, e):
+                self._mark_dead(client, f"ping failed: {e!r}")
+                raise SpacecadetUnavailable("spacecadet did not answer ping") from e
+            raise
+
+    async def call_tool(self, name: str, args: dict[str, Any]) -> dict:
+        attempts = 1 if name in READ_TOOLS else 1 + self._write_retries
+        for attempt in range(attempts):
+            client = await self._live_client()
+            try:
+                return await asyncio.wait_for(
+                    client.call_tool(name, args), timeout=self._call_timeout
+                )
+            except asyncio.TimeoutError:
+                # spacecadet may be slow rather than dead: the write can still land
+                self._mark_dead(client, f"{name} timed out after {self._call_timeout:.0f}s")
+                error = SpacecadetUnavailable(f"spacecadet {name} timed out")
+                sent = True
+            except Exception as e:
+                if not _session_died(client, e):
+                    raise
+                self._mark_dead(client, f"{name} failed: {e!r}")
+                error = SpacecadetUnavailable(f"spacecadet {name} failed: {e!r}")
+                sent = not isinstance(e, UNSENT_ERRORS)
+            if sent and name in NON_IDEMPOTENT_TOOLS:
+                logger.warning("Not replaying %s: it may already have been applied", name)
+                break
+            if attempt + 1 < attempts:
+                logger.info("Replaying %s after spacecadet restart", name)
+        raise error
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "standby": self._standby is not None,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable
+
+from .config import settings
+from .events import EventHub
+from .task_index import TaskIndex
+from .task_record import Task, parse_tasks
+
+logger = logging.getLogger("concierge")
+
+# Revisions are ``epoch << REVISION_BITS | counter``; epoch and counter
+# together stay under 2**53 so browsers read them back exactly
+REVISION_BITS = 32
+EPOCH_BITS = 20
+
+
+class TaskCache:
+    """Stale-while-revalidate cache of the spacecadet task list.
+
+    Readers always get the current snapshot without waiting; only the very
+    first read (before any snapshot exists) blocks on spacecadet. Refreshes
+    run in the background and are single-flight: triggers that arrive while
+    a refresh is running mark the cache dirty so exactly one follow-up
+    refresh picks up whatever changed mid-flight.
+
+    Every change to the snapshot bumps a monotonic ``revision`` and is
+    recorded in a bounded changelog so clients can fetch deltas instead of
+    the full list. Each cache numbers its revisions under its own random
+    epoch, so a revision from another worker, or from before a restart,
+    never matches this one: ETags don't validate and ``changes_since``
+    asks for a reset rather than returning a wrong delta. When a hub is
+    given, each revision's delta is also published to it as a
+    ``task_changes`` event.
+
+    Snapshots hold compact ``Task`` records built once per refresh; deltas
+    and events carry them back out in wire format via ``Task.to_dict``.
+    ``on_refresh`` is called with the new task list after each refresh.
+    """
+
+    def __init__(
+        self,
+        client,
+        ttl: float | None = None,
+        changelog_size: int | None = None,
+        hub: EventHub | None = None,
+        on_refresh: Callable[[list[Task]], None] | None = None,
+    ):
+        self._client = client
+        self._hub = hub
+        self._on_refresh = on_refresh
+        self._ttl = ttl if ttl is not None else settings.task_cache_ttl
+        self._tasks: list[Task] | None = None
+        self._index: TaskIndex | None = None
+        self._fetched_at = 0.0
+        self._refresh_task: asyncio.Task | None = None
+        self._dirty = False
+        self._epoch = random.getrandbits(EPOCH_BITS)
+        self._revision = self._epoch << REVISION_BITS
+        self._log: deque[tuple[int, str, str]] = deque(
+            maxlen=changelog_size or settings.task_changelog_size
+        )
+        # Changes at or before this revision are no longer in the log
+        self._log_floor = self._revision
+
+    @property
+    def tasks(self) -> list[Task] | None:
+        return self._tasks
+
+    @property
+    def index(self) -> TaskIndex | None:
+        return self._index
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at >= self._ttl
+
+    async def get(self) -> list[Task]:
+        if self._tasks is None:
+            await self.refresh()
+            return self._tasks if self._tasks is not None else []
+        if self.is_stale:
+            self.request_refresh()
+        return self._tasks
+
+    async def get_index(self) -> TaskIndex:
+        await self.get()
+        return self._index if self._index is not None else TaskIndex([])
+
+    def update(self, task_id: str, changes: dict) -> Task | None:
+        """Optimistically apply ``changes`` to the cached task with ``task_id``."""
+        return self.update_many([(task_id, changes)])[0]
+
+    def update_many(self, updates: list[tuple[str, dict]]) -> list[Task | None]:
+        """Optimistically apply several updates as a single revision."""
+        if self._index is None:
+            return [None] * len(updates)
+        tasks = [self._index.update(task_id, changes) for task_id, changes in updates]
+        self._record([
+            (task_id, "updated")
+            for (task_id, _), task in zip(updates, tasks)
+            if task is not None
+        ])
+        return tasks
+
+    def _record(self, changes: list[tuple[str, str]]) -> None:
+        """Log ``changes`` (already applied to the index) as a new revision."""
+        if not changes:
+            return
+        self._revision += 1
+        for task_id, op in changes:
+            if len(self._log) == self._log.maxlen:
+                self._log_floor = self._log[0][0]
+            self._log.append((self._revision, task_id, op))
+
+        if self._hub is not None and self._hub.subscriber_count:
+            delta: dict[str, list] = {"added": [], "updated": [], "removed": []}
+            for task_id, op in changes:
+                if op == "removed":
+                    delta["removed"].append(task_id)
+                else:
+                    delta[op].append(self._index.get(task_id).to_dict())
+            self._hub.publish("task_changes", {"revision": self._revision, **delta})
+
+    def _diff(self, tasks: list[Task]) -> list[tuple[str, str]]:
+        old = self._index.by_id if self._index is not None else {}
+        seen: set[str] = set()
+        changes = []
+        for task in tasks:
+            task_id = task.id
+            if not task_id:
+                continue
+            seen.add(task_id)
+            prev = self._index.tasks[old[task_id]] if task_id in old else None
+            if prev is None:
+                changes.append((task_id, "added"))
+            elif prev != task:
+                changes.append((task_id, "updated"))
+        changes.extend((task_id, "removed") for task_id in old if task_id not in seen)
+        return changes
+
+    def changes_since(self, since: int) -> dict | None:
+        """Return the tasks added, updated and removed after revision ``since``.
+
+        Returns ``None`` when the changelog no longer covers ``since`` and
+        the client must re-fetch the full list.
+        """
+        if self._index is None or since >> REVISION_BITS != self._epoch:
+            return None
+        if since < self._log_floor or since > self._revision:
+            return None
+
+        first: dict[str, str] = {}
+        last: dict[str, str] = {}
+        for rev, task_id, op in reversed(self._log):
+            if rev <= since:
+                break
+            last.setdefault(task_id, op)
+            first[task_id] = op
+
+        added, updated, removed = [], [], []
+        for task_id, op in last.items():
+            if op == "removed":
+                if first[task_id] != "added":
+                    removed.append(task_id)
+                continue
+            task = self._index.get(task_id)
+            if task is None:
+                continue
+            (added if first[task_id] == "added" else updated).append(task.to_dict())
+
+        return {
+            "revision": self._revision,
+            "added": added,
+            "updated": updated,
+            "removed": removed,
+        }
+
+    def request_refresh(self) -> asyncio.Task:
+        """Schedule a background refresh, joining one already in flight."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._dirty = True
+            return self._refresh_task
+        self._refresh_task = asyncio.get_running_loop().create_task(self._run_refresh())
+        return self._refresh_task
+
+    async def refresh(self) -> None:
+        """Request a refresh and wait for it to land."""
+        await asyncio.shield(self.request_refresh())
+
+    async def _run_refresh(self) -> None:
+        while True:
+            self._dirty = False
+            try:
+                result = await self._client.list_tasks()
+            except Exception as e:
+                logger.warning("Task cache refresh failed: %s", e)
+                self._fetched_at = time.monotonic()
+                return
+
+            if isinstance(result, dict) and "error" in result:
+                logger.warning("Task cache refresh failed: %s", result["error"])
+                self._fetched_at = time.monotonic()
+                return
+
+            tasks = parse_tasks(result)
+            first = self._index is None
+            changes = [] if first else self._diff(tasks)
+            self._index = TaskIndex(tasks)
+            self._tasks = tasks
+            self._fetched_at = time.monotonic()
+            if first:
+                # Nothing to diff against, start the log here
+                self._revision += 1
+                self._log_floor = self._revision
+            else:
+                self._record(changes)
+            if self._on_refresh is not None:
+                self._on_refresh(tasks)
+
+            if not self._dirty:
+                return
+
+    async def close(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+
+
+def _org_signature(directory: Path) -> tuple:
+    sig = []
+    for path in sorted(directory.rglob("*.org")):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        sig.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+class OrgWatcher:
+    """Poll spacecadet's org directory and refresh the cache when files change.
+
+    Uses mtime/size polling rather than inotify so it works everywhere
+    without an extra dependency; stat-ing a handful of org files once a
+    second is negligible.
+    """
+
+    def __init__(
+        self,
+        cache: TaskCache,
+        directory: str | None = None,
+        interval: float | None = None,
+    ):
+        self._cache = cache
+        self._directory = Path(directory or settings.org_dir)
+        self._interval = interval if interval is not None else settings.org_watch_interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        last = await asyncio.to_thread(_org_signature, self._directory)
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                current = await asyncio.to_thread(_org_signature, self._directory)
+            except OSError as e:
+                logger.warning("Org watcher failed to scan %s: %s", self._directory, e)
+                continue
+            if current != last:
+                last = current
+                logger.info("Org files changed — refreshing task cache")
+                self._cache.request_refresh()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import base64
+import bisect
+import json
+import re
+from typing import Any
+
+from .task_record import Task
+
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+SORT_FIELDS = ("deadline", "scheduled", "priority", "heading", "state")
+
+
+def _date(value: Any) -> str | None:
+    if not value:
+        return None
+    match = DATE_RE.search(str(value))
+    return match.group(0) if match else None
+
+
+def _sort_value(task: Task, field: str) -> str | None:
+    if field in ("deadline", "scheduled"):
+        return _date(getattr(task, field))
+    value = getattr(task, field)
+    if field == "heading" and value:
+        return value.lower()
+    return value or None
+
+
+class _Desc:
+    """Wraps a sort value so ascending comparisons order it descending."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: _Desc) -> bool:
+        return self.value > other.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Desc) and self.value == other.value
+
+
+def _sort_key(value, task_id: str, descending: bool) -> tuple:
+    # Tasks missing the sort field always go last, regardless of direction
+    if value is None:
+        return (True, "", task_id)
+    return (False, _Desc(value) if descending else value, task_id)
+
+
+def encode_cursor(value, task_id: str) -> str:
+    raw = json.dumps([value, task_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        value, task_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return value, str(task_id)
+
+
+class TaskIndex:
+    """Secondary indexes over one task-cache snapshot.
+
+    Each index maps a field value to the set of positions in ``tasks`` so a
+    filtered query only touches the tasks it returns. Deadlines are kept in
+    a sorted list for range queries.
+    """
+
+    def __init__(self, tasks: list[Task]):
+        self.tasks = tasks
+        self.by_id: dict[str, int] = {}
+        self.by_state: dict[str, set[int]] = {}
+        self.by_priority: dict[str, set[int]] = {}
+        self.by_tag: dict[str, set[int]] = {}
+        self._deadlines: list[tuple[str, int]] = []
+
+        for pos, task in enumerate(tasks):
+            self._add(pos, task)
+        self._deadlines.sort()
+
+    def _add(self, pos: int, task: Task) -> None:
+        if task.id:
+            self.by_id[task.id] = pos
+        self.by_state.setdefault(task.state, set()).add(pos)
+        if task.priority:
+            self.by_priority.setdefault(task.priority, set()).add(pos)
+        for tag in task.tags:
+            self.by_tag.setdefault(tag, set()).add(pos)
+        deadline = _date(task.deadline)
+        if deadline:
+            self._deadlines.append((deadline, pos))
+
+    def _remove(self, pos: int, task: Task) -> None:
+        self.by_state.get(task.state, set()).discard(pos)
+        if task.priority:
+            self.by_priority.get(task.priority, set()).discard(pos)
+        for tag in task.tags:
+            self.by_tag.get(tag, set()).discard(pos)
+        deadline = _date(task.deadline)
+        if deadline:
+            i = bisect.bisect_left(self._deadlines, (deadline, pos))
+            if i < len(self._deadlines) and self._deadlines[i] == (deadline, pos):
+                del self._deadlines[i]
+
+    def get(self, task_id: str) -> Task | None:
+        pos = self.by_id.get(task_id)
+        return self.tasks[pos] if pos is not None else None
+
+    def update(self, task_id: str, changes: dict[str, Any]) -> Task | None:
+        """Apply ``changes`` to a task in place, keeping the indexes in sync."""
+        pos = self.by_id.get(task_id)
+        if pos is None:
+            return None
+        task = self.tasks[pos]
+        self._remove(pos, task)
+        try:
+            task.update(changes)
+        finally:
+            self._add(pos, task)
+        deadline = _date(task.deadline)
+        if deadline:
+            # _add appended; restore ordering for the one new entry
+            self._deadlines.pop()
+            bisect.insort(self._deadlines, (deadline, pos))
+        return task
+
+    def _deadline_range(self, start: str | None, end: str | None) -> set[int]:
+        lo = bisect.bisect_left(self._deadlines, (start, -1)) if start else 0
+        hi = (
+            bisect.bisect_right(self._deadlines, (end, len(self.tasks)))
+            if end else len(self._deadlines)
+        )
+        return {pos for _, pos in self._deadlines[lo:hi]}
+
+    @staticmethod
+    def _lookup(index: dict[str, set[int]], values: str) -> set[int]:
+        result: set[int] = set()
+        for value in values.split(","):
+            result |= index.get(value.strip(), set())
+        return result
+
+    def query(
+        self,
+        state: str | None = None,
+        priority: str | None = None,
+        tag: str | None = None,
+        deadline_from: str | None = None,
+        deadline_to: str | None = None,
+        sort: str | None = None,
+        descending: bool = False,
+        cursor: str | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[Task], str | None, int]:
+        """Return ``(page, next_cursor, total_matching)``.
+
+        ``state``, ``priority`` and ``tag`` accept comma-separated values
+        (any match). Deadline bounds are inclusive ``YYYY-MM-DD`` dates.
+        """
+        if sort is not None and sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+
+        candidates: list[set[int]] = []
+        if state:
+            candidates.append(self._lookup(self.by_state, state))
+        if priority:
+            candidates.append(self._lookup(self.by_priority, priority))
+        if tag:
+            candidates.append(self._lookup(self.by_tag, tag))
+        if deadline_from or deadline_to:
+            candidates.append(self._deadline_range(deadline_from, deadline_to))
+
+        if candidates:
+            candidates.sort(key=len)
+            smallest, rest = candidates[0], candidates[1:]
+            positions = sorted(p for p in smallest if all(p in c for c in rest))
+        else:
+            positions = range(len(self.tasks))
+
+        def value(pos: int):
+            # Without an explicit sort, results keep org-file order
+            return _sort_value(self.tasks[pos], sort) if sort else pos
+
+        keyed = sorted(
+            (_sort_key(value(p), self.tasks[p].id, descending), p)
+            for p in positions
+        )
+        total = len(keyed)
+
+        start = 0
+        if cursor is not None:
+            after = _sort_key(*decode_cursor(cursor), descending)
+            try:
+                start = bisect.bisect_right(keyed, (after, len(self.tasks)))
+            except TypeError as e:
+                raise ValueError("Cursor does not match the requested sort") from e
+
+        end = total if limit is None else start + limit
+        page = keyed[start:end]
+        next_cursor = None
+        if end < total and page:
+            last = page[-1][1]
+            next_cursor = encode_cursor(value(last), self.tasks[last].id)
+        return [self.tasks[p] for _, p in page], next_cursor, total
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import sys
+from typing import Any, Iterable
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode JSON with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode JSON as bytes with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _intern(value: Any) -> Any:
+    # States, priorities, tags and dates repeat across thousands of tasks;
+    # interning makes every task share one copy of each.
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Task:
+    """One spacecadet task, stored compactly.
+
+    spacecadet reports the TODO keyword as ``todo``; here it is always
+    ``state``, and ``to_dict`` converts back to the wire format the API and
+    browser use. Fields spacecadet sends that concierge doesn't know about
+    are kept in ``extra`` so they survive the round trip.
+    """
+
+    __slots__ = ("id", "heading", "state", "priority", "tags", "deadline", "scheduled", "extra")
+
+    # Wire name -> attribute
+    ALIASES = {"todo": "state"}
+    FIELDS = ("id", "heading", "state", "priority", "tags", "deadline", "scheduled")
+
+    def __init__(
+        self,
+        id: str,
+        heading: str = "",
+        state: str = "TODO",
+        priority: str | None = None,
+        tags: Iterable[str] = (),
+        deadline: str | None = None,
+        scheduled: str | None = None,
+        extra: dict[str, Any] | None = None,
+    ):
+        self.id = id
+        self.heading = heading
+        self.state = _intern(state)
+        self.priority = _intern(priority)
+        self.tags = tuple(_intern(t) for t in tags)
+        self.deadline = _intern(deadline)
+        self.scheduled = scheduled
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Task:
+        extra = {
+            k: v for k, v in data.items()
+            if k not in cls.FIELDS and k not in cls.ALIASES
+        }
+        return cls(
+            id=str(data.get("id") or ""),
+            heading=data.get("heading") or "",
+            state=data.get("todo") or data.get("state") or "TODO",
+            priority=data.get("priority") or None,
+            tags=data.get("tags") or (),
+            deadline=data.get("deadline") or None,
+            scheduled=data.get("scheduled") or None,
+            extra=extra or None,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {
+            "id": self.id,
+            "heading": self.heading,
+            "todo": self.state,
+            "priority": self.priority,
+            "tags": list(self.tags),
+            "deadline": self.deadline,
+            "scheduled": self.scheduled,
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def update(self, changes: dict[str, Any]) -> None:
+        """Apply ``changes`` keyed by attribute or wire name.
+
+        Raises ``KeyError`` for an unknown field, before changing anything.
+        """
+        names = {key: self.ALIASES.get(key, key) for key in changes}
+        for key, name in names.items():
+            if name not in self.FIELDS or name == "id":
+                raise KeyError(f"Unknown task field: {key}")
+        for key, value in changes.items():
+            name = names[key]
+            if name == "tags":
+                value = tuple(_intern(t) for t in value or ())
+            elif name != "heading":
+                value = _intern(value)
+            setattr(self, name, value)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Task(id={self.id!r}, state={self.state!r}, heading={self.heading!r})"
+
+
+def task_dicts(result: Any) -> list[dict[str, Any]]:
+    """The task dicts of a ``list_tasks`` result, without building records.
+
+    Accepts the decoded result (a list, or a dict with a ``tasks`` key) or
+    raw JSON text, which is decoded with ``loads``.
+    """
+    if isinstance(result, (str, bytes)):
+        result = loads(result)
+    if isinstance(result, dict):
+        result = result.get("tasks", [])
+    return [t for t in result if isinstance(t, dict)]
+
+
+def parse_tasks(result: Any) -> list[Task]:
+    """Build task records from a ``list_tasks`` result (see ``task_dicts``)."""
+    return [Task.from_dict(t) for t in task_dicts(result)]
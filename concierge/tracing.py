@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import IO, Any
+
+from .config import settings
+from .metrics import REGISTRY, Histogram
+
+logger = logging.getLogger("concierge")
+
+_current: ContextVar[Trace | None] = ContextVar("concierge_trace", default=None)
+_ids = itertools.count(1)
+_trace_out: IO[str] | None = None
+
+
+def stage_histogram(stage: str) -> Histogram:
+    return REGISTRY.histogram(
+        "stage_seconds", "Time spent per pipeline stage", labels={"stage": stage}
+    )
+
+
+class Span:
+    """One timed stage of a trace, measured on the monotonic clock."""
+
+    __slots__ = ("name", "start", "end", "attrs", "_trace")
+
+    def __init__(self, trace: Trace, name: str, attrs: dict[str, Any]):
+        self._trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+        self.end = 0.0
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> Span:
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end = time.monotonic()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self._trace.add(self)
+        return False
+
+
+class Trace:
+    """Spans recorded for one burst (or one write batch) end to end.
+
+    Entering the trace makes it current for the running task, so
+    ``span()`` calls anywhere down the call chain attach to it without the
+    trace being passed around explicitly.
+    """
+
+    __slots__ = ("id", "name", "start", "wall", "attrs", "spans", "_token")
+
+    def __init__(self, name: str, start: float | None = None, attrs: dict[str, Any] | None = None):
+        self.id = f"{next(_ids):x}"
+        self.name = name
+        self.start = start if start is not None else time.monotonic()
+        self.wall = time.time() - (time.monotonic() - self.start)
+        self.attrs = attrs or {}
+        self.spans: list[Span] = []
+        self._token = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def span(self, name: str, **attrs: Any) -> Span:
+        return Span(self, name, attrs)
+
+    def add(self, span: Span) -> None:
+        self.spans.append(span)
+        stage_histogram(span.name).observe(span.end - span.start)
+
+    def record(self, name: str, start: float, end: float | None = None, **attrs: Any) -> None:
+        """Add a span whose timing was measured elsewhere."""
+        span = Span(self, name, attrs)
+        span.start = start
+        span.end = end if end is not None else time.monotonic()
+        self.add(span)
+
+    def __enter__(self) -> Trace:
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.finish()
+        return False
+
+    def finish(self) -> None:
+        duration = time.monotonic() - self.start
+        stage_histogram(self.name).observe(duration)
+        if settings.trace_file:
+            _write(self.to_dict(duration))
+
+    def to_dict(self, duration: float | None = None) -> dict[str, Any]:
+        if duration is None:
+            duration = time.monotonic() - self.start
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "ts": round(self.wall, 6),
+            "duration": round(duration, 6),
+            "attrs": self.attrs,
+            "spans": [
+                {
+                    "name": s.name,
+                    "offset": round(s.start - self.start, 6),
+                    "duration": round(s.end - s.start, 6),
+                    **({"attrs": s.attrs} if s.attrs else {}),
+                }
+                for s in sorted(self.spans, key=lambda s: s.start)
+            ],
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span or trace when nothing is being sampled."""
+
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def record(self, name: str, start: float, end: float | None = None, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP = _NoopSpan()
+
+
+def trace(name: str, start: float | None = None, **attrs: Any) -> Trace | _NoopSpan:
+    """Start a trace, subject to ``settings.trace_sample_rate``.
+
+    ``start`` backdates the trace to a ``time.monotonic()`` reading, e.g.
+    when the first message of a burst arrived.
+    """
+    rate = settings.trace_sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return NOOP
+    return Trace(name, start, attrs)
+
+
+def span(name: str, **attrs: Any) -> Span | _NoopSpan:
+    """Time a stage of the current trace; a shared no-op when there is none."""
+    current = _current.get()
+    if current is None:
+        return NOOP
+    return Span(current, name, attrs)
+
+
+def current() -> Trace | None:
+    return _current.get()
+
+
+def record(name: str, start: float, end: float | None = None, **attrs: Any) -> None:
+    """Add a span measured by the caller to the current trace, if any."""
+    current = _current.get()
+    if current is not None:
+        current.record(name, start, end, **attrs)
+
+
+def annotate(**attrs: Any) -> None:
+    """Attach attributes to the current trace, if any."""
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def _write(entry: dict[str, Any]) -> None:
+    global _trace_out
+    try:
+        if _trace_out is None or _trace_out.name != settings.trace_file:
+            if _trace_out is not None:
+                _trace_out.close()
+            _trace_out = open(settings.trace_file, "a", encoding="utf-8")
+        _trace_out.write(json.dumps(entry, default=str) + "\n")
+        _trace_out.flush()
+    except OSError as e:
+        logger.warning("Could not write trace to %s: %s", settings.trace_file, e)
@@ -3,11 +3,18 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
+import uuid
+from collections import OrderedDict
 
 from fastapi import WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
 
+from . import tracing
 from .burst import BurstDetector
-from .inbox import Inbox
+from .config import settings
+from .llm import limiter
+from .metrics import REGISTRY
 from .models import (
     Burst,
     IntentType,
@@ -19,109 +26,201 @@ from .models import (
     ws_response,
     ws_status_update,
     ws_task_list,
+    ws_task_list_chunk,
 )
+from .outbox import Outbox
+from .sessions import SessionRegistry
 from .status import StatusMachine
+from .task_record import Task, parse_tasks
 
 logger = logging.getLogger("concierge")
 
+CONNECTIONS = REGISTRY.gauge("ws_connections", "Open WebSocket connections")
+
+# Task lists a connection can still page through; older ones are forgotten
+MAX_OPEN_LISTS = 8
+
 
 async def websocket_endpoint(websocket: WebSocket) -> None:
+    app = websocket.app
+    sessions: SessionRegistry = app.state.sessions
+    session = sessions.open(websocket.client.host if websocket.client else "unknown")
     await websocket.accept()
+    if session is None:
+        logger.warning("Refusing WebSocket: %d sessions open", len(sessions))
+        await websocket.close(code=1013, reason="server busy")
+        return
+    CONNECTIONS.inc()
 
-    inbox = Inbox()
+    inbox = sessions.inbox
     closed = False
 
+    def on_overflow() -> None:
+        # 1013 "try again later": the client reconnects and resyncs
+        asyncio.get_running_loop().create_task(websocket.close(code=1013))
+
+    # Clients opt in to batched frames with /ws?batch=1
+    batch = websocket.query_params.get("batch") == "1"
+    outbox = Outbox(websocket.send_text, on_overflow=on_overflow, batch=batch)
+    outbox.start()
+    session.outbox = outbox
+
     async def send(msg: WSOutgoing) -> None:
-        if closed:
-            return
-        try:
-            await websocket.send_text(msg.model_dump_json())
-        except RuntimeError:
-            return
+        # Queued, never awaited: a slow client must not stall the pipeline
+        if not closed:
+            outbox.put(msg)
 
     status = StatusMachine(send)
 
     # Access pipeline components from app state
-    app = websocket.app
     classifier = getattr(app.state, "classifier", None)
     reconciler = getattr(app.state, "reconciler", None)
     acknowledger = getattr(app.state, "acknowledger", None)
+    task_cache = getattr(app.state, "task_cache", None)
+    journal = getattr(app.state, "intent_journal", None)
+    event_hub = getattr(app.state, "event_hub", None)
+    subscription = None
+    forwarder: asyncio.Task | None = None
+
+    async def forward_events() -> None:
+        # Events arrive pre-serialized; forward the shared frame unchanged
+        while True:
+            event = await subscription.get()
+            if closed:
+                return
+            outbox.put_event(event)
+
+    task_lists: OrderedDict[str, list[Task]] = OrderedDict()
+
+    async def send_task_list(tasks: list[Task]) -> None:
+        # Only the first page goes out now; the client asks for the rest as
+        # the user scrolls, up to the server-side cap
+        shown = tasks[:settings.ws_task_list_max]
+        page = settings.ws_task_list_page
+        list_id = None
+        if len(shown) > page:
+            list_id = uuid.uuid4().hex[:12]
+            task_lists[list_id] = shown
+            while len(task_lists) > MAX_OPEN_LISTS:
+                task_lists.popitem(last=False)
+        await send(ws_task_list(
+            shown[:page],
+            header=f"{len(tasks)} task(s)",
+            list_id=list_id,
+            total=len(shown),
+            omitted=len(tasks) - len(shown),
+        ))
+
+    async def send_task_list_chunk(list_id: str, offset) -> None:
+        tasks = task_lists.get(list_id)
+        if tasks is None or not isinstance(offset, int) or not 0 <= offset < len(tasks):
+            return
+        chunk = tasks[offset:offset + settings.ws_task_list_page]
+        await send(ws_task_list_chunk(list_id, chunk, offset))
 
     burst_done = asyncio.Event()
     burst_done.set()
+    burst_task: asyncio.Task | None = None
 
     async def on_burst(burst: Burst) -> None:
+        nonlocal burst_task
+        burst_task = asyncio.current_task()
         burst_done.clear()
         try:
             for m in burst.messages:
                 await send(ws_status_update(m.id, MessageStatus.READ))
 
-            await status.set(SystemStatus.TYPING)
+            session.bursts += 1
+            tracing.annotate(session=session.id, user=session.user)
+            # LLM calls queued over the provider's limit are admitted per user in turn
+            limiter.caller.set(session.user)
+            # Bursts from all sessions share a fixed number of slots
+            queued = time.monotonic()
+            async with sessions.burst_slot(session):
+                tracing.record("queue", queued)
+                await process_burst(burst)
+        except Exception as e:
+            logger.error("Burst processing error: %s", e)
+            await send(ws_error(str(e)))
+            await status.set(SystemStatus.IDLE)
+        finally:
+            session.set_stage("idle")
+            burst_done.set()
 
-            # Step 1: Classify intents
-            if classifier is None:
-                await send(ws_response("[no LLM configured]"))
-                await status.set(SystemStatus.IDLE)
-                return
+    async def process_burst(burst: Burst) -> None:
+        await status.set(SystemStatus.TYPING)
 
-            intents = await classifier.classify(burst)
-            if not intents:
-                await send(ws_response("I couldn't understand that — could you rephrase?"))
-                await status.set(SystemStatus.IDLE)
-                return
+        # Step 1: Classify intents
+        session.set_stage("classifying")
+        if classifier is None:
+            await send(ws_response("[no LLM configured]"))
+            await status.set(SystemStatus.IDLE)
+            return
 
-            # Send interim message for status queries
-            has_query = any(i.intent == IntentType.STATUS_QUERY for i in intents)
-            if has_query:
-                await send(ws_response("Searching..."))
+        intents = await classifier.classify(burst)
+        if not intents:
+            await send(ws_response("I couldn't understand that — could you rephrase?"))
+            await status.set(SystemStatus.IDLE)
+            return
 
-            # Step 2: Reconcile against spacecadet
-            await status.set(SystemStatus.PROCESSING)
+        # Send interim message for status queries
+        has_query = any(i.intent == IntentType.STATUS_QUERY for i in intents)
+        if has_query:
+            await send(ws_response("Searching..."))
 
-            if reconciler is not None:
-                results = await reconciler.reconcile(intents)
-            else:
-                results = [{"note": "spacecadet not connected — task not persisted"}] * len(intents)
-
-            # Step 3: Send structured task list for status queries
-            has_task_list = False
-            for intent, result in zip(intents, results):
-                if intent.intent == IntentType.STATUS_QUERY and "error" not in result:
-                    tasks = result if isinstance(result, list) else [result]
-                    await send(ws_task_list(tasks, header=f"{len(tasks)} task(s)"))
-                    has_task_list = True
-
-            # Step 4: Generate acknowledgement for non-query intents
-            non_query = [
-                (i, r) for i, r in zip(intents, results)
-                if i.intent != IntentType.STATUS_QUERY
-            ]
-
-            if non_query:
-                await status.set(SystemStatus.TYPING)
-                if acknowledger is not None:
-                    ack = await acknowledger.acknowledge(
-                        [i for i, _ in non_query],
-                        [r for _, r in non_query],
-                    )
-                else:
-                    ack = f"Processed {len(non_query)} action(s)"
-                await send(ws_response(ack))
-            elif not has_task_list:
-                await status.set(SystemStatus.TYPING)
-                if acknowledger is not None:
-                    ack = await acknowledger.acknowledge(intents, results)
+        # Step 2: Reconcile against spacecadet
+        await status.set(SystemStatus.PROCESSING)
+        session.set_stage("reconciling")
+
+        if reconciler is not None:
+            with tracing.span("reconcile", intents=len(intents)):
+                if journal is not None:
+                    # Task changes are journaled and acknowledged right away
+                    results = await journal.submit(intents, session, burst)
                 else:
-                    ack = f"Processed {len(intents)} intent(s)"
-                await send(ws_response(ack))
+                    results = await reconciler.reconcile(intents)
+            if task_cache is not None and not all(
+                i.intent == IntentType.STATUS_QUERY for i in intents
+            ):
+                task_cache.request_refresh()
+        else:
+            results = [{"note": "spacecadet not connected — task not persisted"}] * len(intents)
 
-            await status.set(SystemStatus.IDLE)
-        except Exception as e:
-            logger.error("Burst processing error: %s", e)
-            await send(ws_error(str(e)))
-            await status.set(SystemStatus.IDLE)
-        finally:
-            burst_done.set()
+        # Step 3: Send structured task list for status queries
+        has_task_list = False
+        for intent, result in zip(intents, results):
+            if intent.intent == IntentType.STATUS_QUERY and "error" not in result:
+                # list_tasks returns a list, get_task a single task
+                single = isinstance(result, dict) and "tasks" not in result
+                await send_task_list(parse_tasks([result] if single else result))
+                has_task_list = True
+
+        # Step 4: Generate acknowledgement for non-query intents
+        session.set_stage("acknowledging")
+        non_query = [
+            (i, r) for i, r in zip(intents, results)
+            if i.intent != IntentType.STATUS_QUERY
+        ]
+
+        if non_query:
+            await status.set(SystemStatus.TYPING)
+            if acknowledger is not None:
+                ack = await acknowledger.acknowledge(
+                    [i for i, _ in non_query],
+                    [r for _, r in non_query],
+                )
+            else:
+                ack = f"Processed {len(non_query)} action(s)"
+            await send(ws_response(ack))
+        elif not has_task_list:
+            await status.set(SystemStatus.TYPING)
+            if acknowledger is not None:
+                ack = await acknowledger.acknowledge(intents, results)
+            else:
+                ack = f"Processed {len(intents)} intent(s)"
+            await send(ws_response(ack))
+
+        await status.set(SystemStatus.IDLE)
 
     detector = BurstDetector(on_burst=on_burst)
 
@@ -134,6 +233,16 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
                 await send(ws_error("Invalid JSON"))
                 continue
 
+            if data.get("type") == "task_list_more":
+                await send_task_list_chunk(data.get("list_id"), data.get("offset"))
+                continue
+
+            if data.get("type") == "subscribe":
+                if data.get("topic") == "tasks" and event_hub is not None and subscription is None:
+                    subscription = event_hub.subscribe()
+                    forwarder = asyncio.create_task(forward_events())
+                continue
+
             text = data.get("text", "").strip()
             if not text:
                 continue
@@ -147,10 +256,27 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
 
     except WebSocketDisconnect:
         logger.info("Client disconnected")
+    except RuntimeError:
+        # Receiving on a socket we closed ourselves (outbox overflow) raises
+        # RuntimeError; any other one is a bug, not a disconnect
+        states = (websocket.application_state, websocket.client_state)
+        if WebSocketState.DISCONNECTED not in states:
+            raise
+        logger.info("Client disconnected")
     finally:
         closed = True
+        if forwarder is not None:
+            forwarder.cancel()
+        if subscription is not None:
+            subscription.close()
+        # A burst still waiting for a slot has nobody left to answer
+        if session.stage == "queued" and burst_task is not None:
+            burst_task.cancel()
         # Wait for any in-flight burst to finish (up to 5s)
         try:
             await asyncio.wait_for(burst_done.wait(), timeout=5.0)
         except asyncio.TimeoutError:
             pass
+        await outbox.close()
+        sessions.close(session)
+        CONNECTIONS.dec()
@@ -6,6 +6,8 @@ const connectionDot = document.getElementById("connection-status");
 
 let ws = null;
 const messageElements = new Map();
+// task id -> state pills rendered in chat task lists, kept live by task_changes events
+const taskPills = new Map();
 
 const STATE_COLORS = {
     TODO: "#5e81ac",
@@ -24,14 +26,17 @@ const PRIORITY_BADGES = {
 
 function connect() {
     const proto = location.protocol === "https:" ? "wss:" : "ws:";
-    ws = new WebSocket(`${proto}//${location.host}/ws`);
+    // batch=1: the server groups frames from one tick into a single batch frame
+    ws = new WebSocket(`${proto}//${location.host}/ws?batch=1`);
 
     ws.onopen = () => {
         connectionDot.className = "status-dot connected";
+        ws.send(JSON.stringify({ type: "subscribe", topic: "tasks" }));
     };
 
     ws.onclose = () => {
         connectionDot.className = "status-dot disconnected";
+        openTaskLists.forEach(closeTaskList);
         setTimeout(connect, 2000);
     };
 
@@ -41,7 +46,11 @@ function connect() {
 
     ws.onmessage = (event) => {
         const msg = JSON.parse(event.data);
-        handleServerMessage(msg);
+        if (msg.type === "batch") {
+            msg.data.frames.forEach(handleServerMessage);
+        } else {
+            handleServerMessage(msg);
+        }
     };
 }
 
@@ -62,16 +71,44 @@ function handleServerMessage(msg) {
             typingIndicator.classList.add("hidden");
             break;
         case "task_list":
-            addTaskList(msg.data.tasks, msg.data.header);
+            addTaskList(msg.data);
             typingIndicator.classList.add("hidden");
             break;
+        case "task_list_chunk":
+            appendTaskChunk(msg.data);
+            break;
+        case "correction":
+            addMessage(msg.data.text, "system");
+            break;
         case "error":
             addMessage(msg.data.message, "system");
             typingIndicator.classList.add("hidden");
             break;
+        case "task_changes":
+            applyTaskChanges(msg.data);
+            break;
     }
 }
 
+function applyTaskChanges(delta) {
+    delta.added.concat(delta.updated).forEach((t) => {
+        (taskPills.get(t.id) || []).forEach((pill) => setPillState(pill, t.todo || "TODO"));
+    });
+    delta.removed.forEach((id) => {
+        (taskPills.get(id) || []).forEach((pill) => {
+            pill.closest(".task-card").classList.add("task-removed");
+        });
+        taskPills.delete(id);
+    });
+}
+
+function setPillState(pill, state) {
+    pill.textContent = state;
+    pill.style.background = STATE_COLORS[state] || "#5e81ac";
+    pill.title = state === "DONE" ? "Mark as TODO" : "Mark as DONE";
+    pill._state = state;
+}
+
 function addMessage(text, sender, messageId) {
     const el = document.createElement("div");
     el.className = `message ${sender}`;
@@ -92,32 +129,125 @@ function addMessage(text, sender, messageId) {
     messagesEl.scrollTop = messagesEl.scrollHeight;
 }
 
-function addTaskList(tasks, header) {
+// Long task lists arrive one page at a time; the next page is requested
+// when the end of the list scrolls into view
+const openTaskLists = new Map();
+const taskListObserver = new IntersectionObserver((entries) => {
+    entries.forEach((entry) => {
+        if (entry.isIntersecting) requestMoreTasks(entry.target._listId);
+    });
+}, { root: messagesEl, rootMargin: "200px" });
+
+function addTaskList(data) {
+    const tasks = data.tasks || [];
     const wrapper = document.createElement("div");
     wrapper.className = "message system task-list-msg";
 
-    if (header) {
+    if (data.header) {
         const h = document.createElement("div");
         h.className = "task-list-header";
-        h.textContent = header;
+        h.textContent = data.header;
         wrapper.appendChild(h);
     }
 
-    if (!tasks || tasks.length === 0) {
+    if (tasks.length === 0) {
         const empty = document.createElement("div");
         empty.className = "task-card";
         empty.textContent = "No tasks found.";
         wrapper.appendChild(empty);
-    } else {
-        tasks.forEach((t) => {
-            wrapper.appendChild(renderTaskCard(t));
-        });
+        messagesEl.appendChild(wrapper);
+        messagesEl.scrollTop = messagesEl.scrollHeight;
+        return;
     }
 
+    const list = {
+        id: data.list_id,
+        tasks: [],
+        total: data.total || tasks.length,
+        omitted: data.omitted || 0,
+        loading: false,
+        cards: document.createElement("div"),
+        footer: document.createElement("div"),
+        allDone: null,
+    };
+    list.footer.className = "task-list-footer";
+    list.footer._listId = list.id;
+    wrapper.appendChild(list.cards);
+    wrapper.appendChild(list.footer);
+    appendTaskCards(list, tasks);
+
+    if (list.id && list.tasks.length < list.total) {
+        openTaskLists.set(list.id, list);
+        taskListObserver.observe(list.footer);
+    }
+    updateTaskListFooter(list);
+
     messagesEl.appendChild(wrapper);
     messagesEl.scrollTop = messagesEl.scrollHeight;
 }
 
+function appendTaskCards(list, tasks) {
+    const fragment = document.createDocumentFragment();
+    tasks.forEach((t) => fragment.appendChild(renderTaskCard(t)));
+    list.cards.appendChild(fragment);
+    list.tasks = list.tasks.concat(tasks);
+}
+
+function requestMoreTasks(listId) {
+    const list = openTaskLists.get(listId);
+    if (!list || list.loading || !ws || ws.readyState !== WebSocket.OPEN) return;
+    list.loading = true;
+    ws.send(JSON.stringify({ type: "task_list_more", list_id: listId, offset: list.tasks.length }));
+}
+
+function appendTaskChunk(data) {
+    const list = openTaskLists.get(data.list_id);
+    if (!list || data.offset !== list.tasks.length) return;
+    appendTaskCards(list, data.tasks);
+    list.loading = false;
+    if (list.tasks.length >= list.total || data.tasks.length === 0) {
+        closeTaskList(list);
+    } else {
+        updateTaskListFooter(list);
+    }
+}
+
+// Stop paging: the list is complete, or the server forgot it on reconnect
+function closeTaskList(list) {
+    taskListObserver.unobserve(list.footer);
+    openTaskLists.delete(list.id);
+    list.omitted += list.total - list.tasks.length;
+    list.total = list.tasks.length;
+    updateTaskListFooter(list);
+}
+
+function updateTaskListFooter(list) {
+    list.footer.textContent = "";
+    const remaining = list.total - list.tasks.length;
+    if (remaining > 0) {
+        list.footer.textContent = "Loading\u2026 " + remaining + " more";
+    } else if (list.omitted > 0) {
+        list.footer.appendChild(document.createTextNode(list.omitted + " more \u2014 "));
+        const link = document.createElement("a");
+        link.href = "/tasks";
+        link.textContent = "open the task board";
+        list.footer.appendChild(link);
+    }
+
+    const open = list.tasks.filter((t) => t.id && (t.todo || "TODO") !== "DONE");
+    if (open.length > 1 && !list.allDone) {
+        list.allDone = document.createElement("button");
+        list.allDone.className = "filter-pill task-list-action";
+        list.allDone.addEventListener("click", () => {
+            const ids = list.tasks.filter((t) => t.id && (t.todo || "TODO") !== "DONE").map((t) => t.id);
+            markAllDone(ids);
+            list.allDone.remove();
+        });
+        list.footer.after(list.allDone);
+    }
+    if (list.allDone) list.allDone.textContent = "Mark all " + open.length + " DONE";
+}
+
 async function toggleTaskState(taskId, currentState, pill) {
     const newState = currentState === "DONE" ? "TODO" : "DONE";
     try {
@@ -127,16 +257,32 @@ async function toggleTaskState(taskId, currentState, pill) {
             body: JSON.stringify({ state: newState }),
         });
         if (res.ok && pill) {
-            pill.textContent = newState;
-            pill.style.background = STATE_COLORS[newState] || "#5e81ac";
-            pill.title = newState === "DONE" ? "Mark as TODO" : "Mark as DONE";
-            pill._state = newState;
+            setPillState(pill, newState);
         }
     } catch (e) {
         console.error("Failed to update task:", e);
     }
 }
 
+// One bulk PATCH for the whole list; pills update from the response
+async function markAllDone(ids) {
+    try {
+        const res = await fetch("/api/tasks", {
+            method: "PATCH",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(ids.map((id) => ({ id: id, changes: { state: "DONE" } }))),
+        });
+        if (!res.ok) return;
+        const data = await res.json();
+        data.results.forEach((r) => {
+            if (r.status !== "queued") return;
+            (taskPills.get(r.id) || []).forEach((pill) => setPillState(pill, "DONE"));
+        });
+    } catch (e) {
+        console.error("Failed to update tasks:", e);
+    }
+}
+
 function renderTaskCard(t) {
     const card = document.createElement("div");
     card.className = "task-card";
@@ -145,10 +291,11 @@ function renderTaskCard(t) {
     const state = t.todo || "TODO";
     const pill = document.createElement("button");
     pill.className = "task-state task-state-btn";
-    pill.textContent = state;
-    pill.style.background = STATE_COLORS[state] || "#5e81ac";
-    pill.title = state === "DONE" ? "Mark as TODO" : "Mark as DONE";
-    pill._state = state;
+    setPillState(pill, state);
+    if (t.id) {
+        if (!taskPills.has(t.id)) taskPills.set(t.id, []);
+        taskPills.get(t.id).push(pill);
+    }
     pill.addEventListener("click", (e) => {
         e.stopPropagation();
         toggleTaskState(t.id, pill._state, pill);
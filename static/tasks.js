@@ -1,5 +1,7 @@
 const taskListEl = document.getElementById("task-list");
 const taskCountEl = document.getElementById("task-count");
+const bulkBarEl = document.getElementById("bulk-bar");
+const bulkCountEl = document.getElementById("bulk-count");
 
 const STATE_COLORS = {
     TODO: "#5e81ac",
@@ -16,44 +18,164 @@ const PRIORITY_BADGES = {
     D: { label: "D", color: "#8888a0" },
 };
 
+const PAGE_SIZE = 200;
+
 let allTasks = [];
+let totalCount = 0;
+let nextCursor = null;
+let revision = null;
 let filters = { state: "", priority: "" };
 let updating = false;
+let fetchingMore = false;
+const selected = new Set();
+
+// The "Load more" button doubles as a scroll sentinel: the next page is
+// fetched as soon as it comes near the viewport
+const moreObserver = new IntersectionObserver((entries) => {
+    if (entries.some((e) => e.isIntersecting)) fetchMore();
+}, { rootMargin: "400px" });
+
+function taskQuery(limit, cursor) {
+    // Filtering and paging happen server-side; only matching tasks are sent
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (filters.state) params.set("state", filters.state);
+    if (filters.priority) params.set("priority", filters.priority);
+    if (cursor) params.set("cursor", cursor);
+    return "/api/tasks?" + params.toString();
+}
 
 async function fetchTasks() {
     if (updating) return;
     try {
-        const res = await fetch("/api/tasks");
+        // Re-fetch everything already loaded so polling doesn't collapse extra pages
+        const res = await fetch(taskQuery(Math.max(PAGE_SIZE, allTasks.length)));
         if (!res.ok) return;
         const data = await res.json();
         allTasks = Array.isArray(data) ? data : [];
+        totalCount = Number(res.headers.get("X-Total-Count") || allTasks.length);
+        nextCursor = res.headers.get("X-Next-Cursor");
+        revision = res.headers.get("X-Revision");
         render();
     } catch (e) {
         console.error("Failed to fetch tasks:", e);
     }
 }
 
-function render() {
-    const filtered = allTasks.filter((t) => {
-        if (filters.state && t.todo !== filters.state) return false;
-        if (filters.priority && t.priority !== filters.priority) return false;
-        return true;
+async function fetchMore() {
+    if (!nextCursor || fetchingMore) return;
+    fetchingMore = true;
+    const cursor = nextCursor;
+    try {
+        const res = await fetch(taskQuery(PAGE_SIZE, cursor));
+        // A filter change or full refresh while in flight makes this page stale
+        if (!res.ok || cursor !== nextCursor) return;
+        const data = await res.json();
+        const page = Array.isArray(data) ? data : [];
+        allTasks = allTasks.concat(page);
+        nextCursor = res.headers.get("X-Next-Cursor");
+        appendCards(page);
+    } catch (e) {
+        console.error("Failed to fetch tasks:", e);
+    } finally {
+        fetchingMore = false;
+    }
+}
+
+function matchesFilters(t) {
+    if (filters.state && (t.todo || "TODO") !== filters.state) return false;
+    if (filters.priority && t.priority !== filters.priority) return false;
+    return true;
+}
+
+// Apply an added/updated/removed delta from /api/tasks/changes in place
+function applyChanges(delta) {
+    const removed = new Set(delta.removed);
+    const changed = new Map();
+    delta.added.concat(delta.updated).forEach((t) => changed.set(t.id, t));
+
+    const kept = [];
+    allTasks.forEach((t) => {
+        if (removed.has(t.id)) {
+            totalCount--;
+            return;
+        }
+        const next = changed.get(t.id);
+        if (next) {
+            changed.delete(t.id);
+            if (!matchesFilters(next)) {
+                totalCount--;
+                return;
+            }
+            kept.push(next);
+            return;
+        }
+        kept.push(t);
     });
 
-    taskCountEl.textContent = filtered.length + " task" + (filtered.length !== 1 ? "s" : "");
+    // Remaining tasks are new to this view; only append them if every page is loaded
+    changed.forEach((t) => {
+        if (!matchesFilters(t)) return;
+        totalCount++;
+        if (!nextCursor) kept.push(t);
+    });
+
+    allTasks = kept;
+}
+
+async function pollChanges() {
+    if (updating) return;
+    if (revision === null) return fetchTasks();
+    try {
+        const res = await fetch("/api/tasks/changes?since=" + encodeURIComponent(revision));
+        if (!res.ok) return;
+        const delta = await res.json();
+        if (delta.reset) return fetchTasks();
+        if (String(delta.revision) === revision) return;
+        revision = String(delta.revision);
+        applyChanges(delta);
+        render();
+    } catch (e) {
+        console.error("Failed to fetch task changes:", e);
+    }
+}
+
+function render() {
+    renderBulkBar();
+    taskCountEl.textContent = totalCount + " task" + (totalCount !== 1 ? "s" : "");
+    moreObserver.disconnect();
     taskListEl.innerHTML = "";
 
-    if (filtered.length === 0) {
+    if (allTasks.length === 0) {
         const empty = document.createElement("div");
         empty.className = "empty-state";
-        empty.textContent = allTasks.length === 0 ? "No tasks yet." : "No tasks match filters.";
+        empty.textContent = filters.state || filters.priority ? "No tasks match filters." : "No tasks yet.";
         taskListEl.appendChild(empty);
         return;
     }
 
-    filtered.forEach((t) => {
-        taskListEl.appendChild(renderTaskCard(t));
-    });
+    appendCards(allTasks);
+}
+
+// Append cards for newly loaded tasks without rebuilding the ones on screen
+function appendCards(tasks) {
+    const oldMore = taskListEl.querySelector(".load-more");
+    if (oldMore) {
+        moreObserver.unobserve(oldMore);
+        oldMore.remove();
+    }
+
+    const fragment = document.createDocumentFragment();
+    tasks.forEach((t) => fragment.appendChild(renderTaskCard(t)));
+
+    if (nextCursor) {
+        const more = document.createElement("button");
+        more.className = "load-more";
+        more.textContent = "Load more (" + (totalCount - allTasks.length) + " remaining)";
+        more.addEventListener("click", fetchMore);
+        fragment.appendChild(more);
+        moreObserver.observe(more);
+    }
+    taskListEl.appendChild(fragment);
 }
 
 async function toggleTaskState(taskId, currentState, pill) {
@@ -87,13 +209,72 @@ async function toggleTaskState(taskId, currentState, pill) {
     }
 }
 
+function renderBulkBar() {
+    bulkBarEl.classList.toggle("hidden", selected.size === 0);
+    bulkCountEl.textContent = selected.size + " selected";
+}
+
+// Apply the same changes to every selected task with one bulk PATCH
+async function bulkUpdate(changes) {
+    if (updating || selected.size === 0) return;
+    updating = true;
+    const ids = Array.from(selected);
+    const previous = new Map();
+    allTasks.forEach((t) => {
+        if (!selected.has(t.id)) return;
+        previous.set(t.id, { todo: t.todo, priority: t.priority });
+        if (changes.state) t.todo = changes.state;
+        if (changes.priority) t.priority = changes.priority;
+    });
+    selected.clear();
+    render();
+
+    try {
+        const res = await fetch("/api/tasks", {
+            method: "PATCH",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(ids.map((id) => ({ id: id, changes: changes }))),
+        });
+        if (!res.ok) throw new Error("HTTP " + res.status);
+        const data = await res.json();
+        // Roll back the items the server rejected
+        data.results.forEach((r) => {
+            if (r.status === "queued" || !previous.has(r.id)) return;
+            const task = allTasks.find((t) => t.id === r.id);
+            if (task) Object.assign(task, previous.get(r.id));
+        });
+    } catch (e) {
+        console.error("Failed to update tasks:", e);
+        allTasks.forEach((t) => {
+            if (previous.has(t.id)) Object.assign(t, previous.get(t.id));
+        });
+    } finally {
+        updating = false;
+        render();
+    }
+}
+
 function renderTaskCard(t) {
     const card = document.createElement("div");
     card.className = "task-card task-card-full";
+    if (selected.has(t.id)) card.classList.add("selected");
 
     const topRow = document.createElement("div");
     topRow.className = "task-card-top";
 
+    // Multi-select checkbox
+    const check = document.createElement("input");
+    check.type = "checkbox";
+    check.className = "task-select";
+    check.checked = selected.has(t.id);
+    check.addEventListener("change", () => {
+        if (check.checked) selected.add(t.id);
+        else selected.delete(t.id);
+        card.classList.toggle("selected", check.checked);
+        renderBulkBar();
+    });
+    topRow.appendChild(check);
+
     // Clickable state pill
     const state = t.todo || "TODO";
     const pill = document.createElement("button");
@@ -143,8 +324,19 @@ function renderTaskCard(t) {
     return card;
 }
 
-// Filter pills
-document.querySelectorAll(".filter-pill").forEach((btn) => {
+// Bulk actions
+document.querySelectorAll(".bulk-action").forEach((btn) => {
+    btn.addEventListener("click", () => {
+        bulkUpdate({ [btn.dataset.field]: btn.dataset.value });
+    });
+});
+document.getElementById("bulk-clear").addEventListener("click", () => {
+    selected.clear();
+    render();
+});
+
+// Filter pills (the bulk bar reuses the pill style, but not this handler)
+document.querySelectorAll(".filter-pill[data-filter]").forEach((btn) => {
     btn.addEventListener("click", () => {
         const group = btn.dataset.filter;
         const value = btn.dataset.value;
@@ -156,10 +348,36 @@ document.querySelectorAll(".filter-pill").forEach((btn) => {
         btn.classList.add("active");
 
         filters[group] = value;
-        render();
+        allTasks = [];
+        selected.clear();
+        fetchTasks();
     });
 });
 
-// Initial fetch + poll
+// Live updates: the server pushes task deltas over SSE. A delta that
+// doesn't follow our revision means we missed something, so catch up via
+// /api/tasks/changes; "resync" means we fell too far behind to catch up.
+let events = null;
+
+function connectEvents() {
+    events = new EventSource("/api/tasks/events");
+    events.addEventListener("task_changes", (e) => {
+        const delta = JSON.parse(e.data).data;
+        if (updating || revision === null || delta.revision !== Number(revision) + 1) {
+            pollChanges();
+            return;
+        }
+        revision = String(delta.revision);
+        applyChanges(delta);
+        render();
+    });
+    events.addEventListener("resync", () => fetchTasks());
+    events.addEventListener("hello", () => pollChanges());
+}
+
+// Initial fetch, then push updates; polling only while the stream is down
 fetchTasks();
-setInterval(fetchTasks, 10000);
+connectEvents();
+setInterval(() => {
+    if (!events || events.readyState !== EventSource.OPEN) pollChanges();
+}, 10000);
@@ -1,6 +1,17 @@
 import os
 
+import pytest
+
 # Ensure tests don't use real API keys
 os.environ.setdefault("CONCIERGE_LLM_PROVIDER", "anthropic")
 os.environ.setdefault("CONCIERGE_ANTHROPIC_API_KEY", "test-key")
 os.environ.setdefault("CONCIERGE_SPACECADET_PATH", "")
+os.environ.setdefault("CONCIERGE_LLM_WARMUP", "false")
+
+
+@pytest.fixture(autouse=True)
+def _inbox_dir(tmp_path, monkeypatch):
+    # WebSocket messages sent through the app are persisted to the inbox
+    from concierge.config import settings
+
+    monkeypatch.setattr(settings, "inbox_dir", str(tmp_path / "inbox"))
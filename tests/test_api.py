@@ -0,0 +1,269 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from concierge.main import app
+from concierge.task_cache import TaskCache
+
+
+class FakeSpacecadetClient:
+    def __init__(self):
+        self.calls = []
+        self.tasks = [
+            {"id": "t1", "heading": "Buy milk", "todo": "TODO", "priority": "B"},
+            {"id": "t2", "heading": "Call dentist", "todo": "TODO"},
+            {"id": "t3", "heading": "File taxes", "todo": "NEXT", "priority": "A"},
+        ]
+
+    async def call_tool(self, name, args):
+        self.calls.append((name, args))
+        for t in self.tasks:
+            if name == "update_task" and t["id"] == args["id"]:
+                if "new_state" in args:
+                    t["todo"] = args["new_state"]
+                if "priority" in args:
+                    t["priority"] = args["priority"]
+        return {"status": "ok"}
+
+    async def list_tasks(self, **kwargs):
+        return [dict(t) for t in self.tasks]
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        sc = FakeSpacecadetClient()
+        app.state.spacecadet_client = sc
+        app.state.task_cache = TaskCache(sc, hub=app.state.event_hub)
+        c.sc = sc
+        yield c
+
+
+def test_list_tasks_filters_and_pages(client):
+    res = client.get("/api/tasks", params={"state": "TODO", "limit": 1})
+    assert [t["id"] for t in res.json()] == ["t1"]
+    assert res.headers["X-Total-Count"] == "2"
+
+    res = client.get("/api/tasks", params={"state": "TODO", "cursor": res.headers["X-Next-Cursor"]})
+    assert [t["id"] for t in res.json()] == ["t2"]
+    assert "X-Next-Cursor" not in res.headers
+
+
+def test_list_tasks_conditional_get(client):
+    res = client.get("/api/tasks")
+    etag = res.headers["ETag"]
+    assert client.get("/api/tasks", headers={"If-None-Match": etag}).status_code == 304
+
+    client.patch("/api/tasks/t1", json={"state": "DONE"})
+    assert client.get("/api/tasks", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_bulk_update_applies_in_one_revision(client):
+    res = client.get("/api/tasks")
+    rev = int(res.headers["X-Revision"])
+
+    res = client.patch("/api/tasks", json=[
+        {"id": "t1", "changes": {"state": "DONE"}},
+        {"id": "t2", "changes": {"state": "DONE", "priority": "A"}},
+        {"id": "t1", "changes": {"priority": "C"}},
+        {"id": "nope", "changes": {"state": "DONE"}},
+        {"id": "t3", "changes": {"color": "red"}},
+        {"id": "t3"},
+    ])
+    body = res.json()
+    assert [r["status"] for r in body["results"]] == [
+        "queued", "queued", "queued", "not_found", "invalid", "invalid",
+    ]
+    assert body["queued"] == 2
+
+    changes = client.get("/api/tasks/changes", params={"since": rev}).json()
+    assert changes["revision"] == rev + 1
+    updated = {t["id"]: t for t in changes["updated"]}
+    assert updated["t1"]["todo"] == "DONE" and updated["t1"]["priority"] == "C"
+    assert updated["t2"]["priority"] == "A"
+
+    assert ("update_task", {"id": "t1", "new_state": "DONE", "priority": "C"}) in client.sc.calls
+    assert ("update_task", {"id": "t2", "new_state": "DONE", "priority": "A"}) in client.sc.calls
+
+
+def test_update_rejects_invalid_values(client):
+    res = client.patch("/api/tasks", json=[
+        {"id": "t1", "changes": {"state": None}},
+        {"id": "t1", "changes": {"state": 5}},
+        {"id": "t1", "changes": {"state": "FINISHED"}},
+        {"id": "t2", "changes": {"priority": "Z"}},
+        {"id": "t2", "changes": {"priority": ""}},
+    ])
+    body = res.json()
+    assert [r["status"] for r in body["results"]] == ["invalid"] * 5
+    assert body["queued"] == 0
+    tasks = {t["id"]: t for t in client.get("/api/tasks").json()}
+    assert tasks["t1"]["todo"] == "TODO" and tasks["t2"]["priority"] is None
+
+    assert client.patch("/api/tasks/t1", json={"state": "FINISHED"}).status_code == 400
+    assert client.sc.calls == []
+
+    # Every priority the UI offers is accepted
+    res = client.patch("/api/tasks", json=[{"id": "t2", "changes": {"priority": "D"}}])
+    assert res.json()["queued"] == 1
+
+
+def test_bulk_update_rejects_non_list(client):
+    res = client.patch("/api/tasks", json={"id": "t1"})
+    assert res.status_code == 400
+
+
+def test_websocket_frames_go_through_outbox(client):
+    with client.websocket_connect("/ws") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "data": {"message": "Invalid JSON"}}
+
+        ws.send_json({"type": "subscribe", "topic": "tasks"})
+        client.get("/api/tasks")
+        for _ in range(100):
+            if app.state.event_hub.subscriber_count:
+                break
+            time.sleep(0.01)
+        client.patch("/api/tasks/t1", json={"state": "DONE"})
+        frame = ws.receive_json()
+        assert frame["type"] == "task_changes"
+        assert frame["data"]["updated"][0]["todo"] == "DONE"
+
+    metrics = client.get("/api/metrics").json()
+    assert metrics["ws_send_seconds"]["count"] >= 2
+
+
+def test_large_task_list_is_paged_over_websocket(client, monkeypatch):
+    from concierge.config import settings
+    from concierge.models import IntentClassification, IntentType
+
+    monkeypatch.setattr(settings, "ws_task_list_page", 50)
+    monkeypatch.setattr(settings, "ws_task_list_max", 120)
+    monkeypatch.setattr(settings, "quiet_window", 0.01)
+
+    class Classifier:
+        async def classify(self, burst):
+            return [IntentClassification(intent=IntentType.STATUS_QUERY, raw_text="list")]
+
+    class Reconciler:
+        async def reconcile(self, intents):
+            return [[{"id": f"t{i}", "heading": f"Task {i}", "todo": "TODO"} for i in range(200)]]
+
+    monkeypatch.setattr(app.state, "classifier", Classifier())
+    monkeypatch.setattr(app.state, "reconciler", Reconciler())
+
+    def receive(ws, type):
+        while True:
+            frame = ws.receive_json()
+            if frame["type"] == type:
+                return frame["data"]
+
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"type": "message", "text": "what's on my list", "id": "m1"})
+        first = receive(ws, "task_list")
+        assert len(first["tasks"]) == 50
+        assert (first["total"], first["omitted"]) == (120, 80)
+        assert first["header"] == "200 task(s)"
+
+        ws.send_json({"type": "task_list_more", "list_id": first["list_id"], "offset": 100})
+        chunk = receive(ws, "task_list_chunk")
+        assert chunk["offset"] == 100
+        assert [t["id"] for t in chunk["tasks"]] == [f"t{i}" for i in range(100, 120)]
+
+
+def test_prometheus_metrics(client, monkeypatch):
+    from concierge import tracing
+    from concierge.config import settings
+
+    monkeypatch.setattr(settings, "trace_sample_rate", 1.0)
+    with tracing.trace("burst"):
+        with tracing.span("reconcile"):
+            pass
+
+    text = client.get("/metrics").text
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_count{stage="reconcile"}' in text
+
+
+def test_startup_timings(client):
+    text = client.get("/metrics").text
+    assert 'startup_seconds{component="provider"}' in text
+    assert "provider" in app.state.startup_timings
+
+
+def test_sessions_endpoint_and_connection_cap(client, monkeypatch):
+    from starlette.websockets import WebSocketDisconnect
+
+    with client.websocket_connect("/ws") as ws:
+        ws.send_text("not json")
+        ws.receive_json()
+        sessions = client.get("/api/sessions").json()
+        assert sessions["connections"] == 1
+        assert sessions["sessions"][0]["stage"] == "idle"
+
+        monkeypatch.setattr(app.state.sessions, "max_connections", 1)
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect("/ws") as rejected:
+                rejected.receive_json()
+        assert exc.value.code == 1013
+
+
+def test_unexpected_runtime_error_is_not_a_disconnect(client, monkeypatch):
+    from concierge.burst import BurstDetector
+
+    def push(self, message):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(BurstDetector, "push", push)
+    with pytest.raises(RuntimeError, match="boom"):
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"type": "message", "text": "hello", "id": "m1"})
+            ws.receive_json()
+            ws.receive_json()
+
+
+def test_debug_profile_requires_token(client, monkeypatch):
+    from concierge.config import settings
+
+    assert client.get("/debug/profile?seconds=0.05").status_code == 404
+
+    monkeypatch.setattr(settings, "debug_token", "s3cret")
+    assert client.get("/debug/profile?seconds=0.05").status_code == 401
+
+    resp = client.get(
+        "/debug/profile?seconds=0.05", headers={"Authorization": "Bearer s3cret"}
+    )
+    assert resp.status_code == 200
+    stack, count = resp.text.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+
+def test_health_and_readiness_endpoints(client):
+    health = client.get("/healthz").json()
+    assert health["status"] == "ok"
+    assert health["components"]["spacecadet"]["state"] == "skipped"
+
+    res = client.get("/readyz")
+    assert res.status_code == 200
+    assert res.json()["ready"] is True
+
+
+def test_startup_warms_task_cache_concurrently(monkeypatch):
+    from pathlib import Path
+
+    from concierge.config import settings
+
+    fake = Path(__file__).resolve().parent.parent / "concierge" / "fake_spacecadet.py"
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "spacecadet_path", str(fake))
+    monkeypatch.setattr(settings, "spacecadet_args", "--tasks 20")
+    monkeypatch.setattr(settings, "spacecadet_pool_size", 1)
+    with TestClient(app) as c:
+        deadline = time.monotonic() + 20
+        while c.get("/readyz").status_code != 200:
+            assert time.monotonic() < deadline, c.get("/healthz").json()
+            time.sleep(0.05)
+        components = c.get("/healthz").json()["components"]
+        assert components["task_cache"]["state"] == "ready"
+        assert len(app.state.task_cache.tasks) == 20
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from concierge.llm.cassette import CassetteStore, RecordingProvider, ReplayProvider
+from concierge.models import Burst, IntentClassification, IntentType, Message
+
+
+def make_burst(*texts):
+    now = datetime.now(UTC)
+    return Burst(messages=[Message(text=t) for t in texts], started_at=now, ended_at=now)
+
+
+class SlowProvider:
+    def __init__(self):
+        self.calls = 0
+
+    async def classify_intent(self, burst):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return [IntentClassification(intent=IntentType.NEW_TASK, heading=f"{burst.messages[0].text} #{self.calls}")]
+
+    async def generate_acknowledgement(self, intents, results):
+        await asyncio.sleep(0.05)
+        return f"Added {len(intents)}"
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    return str(tmp_path / "calls.sqlite")
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_without_network(cassette):
+    recorder = RecordingProvider(SlowProvider(), CassetteStore(cassette))
+    first = await recorder.classify_intent(make_burst("buy milk"))
+    second = await recorder.classify_intent(make_burst("buy milk"))
+    ack = await recorder.generate_acknowledgement(first, [{"id": "t1"}])
+
+    store = CassetteStore(cassette, create=False)
+    assert len(store) == 3
+    replayer = ReplayProvider(store, latency="none")
+
+    # A new burst with the same text matches, whatever its ids and timestamps;
+    # repeated recordings come back in order
+    assert await replayer.classify_intent(make_burst("buy milk")) == first
+    assert await replayer.classify_intent(make_burst("buy milk")) == second
+    assert await replayer.classify_intent(make_burst("buy milk")) == first
+    assert await replayer.generate_acknowledgement(first, [{"id": "t1"}]) == ack
+
+    with pytest.raises(LookupError):
+        await replayer.classify_intent(make_burst("never recorded"))
+
+
+@pytest.mark.asyncio
+async def test_replay_latency_modes(cassette):
+    await RecordingProvider(SlowProvider(), CassetteStore(cassette)).classify_intent(make_burst("x"))
+
+    for mode, low, high in (("original", 0.045, 0.5), ("0.2", 0.005, 0.045), ("none", 0, 0.005)):
+        replayer = ReplayProvider(CassetteStore(cassette), latency=mode)
+        start = time.perf_counter()
+        await replayer.classify_intent(make_burst("x"))
+        assert low <= time.perf_counter() - start < high, mode
+
+
+@pytest.mark.asyncio
+async def test_recording_tolerates_non_json_results(cassette):
+    store = CassetteStore(cassette)
+    recorder = RecordingProvider(SlowProvider(), store)
+    intents = await recorder.classify_intent(make_burst("buy milk"))
+    ack = await recorder.generate_acknowledgement(intents, [{"at": datetime.now(UTC)}])
+
+    assert ack == "Added 1"
+    assert len(store) == 2
+
+
+def test_build_provider_from_settings(cassette, monkeypatch):
+    from concierge.config import settings
+    from concierge.main import _build_provider
+
+    monkeypatch.setattr(settings, "llm_provider", "replay")
+    monkeypatch.setattr(settings, "llm_cassette", cassette)
+    with pytest.raises(FileNotFoundError):
+        _build_provider()
+
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "llm_record", True)
+    monkeypatch.setattr(settings, "llm_concurrency_max", 0)
+    assert isinstance(_build_provider(), RecordingProvider)
+
+    monkeypatch.setattr(settings, "llm_provider", "replay")
+    assert isinstance(_build_provider(), ReplayProvider)
+
+    # The concurrency limit wraps the recorder, so queueing isn't recorded
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "llm_concurrency_max", 4)
+    assert isinstance(_build_provider()._inner, RecordingProvider)
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+from concierge.events import EventHub
+from concierge.task_cache import TaskCache
+
+
+@pytest.mark.asyncio
+async def test_publish_serializes_once_for_all_subscribers():
+    hub = EventHub(buffer_size=8)
+    a = hub.subscribe()
+    b = hub.subscribe()
+
+    hub.publish("task_changes", {"revision": 1})
+    ev_a = await a.get()
+    ev_b = await b.get()
+    assert ev_a is ev_b
+    assert json.loads(ev_a.frame) == {"type": "task_changes", "data": {"revision": 1}}
+    assert ev_a.sse.startswith(b"event: task_changes\ndata: ")
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_gets_resync_without_blocking_others():
+    hub = EventHub(buffer_size=3)
+    slow = hub.subscribe()
+    fast = hub.subscribe()
+
+    for i in range(5):
+        hub.publish("task_changes", {"revision": i})
+        assert json.loads((await fast.get()).frame)["data"]["revision"] == i
+
+    events = [await slow.get()]
+    while slow._queue:
+        events.append(await slow.get())
+    assert events[0].type == "resync"
+    assert slow.overflows == 1
+
+
+@pytest.mark.asyncio
+async def test_unsubscribed_clients_stop_receiving():
+    hub = EventHub()
+    with hub.subscribe():
+        assert hub.subscriber_count == 1
+    assert hub.subscriber_count == 0
+    assert hub.publish("task_changes", {}) is None
+
+
+@pytest.mark.asyncio
+async def test_task_cache_publishes_deltas():
+    class Client:
+        tasks = [{"id": "abc123", "heading": "Buy milk", "todo": "TODO"}]
+
+        async def list_tasks(self, **kwargs):
+            return [dict(t) for t in self.tasks]
+
+    hub = EventHub()
+    client = Client()
+    cache = TaskCache(client, ttl=30, hub=hub)
+    await cache.get()
+
+    sub = hub.subscribe()
+    client.tasks = [{"id": "abc123", "heading": "Buy milk", "todo": "DONE"}]
+    await cache.refresh()
+
+    event = await asyncio.wait_for(sub.get(), timeout=1)
+    data = json.loads(event.frame)["data"]
+    assert data["revision"] == cache.revision
+    assert data["updated"] == [{
+        "id": "abc123", "heading": "Buy milk", "todo": "DONE",
+        "priority": None, "tags": [], "deadline": None, "scheduled": None,
+    }]
@@ -0,0 +1,41 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from concierge.llm.base import LLMProvider
+from concierge.llm.fake_provider import FakeProvider
+from concierge.models import Burst, IntentType, Message
+
+
+def make_burst(*texts):
+    now = datetime.now(UTC)
+    return Burst(messages=[Message(text=t) for t in texts], started_at=now, ended_at=now)
+
+
+@pytest.mark.asyncio
+async def test_default_script_classifies_each_message():
+    provider = FakeProvider(latency="fixed:0")
+    assert isinstance(provider, LLMProvider)
+
+    intents = await provider.classify_intent(
+        make_burst("buy milk tomorrow", "what's on my list", "done: call dentist")
+    )
+
+    assert [i.intent for i in intents] == [
+        IntentType.NEW_TASK, IntentType.STATUS_QUERY, IntentType.MODIFY_TASK,
+    ]
+    assert intents[0].heading == "buy milk tomorrow"
+    assert (intents[2].heading, intents[2].state) == ("call dentist", "DONE")
+
+
+@pytest.mark.asyncio
+async def test_custom_script_and_acknowledgement():
+    script = [{"match": r"^p(\w) (.+)", "intent": {"intent": "priority_change",
+                                                   "priority": r"\1", "heading": r"\2"}}]
+    provider = FakeProvider(latency="fixed:0", script=script)
+
+    (intent,) = await provider.classify_intent(make_burst("pA file taxes", "unmatched"))
+    assert (intent.priority, intent.heading) == ("A", "file taxes")
+
+    ack = await provider.generate_acknowledgement([intent], [{"error": "no match"}])
+    assert ack == "Done: 0/1 action(s) (priority_change)"
@@ -0,0 +1,90 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from concierge import fake_spacecadet
+from concierge.fake_spacecadet import (
+    FakeSpacecadetClient,
+    FaultInjector,
+    TaskStore,
+    generate_tasks,
+    parse_latency,
+)
+from concierge.spacecadet_client import SpacecadetClient
+
+
+def test_generated_dataset_is_deterministic():
+    tasks = generate_tasks(1000, seed=7)
+    assert tasks == generate_tasks(1000, seed=7)
+    assert len({t["id"] for t in tasks}) == 1000
+    assert {t["todo"] for t in tasks} <= set(fake_spacecadet.STATES)
+
+
+def test_parse_latency():
+    import random
+
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.25")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("lognormal:-3,0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("zipf:1")
+
+
+@pytest.mark.asyncio
+async def test_in_process_client_round_trip():
+    client = FakeSpacecadetClient(TaskStore(generate_tasks(20)))
+    await client.connect()
+
+    added = await client.add_task(heading="Buy milk", priority="B")
+    assert added["status"] == "ok"
+    assert await client.update_task(id=added["id"], new_state="DONE") == {"status": "ok", "id": added["id"]}
+    assert (await client.get_task(id=added["id"]))["todo"] == "DONE"
+    assert len(await client.list_tasks()) == 21
+
+    await client.delete_task(id=added["id"])
+    assert "error" in await client.get_task(id=added["id"])
+
+
+@pytest.mark.asyncio
+async def test_error_injection():
+    client = FakeSpacecadetClient(TaskStore(generate_tasks(5)), FaultInjector(error_rate=1.0))
+    result = await client.list_tasks()
+    assert result == {"error": "Injected failure in list_tasks"}
+
+
+@pytest.mark.asyncio
+async def test_hang_injection():
+    client = FakeSpacecadetClient(TaskStore(), FaultInjector(hang_rate=1.0))
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(client.list_tasks(), timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_store_persists_writes(tmp_path):
+    path = tmp_path / "tasks.json"
+    client = FakeSpacecadetClient(TaskStore(generate_tasks(3), path=str(path)))
+    await client.update_task(id="fake-000001", state="WAITING")
+
+    reloaded = TaskStore(path=str(path))
+    assert reloaded.get_task("fake-000001")["todo"] == "WAITING"
+    assert len(json.loads(path.read_text())) == 3
+
+
+@pytest.mark.asyncio
+async def test_stdio_server_with_real_client():
+    server = Path(fake_spacecadet.__file__)
+    client = SpacecadetClient(str(server), ["--tasks", "200", "--latency", "fixed:0.001"])
+    await asyncio.wait_for(client.connect(), timeout=30)
+    try:
+        assert len(await client.list_tasks()) == 200
+        assert len(await client.list_tasks(state="TODO")) < 200
+        assert await client.update_task(id="fake-000000", new_state="DONE") == {
+            "status": "ok", "id": "fake-000000",
+        }
+        assert (await client.get_task(id="fake-000000"))["todo"] == "DONE"
+        assert "error" in await client.get_task(id="missing")
+    finally:
+        await client.close()
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import time
+from datetime import UTC, datetime
+
+from concierge.inbox import Inbox
+import pytest
+
+from concierge.journal import IntentJournal, JournalApplier, JournalConflict
+from concierge.models import Burst, IntentClassification, IntentType, Message
+from concierge.reconciler import Reconciler
+from concierge.sessions import SessionRegistry
+
+
+class FlakySpacecadet:
+    def __init__(self):
+        self.tasks = [{"id": "t1", "heading": "Buy milk", "todo": "TODO"}]
+        self.up = asyncio.Event()
+        self.calls = []
+        self.lose_reply = 0
+        self.fail_list = 0
+
+    async def wait_connected(self):
+        await self.up.wait()
+
+    async def list_tasks(self, **kwargs):
+        if self.fail_list:
+            self.fail_list -= 1
+            raise ConnectionError("spacecadet restarting")
+        return list(self.tasks)
+
+    async def add_task(self, **kwargs):
+        self.calls.append(("add_task", kwargs))
+        task = {"id": f"t{len(self.tasks) + 1}", "heading": kwargs["heading"], "todo": "TODO"}
+        self.tasks.append(task)
+        if self.lose_reply:
+            # The task was created but the caller never hears back
+            self.lose_reply -= 1
+            raise ConnectionError("session died")
+        return task
+
+    async def update_task(self, **kwargs):
+        self.calls.append(("update_task", kwargs))
+        return {"status": "ok"}
+
+
+class FakeOutbox:
+    def __init__(self):
+        self.frames = []
+
+    def put(self, msg):
+        self.frames.append(msg)
+
+
+def burst(*ids):
+    now = datetime.now(UTC)
+    return Burst(messages=[Message(id=i, text=i) for i in ids], started_at=now, ended_at=now)
+
+
+def make_applier(tmp_path, sc, **kwargs):
+    sessions = SessionRegistry(inbox=Inbox(str(tmp_path / "inbox")))
+    session = sessions.open("alice")
+    session.outbox = FakeOutbox()
+    journal = IntentJournal(str(tmp_path / "intents.sqlite"))
+    applier = JournalApplier(journal, Reconciler(sc), sc, sessions, poll=0.01, **kwargs)
+    return applier, journal, session
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_journal_keys_are_idempotent_and_durable(tmp_path):
+    path = str(tmp_path / "intents.sqlite")
+    sessions = SessionRegistry(inbox=Inbox(str(tmp_path / "inbox")))
+    session = sessions.open("alice")
+    intent = IntentClassification(intent=IntentType.NEW_TASK, heading="Call mum")
+
+    journal = IntentJournal(path)
+    first = journal.append("m1#0", session, intent)
+    assert journal.append("m1#0", session, intent) == first
+    other = IntentClassification(intent=IntentType.NEW_TASK, heading="Call dad")
+    with pytest.raises(JournalConflict):
+        journal.append("m1#0", session, other)
+    journal.close()
+
+    journal = IntentJournal(path)
+    [entry] = journal.pending()
+    assert entry["id"] == first
+    assert IntentClassification.model_validate_json(entry["intent"]) == intent
+    journal.close()
+
+
+def test_settled_entries_are_pruned(tmp_path):
+    sessions = SessionRegistry(inbox=Inbox(str(tmp_path / "inbox")))
+    session = sessions.open("alice")
+    journal = IntentJournal(str(tmp_path / "intents.sqlite"))
+    intent = IntentClassification(intent=IntentType.NEW_TASK, heading="Call mum")
+    applied = journal.append("m1#0", session, intent)
+    failed = journal.append("m2#0", session, intent)
+    journal.append("m3#0", session, intent)
+    journal.mark_applied(applied, {"id": "t2"})
+    journal.mark_failed(failed, "rejected")
+
+    assert journal.prune(0) == 0
+    assert journal.prune(time.time() + 1) == 2
+    assert journal.counts() == {"pending": 1}
+    journal.close()
+
+
+async def test_same_message_ids_from_different_users_are_separate(tmp_path):
+    sc = FlakySpacecadet()
+    applier, journal, alice = make_applier(tmp_path, sc)
+    bob = applier._sessions.open("bob")
+    shared = burst("m1")
+    first = await applier.submit([IntentClassification(intent=IntentType.NEW_TASK, heading="Call mum")], alice, shared)
+    second = await applier.submit([IntentClassification(intent=IntentType.NEW_TASK, heading="Call dad")], bob, shared)
+    assert first[0]["journal_id"] != second[0]["journal_id"]
+
+    # The same user resubmitting the burst with a different intent is a conflict
+    again = await applier.submit([IntentClassification(intent=IntentType.NEW_TASK, heading="Walk")], alice, shared)
+    assert "already used" in again[0]["error"]
+    assert journal.counts() == {"pending": 2}
+    await applier.stop()
+
+
+async def test_intents_from_an_outage_apply_once_spacecadet_returns(tmp_path):
+    sc = FlakySpacecadet()
+    applier, journal, session = make_applier(tmp_path, sc)
+    applier.start()
+    try:
+        intents = [
+            IntentClassification(intent=IntentType.NEW_TASK, heading="Call mum"),
+            IntentClassification(intent=IntentType.CHAT, note="hi"),
+        ]
+        results = await asyncio.wait_for(applier.submit(intents, session, burst("m1")), 1)
+        assert results[0]["status"] == "accepted"
+        assert results[1] == {"chat": "hi"}
+        await asyncio.sleep(0.05)
+        assert sc.calls == []
+
+        sc.up.set()
+        await wait_for(lambda: journal.counts().get("applied") == 1)
+        assert sc.calls == [("add_task", {"heading": "Call mum"})]
+    finally:
+        await applier.stop()
+
+
+async def test_lost_reply_is_not_applied_twice(tmp_path):
+    sc = FlakySpacecadet()
+    sc.up.set()
+    sc.lose_reply = 1
+    applier, journal, session = make_applier(tmp_path, sc)
+    applier.start()
+    try:
+        intent = IntentClassification(intent=IntentType.NEW_TASK, heading="Call mum")
+        await applier.submit([intent], session, burst("m1"))
+        await wait_for(lambda: journal.counts().get("applied") == 1, timeout=5)
+        assert [t["heading"] for t in sc.tasks].count("Call mum") == 1
+        assert len(sc.calls) == 1
+    finally:
+        await applier.stop()
+
+
+async def test_failed_apply_sends_a_correction(tmp_path):
+    sc = FlakySpacecadet()
+    sc.up.set()
+    applier, journal, session = make_applier(tmp_path, sc)
+    applier.start()
+    try:
+        intent = IntentClassification(intent=IntentType.CANCEL_TASK, heading="walk the dog")
+        await applier.submit([intent], session, burst("m1"))
+        await wait_for(lambda: session.outbox.frames)
+        [frame] = session.outbox.frames
+        assert frame.type == "correction"
+        assert "cancel 'walk the dog'" in frame.data["text"]
+        assert "No task found" in frame.data["error"]
+        assert journal.counts() == {"failed": 1}
+    finally:
+        await applier.stop()
+
+
+async def test_correction_follows_the_user_not_a_stale_session_id(tmp_path):
+    sc = FlakySpacecadet()
+    applier, journal, alice = make_applier(tmp_path, sc)
+    bob = applier._sessions.open("bob")
+    bob.outbox = FakeOutbox()
+    intent = IntentClassification(intent=IntentType.CANCEL_TASK, heading="walk the dog")
+    entry_id = journal.append("m1#0", alice, intent)
+    # Journaled by an earlier process with this one's pid, under a session id that is now bob's
+    journal._execute(
+        "UPDATE intents SET worker = ?, session = ? WHERE id = ?", (os.getpid(), bob.id, entry_id)
+    )
+    journal.mark_failed(entry_id, "No task found")
+
+    await applier._deliver_corrections()
+    assert bob.outbox.frames == []
+    [frame] = alice.outbox.frames
+    assert frame.type == "correction"
+    await applier.stop()
+
+
+async def test_add_baseline_ignores_a_stale_cache(tmp_path):
+    class StaleCache:
+        async def get(self):
+            return []
+
+        def request_refresh(self):
+            pass
+
+    sc = FlakySpacecadet()
+    sc.up.set()
+    sc.tasks.append({"id": "t2", "heading": "Call mum", "todo": "TODO"})
+    sc.lose_reply = 1
+    applier, journal, session = make_applier(tmp_path, sc, task_cache=StaleCache())
+    applier.start()
+    try:
+        intent = IntentClassification(intent=IntentType.NEW_TASK, heading="Call mum")
+        [result] = await applier.submit([intent], session, burst("m1"))
+        await wait_for(lambda: journal.counts().get("applied") == 1, timeout=5)
+        row = journal._execute("SELECT result FROM intents WHERE id = ?", (result["journal_id"],)).fetchone()
+        # The task the lost reply created, not the one that was already there
+        assert json.loads(row["result"]) == {"id": "t3", "deduplicated": True}
+    finally:
+        await applier.stop()
+
+
+async def test_add_is_sent_when_the_first_baseline_read_fails(tmp_path):
+    sc = FlakySpacecadet()
+    sc.up.set()
+    sc.fail_list = 1
+    applier, journal, session = make_applier(tmp_path, sc)
+    applier.start()
+    try:
+        intent = IntentClassification(intent=IntentType.NEW_TASK, heading="Buy milk")
+        await applier.submit([intent], session, burst("m1"))
+        await wait_for(lambda: journal.counts().get("applied") == 1, timeout=5)
+        # t1 already had this heading; it must not be taken for the new task
+        assert sc.calls == [("add_task", {"heading": "Buy milk"})]
+        assert [t["heading"] for t in sc.tasks].count("Buy milk") == 2
+    finally:
+        await applier.stop()
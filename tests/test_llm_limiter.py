@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from concierge.llm.limiter import (
+    AdaptiveLimiter,
+    LimitedProvider,
+    caller,
+    is_overloaded,
+    record_usage,
+)
+from concierge.metrics import REGISTRY
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def _limiter(**kwargs) -> AdaptiveLimiter:
+    options = {"initial": 4, "minimum": 1, "maximum": 8, "tolerance": 2.0}
+    options.update(kwargs)
+    return AdaptiveLimiter("test", **options)
+
+
+async def test_queued_calls_rotate_between_callers():
+    limiter = _limiter(initial=1, maximum=1)
+    order = []
+    release = asyncio.Event()
+
+    async def call(user, name):
+        caller.set(user)
+
+        async def fn():
+            order.append(name)
+            await release.wait()
+
+        await limiter.run("classify", fn)
+
+    tasks = []
+    for user, name in (("alice", "a1"), ("alice", "a2"), ("alice", "a3"), ("bob", "b1")):
+        tasks.append(asyncio.create_task(call(user, name)))
+        await asyncio.sleep(0)
+
+    assert limiter.in_flight == 1 and limiter.queued == 3
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["a1", "a2", "b1", "a3"]
+    assert limiter.in_flight == 0 and limiter.queued == 0
+
+
+async def test_rate_limit_halves_the_limit_once_per_round():
+    limiter = _limiter(initial=8)
+    gate = asyncio.Event()
+
+    async def rejected():
+        await gate.wait()
+        raise RateLimited("slow down")
+
+    tasks = [asyncio.create_task(limiter.run("classify", rejected)) for _ in range(4)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(r, RateLimited) for r in results)
+    # All four were already in flight when the first 429 came back
+    assert limiter.capacity == 4
+
+    with pytest.raises(RateLimited):
+        await limiter.run("classify", rejected)
+    assert limiter.capacity == 2
+
+
+def test_limit_grows_while_saturated_and_shrinks_on_slow_calls():
+    limiter = _limiter(initial=2, maximum=4)
+    limiter._in_flight = 2
+    for _ in range(4):
+        limiter._completed("classify", 0.5, time.monotonic())
+    # Grows by 1/limit per call, and only while every slot is taken
+    assert limiter.capacity == 3
+    limiter._in_flight = 0
+    limiter._completed("classify", 0.5, time.monotonic())
+    assert limiter.capacity == 3
+
+    before = time.monotonic()
+    limiter._completed("classify", 1.5, time.monotonic())
+    assert limiter.capacity == 2
+    # Already in flight at the decrease: doesn't count again
+    limiter._completed("classify", 5.0, before)
+    assert limiter.capacity == 2
+    # Another kind of call has its own baseline
+    limiter._completed("acknowledge", 1.5, time.monotonic())
+    assert limiter.capacity == 2 and limiter.baselines["acknowledge"] == 1.5
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = _limiter(initial=1, maximum=1)
+    release = asyncio.Event()
+    first = asyncio.create_task(limiter.run("classify", release.wait))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(limiter.run("classify", release.wait))
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+
+    second.cancel()
+    await asyncio.sleep(0)
+    assert limiter.queued == 0
+    release.set()
+    await first
+    assert limiter.in_flight == 0
+
+
+async def test_provider_calls_count_tokens():
+    class Provider:
+        async def classify_intent(self, burst):
+            record_usage(120, 30)
+            return []
+
+        async def generate_acknowledgement(self, intents, results):
+            record_usage(40, None)
+            return "Done"
+
+    provider = LimitedProvider(Provider(), AdaptiveLimiter("tokens", initial=2))
+    assert await provider.classify_intent(None) == []
+    assert await provider.generate_acknowledgement([], []) == "Done"
+
+    tokens = REGISTRY.snapshot()
+    assert tokens['llm_tokens_total{call="classify",kind="input",provider="tokens"}'] == 120
+    assert tokens['llm_tokens_total{call="classify",kind="output",provider="tokens"}'] == 30
+    assert tokens['llm_tokens_total{call="acknowledge",kind="input",provider="tokens"}'] == 40
+    # Outside a limited call there is nothing to charge the tokens to
+    record_usage(1, 1)
+
+
+def test_overload_detection():
+    request = httpx.Request("POST", "http://llm/chat")
+    for status, expected in ((429, True), (529, True), (500, False)):
+        error = httpx.HTTPStatusError(
+            "error", request=request, response=httpx.Response(status, request=request)
+        )
+        assert is_overloaded(error) is expected
+    assert is_overloaded(RateLimited())
+    assert not is_overloaded(ValueError())
+
+
+async def test_warm_up_is_forwarded_only_when_the_provider_has_one():
+    class Cold:
+        pass
+
+    class Warm:
+        warmed = False
+
+        async def warm_up(self):
+            self.warmed = True
+
+    assert not hasattr(LimitedProvider(Cold(), _limiter()), "warm_up")
+    inner = Warm()
+    await LimitedProvider(inner, _limiter()).warm_up()
+    assert inner.warmed
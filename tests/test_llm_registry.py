@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+from concierge.llm import PROVIDERS, provider_class
+
+
+def _loaded_after(code: str) -> set[str]:
+    out = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return set(out.split())
+
+
+def test_importing_main_loads_no_provider_sdk():
+    loaded = _loaded_after("import concierge.main")
+    assert not {"anthropic", "mcp", "concierge.llm.anthropic_provider"} & loaded
+    assert not any(f"concierge.llm.{p}_provider" in loaded for p in PROVIDERS)
+
+
+def test_registry_imports_only_the_selected_provider():
+    loaded = _loaded_after("from concierge.llm import provider_class; provider_class('openai')()")
+    assert "concierge.llm.openai_provider" in loaded
+    assert "concierge.llm.anthropic_provider" not in loaded
+    assert "anthropic" not in loaded
+
+
+def test_unknown_provider():
+    with pytest.raises(ValueError):
+        provider_class("nope")
+
+
+def test_sdk_client_built_on_first_use():
+    cls = provider_class("anthropic")
+    provider = cls()
+    assert provider._sdk_client is None
+    assert provider._client is provider._client
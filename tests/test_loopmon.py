@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from concierge.loopmon import LAG_SECONDS, LoopMonitor, collapsed, sample_stacks
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_monitor_records_lag_and_logs_blocking_stack(caplog):
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    monitor.start()
+    before = LAG_SECONDS.count
+    try:
+        await asyncio.sleep(0.03)
+        with caplog.at_level(logging.WARNING, logger="concierge"):
+            block_the_loop(0.2)
+            await asyncio.sleep(0.03)
+    finally:
+        await monitor.stop()
+
+    assert LAG_SECONDS.count > before
+    assert LAG_SECONDS.quantile(1.0) >= 0.1
+    stalls = [r for r in caplog.records if "Event loop blocked" in r.getMessage()]
+    assert len(stalls) == 1
+    assert "block_the_loop" in stalls[0].getMessage()
+
+
+def test_sample_stacks_folds_a_busy_thread():
+    stop = threading.Event()
+    ident = []
+
+    def busy_worker():
+        ident.append(threading.get_ident())
+        while not stop.is_set():
+            sum(range(1000))
+
+    thread = threading.Thread(target=busy_worker)
+    thread.start()
+    try:
+        while not ident:
+            time.sleep(0.001)
+        counts = sample_stacks(ident[0], 0.1, interval=0.002)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert sum(counts.values()) > 10
+    stack, _ = counts.most_common(1)[0]
+    assert stack.split(";")[-1].startswith("busy_worker (")
+    line = collapsed(counts).splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
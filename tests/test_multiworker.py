@@ -0,0 +1,182 @@
+import asyncio
+import json
+
+import pytest
+
+from concierge.multiworker import (
+    SEQ_OFFSET,
+    U64,
+    RemoteError,
+    SnapshotReader,
+    SnapshotWriter,
+    WorkerClient,
+    acquire_owner,
+    follow_snapshot,
+)
+from concierge.task_cache import TaskCache
+from concierge.task_record import parse_tasks
+
+
+class OwnerSpacecadet:
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.calls = []
+
+    async def call_tool(self, name, args):
+        self.calls.append((name, args))
+        if name == "list_tasks":
+            return list(self.tasks)
+        if name == "explode":
+            raise RuntimeError("boom")
+        return {"status": "ok"}
+
+    async def list_tasks(self, **kwargs):
+        return await self.call_tool("list_tasks", kwargs)
+
+
+def test_only_one_owner_at_a_time(tmp_path):
+    owner = acquire_owner(tmp_path)
+    assert owner is not None
+    assert acquire_owner(tmp_path) is None
+    asyncio.run(owner.close())
+    second = acquire_owner(tmp_path)
+    assert second is not None
+    asyncio.run(second.close())
+
+
+def test_snapshot_grows_and_keeps_revisions_across_owners(tmp_path):
+    path = tmp_path / "tasks.snapshot"
+    reader = SnapshotReader(path)
+    assert reader.read() is None
+
+    writer = SnapshotWriter(path)
+    assert reader.read() is None
+    writer.publish(b"[1]")
+    assert reader.read() == (1, b"[1]")
+    assert writer.publish(b"[1]") == 1  # unchanged payloads are not republished
+
+    big = b"[" + b"0," * 100_000 + b"0]"
+    writer.publish(big)
+    assert reader.read() == (2, big)
+    writer.close()
+
+    # A new owner carries on from the same file and revision
+    writer = SnapshotWriter(path)
+    writer.publish(b"[]")
+    assert reader.read() == (3, b"[]")
+    writer.close()
+    reader.close()
+
+
+async def test_follower_reads_snapshot_and_forwards_calls(tmp_path):
+    tasks = [{"id": "t1", "heading": "Buy milk", "todo": "TODO"}]
+    sc = OwnerSpacecadet(tasks)
+    batches = []
+
+    async def write_batch(batch):
+        batches.append(batch)
+        return [(tool, kwargs, "rejected") for tool, kwargs in batch if tool == "delete_task"]
+
+    owner = acquire_owner(tmp_path)
+    owner_cache = TaskCache(sc, on_refresh=owner.publish_tasks)
+    await owner.serve(sc, write_batch)
+
+    follower = WorkerClient(tmp_path, timeout=2)
+    await follower.connect()
+    try:
+        # No snapshot published yet: the full list comes over RPC
+        assert await follower.list_tasks() == tasks
+        await owner_cache.refresh()
+        sc.calls.clear()
+        assert [t.id for t in parse_tasks(await follower.list_tasks())] == ["t1"]
+        assert sc.calls == []
+
+        # Caught mid-write: ask the owner rather than wait on the event loop
+        writer = owner.snapshot
+        U64.pack_into(writer._map, SEQ_OFFSET, writer._seq + 1)
+        assert follower._snapshot.read() is None
+        assert await follower.list_tasks() == tasks
+        assert sc.calls == [("list_tasks", {})]
+        U64.pack_into(writer._map, SEQ_OFFSET, writer._seq)
+        sc.calls.clear()
+
+        assert await follower.update_task(id="t1", new_state="DONE") == {"status": "ok"}
+        assert sc.calls == [("update_task", {"id": "t1", "new_state": "DONE"})]
+        with pytest.raises(RemoteError, match="boom"):
+            await follower.call_tool("explode", {})
+
+        failures = await follower.write_batch([("update_task", {"id": "t1"}), ("delete_task", {"id": "t2"})])
+        assert failures == [("delete_task", {"id": "t2"}, "rejected")]
+        assert batches == [[("update_task", {"id": "t1"}), ("delete_task", {"id": "t2"})]]
+    finally:
+        await follower.close()
+        await owner.close()
+
+
+async def test_follower_cache_tracks_snapshot_and_survives_owner_restart(tmp_path):
+    sc = OwnerSpacecadet([{"id": "t1", "heading": "Buy milk", "todo": "TODO"}])
+
+    async def write_batch(batch):
+        return []
+
+    owner = acquire_owner(tmp_path)
+    owner_cache = TaskCache(sc, on_refresh=owner.publish_tasks)
+    await owner.serve(sc, write_batch)
+    await owner_cache.refresh()
+
+    follower = WorkerClient(tmp_path, timeout=5)
+    await follower.connect()
+    cache = TaskCache(follower)
+    watcher = asyncio.create_task(follow_snapshot(follower, cache, interval=0.01))
+    try:
+        await cache.refresh()
+        assert [t.state for t in cache.tasks] == ["TODO"]
+
+        sc.tasks = [{"id": "t1", "heading": "Buy milk", "todo": "DONE"}]
+        await owner_cache.refresh()
+        for _ in range(100):
+            if cache.tasks[0].state == "DONE":
+                break
+            await asyncio.sleep(0.01)
+        assert cache.tasks[0].state == "DONE"
+
+        # The owner goes away and a new one takes over the directory
+        await owner.close()
+        await asyncio.sleep(0.05)
+        assert not follower.connected
+        owner = acquire_owner(tmp_path)
+        await owner.serve(sc, write_batch)
+        assert await follower.get_task(id="t1") == {"status": "ok"}
+        assert follower.reconnects == 1
+    finally:
+        watcher.cancel()
+        await follower.close()
+        await owner.close()
+
+
+async def test_caches_on_one_snapshot_never_share_revisions(tmp_path):
+    writer = SnapshotWriter(tmp_path / "tasks.snapshot")
+    writer.publish(json.dumps([{"id": "t1", "heading": "Buy milk", "todo": "TODO"}]).encode())
+    first, second = WorkerClient(tmp_path), WorkerClient(tmp_path)
+    a, b = TaskCache(first), TaskCache(second)
+    try:
+        await a.refresh()
+        await b.refresh()
+        # Same tasks, but a revision (or ETag) from one worker means nothing to the other
+        assert a.revision != b.revision
+        assert b.changes_since(a.revision) is None
+
+        # A local optimistic update on one worker can't be mistaken for the other's state
+        before = a.revision
+        a.update("t1", {"state": "DONE"})
+        assert a.changes_since(before)["updated"][0]["todo"] == "DONE"
+        assert b.changes_since(a.revision) is None
+
+        writer.publish(json.dumps([{"id": "t1", "heading": "Buy milk", "todo": "DONE"}]).encode())
+        before = b.revision
+        await b.refresh()
+        assert [t["id"] for t in b.changes_since(before)["updated"]] == ["t1"]
+    finally:
+        writer.close()
+        await first.close()
+        await second.close()
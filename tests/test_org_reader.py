@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from concierge import org_reader
+from concierge.org_reader import OrgReadClient, OrgTaskReader
+
+ORG = """\
+#+TITLE: Tasks
+
+* Projects
+** TODO [#A] File taxes :admin:finance:
+   DEADLINE: <2025-04-15 Tue>
+   :PROPERTIES:
+   :ID:       t-taxes
+   :END:
+   Gather receipts first.
+** NEXT Call dentist
+   SCHEDULED: <2025-01-10 Fri 09:00>
+   :PROPERTIES:
+   :ID:       t-dentist
+   :END:
+* DONE Buy milk :errand:
+  :PROPERTIES:
+  :ID:       t-milk
+  :END:
+* TODO Draft without an id
+* TODO Read the contract
+  :PROPERTIES:
+  :ID:       t-contract
+  :END:
+  The other side wants it back by
+  DEADLINE: <2025-02-01 Sat>
+* Notes without a keyword
+  :PROPERTIES:
+  :ID:       not-a-task
+  :END:
+"""
+
+
+@pytest.fixture
+def org_dir(tmp_path):
+    (tmp_path / "tasks.org").write_text(ORG)
+    (tmp_path / "empty.org").write_text("")
+    return tmp_path
+
+
+def test_parses_task_fields(org_dir):
+    tasks = OrgTaskReader(directory=str(org_dir)).list_tasks()
+    by_id = {t["id"]: t for t in tasks}
+
+    assert set(by_id) == {"t-taxes", "t-dentist", "t-milk", "t-contract"}
+    assert by_id["t-taxes"] == {
+        "id": "t-taxes",
+        "todo": "TODO",
+        "priority": "A",
+        "heading": "File taxes",
+        "tags": ["admin", "finance"],
+        "deadline": "2025-04-15",
+        "scheduled": None,
+    }
+    assert by_id["t-dentist"]["scheduled"] == "2025-01-10"
+    # Planning lines only count right after the headline, not in the body
+    assert by_id["t-contract"]["deadline"] is None
+    assert by_id["t-milk"]["todo"] == "DONE"
+    assert by_id["t-milk"]["tags"] == ["errand"]
+
+
+def test_only_changed_files_are_reparsed(org_dir, monkeypatch):
+    (org_dir / "other.org").write_text("* TODO Water plants\n  :PROPERTIES:\n  :ID: t-plants\n  :END:\n")
+    reader = OrgTaskReader(directory=str(org_dir))
+    reader.list_tasks()
+
+    parsed = []
+    real = org_reader._read_file
+    monkeypatch.setattr(org_reader, "_read_file", lambda p, k: parsed.append(p.name) or real(p, k))
+
+    reader.list_tasks()
+    assert parsed == []
+
+    path = org_dir / "other.org"
+    path.write_text("* DONE Water plants\n  :PROPERTIES:\n  :ID: t-plants\n  :END:\n")
+    os.utime(path, ns=(1, 1))
+    tasks = reader.list_tasks()
+    assert parsed == ["other.org"]
+    assert {t["id"]: t["todo"] for t in tasks}["t-plants"] == "DONE"
+
+
+@pytest.mark.asyncio
+async def test_client_reads_locally_and_writes_through_mcp(org_dir):
+    class Mcp:
+        calls = []
+
+        async def call_tool(self, name, args):
+            self.calls.append(name)
+            return {"status": "ok"}
+
+    mcp = Mcp()
+    client = OrgReadClient(mcp, OrgTaskReader(directory=str(org_dir)))
+
+    assert len(await client.list_tasks()) == 4
+    assert (await client.get_task(id="t-milk"))["heading"] == "Buy milk"
+    await client.update_task(id="t-milk", state="TODO")
+    await client.list_tasks(state="TODO")
+    assert mcp.calls == ["update_task", "list_tasks"]
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+from concierge.events import Event
+from concierge.models import MessageStatus, SystemStatus, ws_response, ws_status_update, ws_system_status
+from concierge.outbox import Outbox
+
+
+class SlowSocket:
+    def __init__(self):
+        self.sent = []
+        self.gate = asyncio.Event()
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        self.sent.append(text)
+
+
+def types(sent):
+    return [json.loads(s)["type"] for s in sent]
+
+
+@pytest.mark.asyncio
+async def test_put_does_not_wait_for_slow_socket():
+    sock = SlowSocket()
+    outbox = Outbox(sock.send_text, maxsize=10, policy="drop")
+    outbox.start()
+    outbox.put(ws_response("hi"))
+    outbox.put(ws_response("there"))
+    assert len(outbox) >= 1
+
+    sock.gate.set()
+    await asyncio.wait_for(outbox.join(), timeout=1)
+    assert len(sock.sent) == 2
+    await outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_superseded_status_frames_are_coalesced():
+    sock = SlowSocket()
+    outbox = Outbox(sock.send_text, maxsize=10, policy="drop")
+    outbox.put(ws_status_update("m1", MessageStatus.DELIVERED))
+    outbox.put(ws_system_status(SystemStatus.TYPING))
+    outbox.put(ws_status_update("m2", MessageStatus.DELIVERED))
+    outbox.put(ws_status_update("m1", MessageStatus.READ))
+    outbox.put(ws_system_status(SystemStatus.PROCESSING))
+    assert len(outbox) == 3
+
+    sock.gate.set()
+    outbox.start()
+    await asyncio.wait_for(outbox.join(), timeout=1)
+    assert sock.sent[0] == ws_status_update("m2", MessageStatus.DELIVERED).model_dump_json()
+    assert sock.sent[1:] == [
+        ws_status_update("m1", MessageStatus.READ).model_dump_json(),
+        ws_system_status(SystemStatus.PROCESSING).model_dump_json(),
+    ]
+    await outbox.close()
+
+
+def test_drop_policy_discards_oldest():
+    outbox = Outbox(SlowSocket().send_text, maxsize=2, policy="drop")
+    for text in ("a", "b", "c"):
+        outbox.put(ws_response(text))
+    assert len(outbox) == 2
+
+
+def test_merge_policy_folds_events_into_resync():
+    outbox = Outbox(SlowSocket().send_text, maxsize=3, policy="merge")
+    outbox.put(ws_response("keep me"))
+    outbox.put_event(Event("task_changes", {"revision": 1}))
+    outbox.put_event(Event("task_changes", {"revision": 2}))
+    outbox.put_event(Event("task_changes", {"revision": 3}))
+
+    frames = [e.text for e in outbox._entries if e.text is not None]
+    assert types(frames) == ["response", "resync", "task_changes"]
+
+
+def test_disconnect_policy_calls_back_once():
+    calls = []
+    outbox = Outbox(
+        SlowSocket().send_text, maxsize=1, policy="disconnect", on_overflow=lambda: calls.append(1)
+    )
+    for text in ("a", "b", "c"):
+        outbox.put(ws_response(text))
+    assert outbox.overflowed
+    assert calls == [1]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        Outbox(SlowSocket().send_text, policy="explode")
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_sends_one_frame_per_tick():
+    sock = SlowSocket()
+    sock.gate.set()
+    outbox = Outbox(sock.send_text, maxsize=10, policy="drop", batch=True)
+    outbox.start()
+    outbox.put(ws_status_update("m1", MessageStatus.READ))
+    outbox.put(ws_system_status(SystemStatus.TYPING))
+    outbox.put(ws_response("Added: buy milk"))
+    await asyncio.wait_for(outbox.join(), timeout=1)
+
+    assert len(sock.sent) == 1
+    batch = json.loads(sock.sent[0])
+    assert batch["type"] == "batch"
+    assert [f["type"] for f in batch["data"]["frames"]] == ["status_update", "system_status", "response"]
+    await outbox.close()
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from concierge.readiness import DEGRADED, FAILED, READY, SKIPPED, Readiness
+
+
+async def test_ready_once_required_components_settle():
+    readiness = Readiness()
+    readiness.add("spacecadet")
+    readiness.add("llm", required=False)
+    assert not readiness.ready
+
+    gate = asyncio.Event()
+
+    async def connect():
+        await gate.wait()
+
+    async def warm_up():
+        raise ConnectionError("llm down")
+
+    tasks = [
+        asyncio.create_task(readiness.run("spacecadet", connect)),
+        asyncio.create_task(readiness.run("llm", warm_up)),
+    ]
+    await asyncio.sleep(0)
+    assert readiness.components["llm"].state == DEGRADED
+    assert not readiness.ready
+
+    gate.set()
+    await asyncio.wait_for(readiness.wait(), 1)
+    await asyncio.gather(*tasks)
+    assert readiness.components["spacecadet"].state == READY
+    assert readiness.ready
+    snapshot = readiness.snapshot()
+    assert snapshot["components"]["llm"]["detail"] == "llm down"
+    assert set(readiness.timings) == {"spacecadet", "llm"}
+
+
+def test_timed_records_failure_and_reraises():
+    readiness = Readiness()
+    with pytest.raises(RuntimeError):
+        with readiness.timed("spacecadet"):
+            raise RuntimeError("no server")
+    assert readiness.components["spacecadet"].state == FAILED
+    assert not readiness.ready
+
+    readiness.skip("task_cache", "no spacecadet")
+    assert readiness.components["task_cache"].state == SKIPPED
@@ -63,6 +63,31 @@ async def test_cancel_task_by_heading():
     assert ("update_task", {"id": "abc123", "state": "CANCELLED"}) in client.calls
 
 
+@pytest.mark.asyncio
+async def test_heading_resolves_against_current_tasks():
+    client = FakeSpacecadetClient()
+    reconciler = Reconciler(client)
+    intent = IntentClassification(
+        intent=IntentType.CANCEL_TASK, heading="Buy milk", raw_text="cancel buy milk"
+    )
+
+    async def current(**kwargs):
+        return {"tasks": [{"id": "abc123", "heading": "Buy milk", "state": "TODO"},
+                          {"id": "def456", "heading": "Buy milk powder", "state": "TODO"}]}
+
+    client.list_tasks = current
+    result = (await reconciler.reconcile([intent]))[0]
+    assert "Multiple tasks match" in result["error"]
+    assert not any(name == "update_task" for name, _ in client.calls)
+
+    async def renamed(**kwargs):
+        return {"tasks": [{"id": "abc123", "heading": "Buy oat milk", "state": "TODO"}]}
+
+    client.list_tasks = renamed
+    result = (await reconciler.reconcile([intent]))[0]
+    assert result["error"] == "No task found matching 'Buy milk'"
+
+
 @pytest.mark.asyncio
 async def test_status_query():
     client = FakeSpacecadetClient()
@@ -0,0 +1,37 @@
+from datetime import UTC, datetime, timedelta
+
+from concierge.models import Message
+from concierge.replay import diff_classifications, group_bursts, replay
+
+T0 = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def at(seconds, text, id=None):
+    return Message(id=id or text.replace(" ", "-"), text=text, timestamp=T0 + timedelta(seconds=seconds))
+
+
+def test_group_bursts_uses_quiet_window_and_max_wait():
+    messages = [at(0, "a"), at(0.5, "b"), at(3, "c"), at(3.5, "d"), at(4, "e"), at(4.5, "f")]
+    bursts = group_bursts(messages, quiet_window=1.0, max_wait=1.2)
+    assert [[m.text for m in b] for b in bursts] == [["a", "b"], ["c", "d", "e"], ["f"]]
+
+
+def test_replay_reports_stages_and_diffs():
+    messages = [
+        at(0, "buy milk"), at(0.2, "call mom"),
+        at(10, "what's on my list"),
+        at(20, "hello"),
+    ]
+    records, report = replay(messages, quiet_window=1.0, max_wait=8.0, tasks=5)
+
+    assert report["bursts"] == 3 and report["messages"] == 4
+    assert report["intents"] == {"chat": 1, "new_task": 2, "status_query": 1}
+    assert report["latency_ms"]["classify"]["count"] == 3
+    assert records[0]["texts"] == ["buy milk", "call mom"]
+    assert records[0]["ack"]
+
+    edited = [dict(r) for r in records]
+    edited[2] = {**edited[2], "intents": [{"intent": "new_task", "heading": "hello"}]}
+    diff = diff_classifications(records, edited)
+    assert (diff["compared"], diff["changed"]) == (3, 1)
+    assert diff["examples"][0]["texts"] == ["hello"]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from concierge.sessions import SessionRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    from concierge.inbox import Inbox
+
+    return SessionRegistry(max_connections=3, max_bursts=1, inbox=Inbox(str(tmp_path)))
+
+
+def test_connection_cap(registry):
+    sessions = [registry.open("u") for _ in range(3)]
+    assert registry.open("u") is None
+    registry.close(sessions[0])
+    assert registry.open("u") is not None
+
+
+@pytest.mark.asyncio
+async def test_queued_bursts_rotate_between_users(registry):
+    alice, bob = registry.open("alice"), registry.open("bob")
+    order = []
+    release = asyncio.Event()
+
+    async def burst(session, name):
+        async with registry.burst_slot(session):
+            order.append(name)
+            await release.wait()
+
+    tasks = [asyncio.create_task(burst(alice, "a1"))]
+    await asyncio.sleep(0)
+    for session, name in ((alice, "a2"), (alice, "a3"), (bob, "b1")):
+        tasks.append(asyncio.create_task(burst(session, name)))
+        await asyncio.sleep(0)
+
+    assert registry.in_flight == 1 and registry.queued == 3
+    assert registry.snapshot()["sessions"][0]["stage"] == "queued"
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["a1", "a2", "b1", "a3"]
+    assert registry.in_flight == 0 and registry.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue(registry):
+    alice, bob = registry.open("alice"), registry.open("bob")
+    hold = asyncio.Event()
+
+    async def burst(session):
+        async with registry.burst_slot(session):
+            await hold.wait()
+
+    running = asyncio.create_task(burst(alice))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(burst(bob))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert registry.queued == 0
+
+    hold.set()
+    await running
+    assert registry.in_flight == 0
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from concierge.spacecadet_pool import SpacecadetPool
+
+
+class FakeClient:
+    instances = []
+
+    def __init__(self, write_delay=0.0, fail_connect=False):
+        self.calls = []
+        self.write_delay = write_delay
+        self.fail_connect = fail_connect
+        self.pings = 0
+        FakeClient.instances.append(self)
+
+    async def connect(self):
+        if self.fail_connect:
+            raise RuntimeError("spawn failed")
+
+    async def close(self):
+        pass
+
+    async def ping(self):
+        self.pings += 1
+
+    async def call_tool(self, name, args):
+        self.calls.append(name)
+        if name != "list_tasks":
+            await asyncio.sleep(self.write_delay)
+        return {"status": "ok"}
+
+
+@pytest.fixture(autouse=True)
+def reset_instances():
+    FakeClient.instances = []
+
+
+@pytest.mark.asyncio
+async def test_reads_spread_and_writes_go_to_writer():
+    pool = SpacecadetPool(size=3, client_factory=FakeClient, health_interval=0)
+    await pool.connect()
+    writer, r1, r2 = FakeClient.instances
+
+    await asyncio.gather(*(pool.list_tasks() for _ in range(4)))
+    await pool.add_task(heading="Buy milk")
+
+    assert writer.calls == ["add_task"]
+    assert len(r1.calls) + len(r2.calls) == 4
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_do_not_queue_behind_slow_writes():
+    pool = SpacecadetPool(
+        size=2, client_factory=lambda: FakeClient(write_delay=0.5), health_interval=0
+    )
+    await pool.connect()
+
+    write = asyncio.create_task(pool.update_task(id="abc123", state="DONE"))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(pool.list_tasks(), timeout=0.1)
+    assert pool.stats()[0]["in_flight"] == 1
+    await write
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_single_session_serves_reads_and_writes():
+    pool = SpacecadetPool(size=1, client_factory=FakeClient, health_interval=0)
+    await pool.connect()
+    await pool.list_tasks()
+    await pool.add_task(heading="x")
+    assert FakeClient.instances[0].calls == ["list_tasks", "add_task"]
+    assert pool.stats()[0]["calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_survives_partial_connect_failure():
+    flags = iter([True, False])
+    pool = SpacecadetPool(
+        size=2, client_factory=lambda: FakeClient(fail_connect=next(flags)), health_interval=0
+    )
+    await pool.connect()
+    assert [s["name"] for s in pool.stats()] == ["writer"]
+
+
+@pytest.mark.asyncio
+async def test_health_check_marks_unhealthy_sessions():
+    pool = SpacecadetPool(size=2, client_factory=FakeClient, health_interval=0.02)
+    await pool.connect()
+    reader = FakeClient.instances[1]
+
+    async def broken_ping():
+        raise RuntimeError("pipe closed")
+
+    reader.ping = broken_ping
+    await asyncio.sleep(0.05)
+    assert [s["healthy"] for s in pool.stats()] == [True, False]
+    await pool.close()
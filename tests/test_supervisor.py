@@ -0,0 +1,141 @@
+import asyncio
+
+import anyio
+import pytest
+
+from concierge.supervisor import SpacecadetUnavailable, SupervisedClient
+
+
+class FakeClient:
+    spawned = []
+    connect_failures = 0
+
+    def __init__(self):
+        self.alive = True
+        self.hang = False
+        self.crash_on = set()
+        self.calls = []
+        FakeClient.spawned.append(self)
+
+    async def connect(self):
+        if FakeClient.connect_failures:
+            FakeClient.connect_failures -= 1
+            raise FileNotFoundError("python3: server.py not found")
+
+    async def close(self, timeout=5.0):
+        self.alive = False
+
+    async def ping(self):
+        if self.hang:
+            await asyncio.sleep(10)
+
+    async def call_tool(self, name, args):
+        if self.hang:
+            await asyncio.sleep(10)
+        if name in self.crash_on:
+            self.alive = False
+            raise anyio.ClosedResourceError()
+        self.calls.append(name)
+        return {"status": "ok"}
+
+
+@pytest.fixture(autouse=True)
+def reset_fakes():
+    FakeClient.spawned = []
+    FakeClient.connect_failures = 0
+
+
+def supervised(**kwargs):
+    kwargs.setdefault("call_timeout", 0.1)
+    kwargs.setdefault("standby", False)
+    kwargs.setdefault("backoff_max", 0.05)
+    return SupervisedClient(client_factory=FakeClient, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_hung_call_times_out_and_respawns():
+    sc = supervised()
+    await sc.connect()
+    FakeClient.spawned[0].hang = True
+
+    with pytest.raises(SpacecadetUnavailable):
+        await sc.call_tool("list_tasks", {})
+
+    await asyncio.wait_for(sc.wait_connected(), timeout=1)
+    assert await sc.call_tool("list_tasks", {}) == {"status": "ok"}
+    assert sc.restarts == 1
+    assert len(FakeClient.spawned) == 2
+    await sc.close()
+
+
+@pytest.mark.asyncio
+async def test_write_in_flight_is_replayed_after_crash():
+    sc = supervised()
+    await sc.connect()
+    FakeClient.spawned[0].crash_on = {"update_task"}
+
+    result = await sc.call_tool("update_task", {"id": "abc123", "state": "DONE"})
+    assert result == {"status": "ok"}
+    assert FakeClient.spawned[1].calls == ["update_task"]
+    await sc.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tool", ["add_task", "delete_task"])
+async def test_non_idempotent_writes_are_not_replayed_after_timeout(tool):
+    sc = supervised(write_retries=2)
+    await sc.connect()
+    FakeClient.spawned[0].hang = True
+
+    with pytest.raises(SpacecadetUnavailable):
+        await sc.call_tool(tool, {"id": "t1"})
+    await asyncio.wait_for(sc.wait_connected(), timeout=1)
+    assert all(c.calls == [] for c in FakeClient.spawned)
+
+    # Never sent: the stream was closed before the request went out
+    FakeClient.spawned[1].crash_on = {tool}
+    assert await sc.call_tool(tool, {"id": "t1"}) == {"status": "ok"}
+    assert FakeClient.spawned[2].calls == [tool]
+    await sc.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_are_not_replayed():
+    sc = supervised()
+    await sc.connect()
+    FakeClient.spawned[0].crash_on = {"list_tasks"}
+
+    with pytest.raises(SpacecadetUnavailable):
+        await sc.call_tool("list_tasks", {})
+    await sc.close()
+
+
+@pytest.mark.asyncio
+async def test_startup_failure_retries_in_background():
+    FakeClient.connect_failures = 2
+    sc = supervised()
+    await sc.connect()
+    assert not sc.connected
+
+    await asyncio.wait_for(sc.wait_connected(), timeout=1)
+    assert sc.connected
+    await sc.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_standby_is_promoted():
+    sc = supervised(standby=True)
+    await sc.connect()
+    await asyncio.sleep(0.01)
+    primary, standby = FakeClient.spawned
+    primary.hang = True
+
+    with pytest.raises(SpacecadetUnavailable):
+        await sc.ping()
+    await asyncio.wait_for(sc.wait_connected(), timeout=1)
+
+    assert sc._client is standby
+    await asyncio.sleep(0.01)
+    # A replacement standby is warmed up behind it
+    assert len(FakeClient.spawned) == 3
+    await sc.close()
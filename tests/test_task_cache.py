@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from concierge.task_cache import OrgWatcher, TaskCache
+
+
+class SlowListClient:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.tasks = [{"id": "abc123", "heading": "Buy milk", "todo": "TODO"}]
+
+    async def list_tasks(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [dict(t) for t in self.tasks]
+
+
+@pytest.mark.asyncio
+async def test_first_read_waits_for_snapshot():
+    client = SlowListClient()
+    cache = TaskCache(client, ttl=30)
+    tasks = await cache.get()
+    assert tasks[0].heading == "Buy milk"
+    assert client.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_read_returns_immediately_and_refreshes_in_background():
+    client = SlowListClient(delay=0.1)
+    cache = TaskCache(client, ttl=0)
+    await cache.get()
+
+    client.tasks.append({"id": "def456", "heading": "Call dentist", "todo": "TODO"})
+    tasks = await asyncio.wait_for(cache.get(), timeout=0.05)
+    assert len(tasks) == 1
+
+    await asyncio.sleep(0.15)
+    assert len(cache.tasks) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_are_single_flight():
+    client = SlowListClient()
+    cache = TaskCache(client, ttl=30)
+    await asyncio.gather(*(cache.get() for _ in range(10)))
+    assert client.calls == 1
+
+    # Triggers during an in-flight refresh coalesce into one follow-up
+    cache.request_refresh()
+    await asyncio.sleep(0.01)
+    for _ in range(5):
+        cache.request_refresh()
+    await cache.refresh()
+    assert client.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_snapshot():
+    client = SlowListClient(delay=0)
+    cache = TaskCache(client, ttl=0)
+    await cache.get()
+
+    async def fail(**kwargs):
+        return {"error": "emacs not responding"}
+
+    client.list_tasks = fail
+    await cache.refresh()
+    assert cache.tasks[0].id == "abc123"
+
+
+@pytest.mark.asyncio
+async def test_org_watcher_refreshes_on_file_change(tmp_path):
+    org = tmp_path / "tasks.org"
+    org.write_text("* TODO Buy milk\n")
+    client = SlowListClient(delay=0)
+    cache = TaskCache(client, ttl=30)
+    await cache.get()
+
+    watcher = OrgWatcher(cache, directory=str(tmp_path), interval=0.02)
+    watcher.start()
+    try:
+        await asyncio.sleep(0.05)
+        org.write_text("* TODO Buy milk\n* TODO Call dentist\n")
+        await asyncio.sleep(0.1)
+    finally:
+        await watcher.stop()
+    assert client.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_changes_since_reports_deltas():
+    client = SlowListClient(delay=0)
+    client.tasks.append({"id": "def456", "heading": "Call dentist", "todo": "TODO"})
+    cache = TaskCache(client, ttl=30)
+    await cache.get()
+    rev = cache.revision
+
+    assert cache.changes_since(rev)["added"] == []
+
+    client.tasks = [
+        {"id": "abc123", "heading": "Buy milk", "todo": "DONE"},
+        {"id": "ghi789", "heading": "File taxes", "todo": "TODO"},
+    ]
+    await cache.refresh()
+    assert cache.revision == rev + 1
+
+    changes = cache.changes_since(rev)
+    assert [t["id"] for t in changes["added"]] == ["ghi789"]
+    assert [t["todo"] for t in changes["updated"]] == ["DONE"]
+    assert changes["removed"] == ["def456"]
+
+    # Unchanged snapshot does not bump the revision
+    await cache.refresh()
+    assert cache.revision == rev + 1
+
+
+@pytest.mark.asyncio
+async def test_changes_since_requires_reset_outside_log():
+    client = SlowListClient(delay=0)
+    cache = TaskCache(client, ttl=30, changelog_size=2)
+    await cache.get()
+    rev = cache.revision
+
+    for i in range(3):
+        cache.update("abc123", {"todo": f"STATE{i}"})
+
+    assert cache.changes_since(rev) is None
+    assert cache.changes_since(rev + 99) is None
+    assert [t["todo"] for t in cache.changes_since(rev + 2)["updated"]] == ["STATE2"]
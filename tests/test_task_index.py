@@ -0,0 +1,80 @@
+import pytest
+
+from concierge.task_index import TaskIndex
+from concierge.task_record import Task
+
+TASKS = [
+    {"id": "t1", "heading": "Buy milk", "todo": "TODO", "priority": "B", "tags": ["errand"],
+     "deadline": "<2025-01-15 Wed>"},
+    {"id": "t2", "heading": "Call dentist", "todo": "NEXT", "priority": "A", "tags": ["health"]},
+    {"id": "t3", "heading": "File taxes", "todo": "TODO", "priority": "A", "tags": ["admin"],
+     "deadline": "<2025-04-15 Tue>"},
+    {"id": "t4", "heading": "Archive photos", "todo": "DONE", "tags": []},
+    {"id": "t5", "heading": "Renew passport", "todo": "TODO", "priority": "C", "tags": ["admin"],
+     "deadline": "<2025-02-01 Sat>"},
+]
+
+
+def ids(tasks):
+    return [t.id for t in tasks]
+
+
+@pytest.fixture
+def index():
+    return TaskIndex([Task.from_dict(t) for t in TASKS])
+
+
+def test_no_filters_returns_everything_in_file_order(index):
+    tasks, cursor, total = index.query()
+    assert ids(tasks) == ["t1", "t2", "t3", "t4", "t5"]
+    assert cursor is None
+    assert total == 5
+
+
+def test_filters_intersect(index):
+    tasks, _, total = index.query(state="TODO", priority="A")
+    assert ids(tasks) == ["t3"]
+    assert total == 1
+
+    tasks, _, _ = index.query(state="TODO,NEXT", tag="admin")
+    assert ids(tasks) == ["t3", "t5"]
+
+
+def test_deadline_range_is_inclusive(index):
+    tasks, _, _ = index.query(deadline_from="2025-01-15", deadline_to="2025-02-01", sort="deadline")
+    assert ids(tasks) == ["t1", "t5"]
+
+
+def test_sort_puts_missing_values_last(index):
+    tasks, _, _ = index.query(sort="priority")
+    assert ids(tasks) == ["t2", "t3", "t1", "t5", "t4"]
+
+    tasks, _, _ = index.query(sort="priority", descending=True)
+    assert ids(tasks) == ["t5", "t1", "t2", "t3", "t4"]
+
+
+def test_cursor_pagination_walks_all_results(index):
+    seen = []
+    cursor = None
+    while True:
+        tasks, cursor, total = index.query(sort="heading", cursor=cursor, limit=2)
+        seen.extend(ids(tasks))
+        if cursor is None:
+            break
+    assert total == 5
+    assert seen == ["t4", "t1", "t2", "t3", "t5"]
+
+
+def test_update_moves_task_between_indexes(index):
+    index.update("t1", {"state": "DONE"})
+    tasks, _, _ = index.query(state="DONE")
+    assert ids(tasks) == ["t1", "t4"]
+    tasks, _, _ = index.query(state="TODO")
+    assert ids(tasks) == ["t3", "t5"]
+
+
+def test_invalid_sort_and_cursor_raise(index):
+    with pytest.raises(ValueError):
+        index.query(sort="color")
+    with pytest.raises(ValueError):
+        index.query(cursor="not-a-cursor")
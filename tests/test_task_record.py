@@ -0,0 +1,51 @@
+import pytest
+
+from concierge.acknowledger import MAX_LISTED_TASKS, _format_task_list
+from concierge.task_record import Task, parse_tasks
+
+RAW = (
+    b'[{"id": "t1", "heading": "File taxes", "todo": "TODO", "priority": "A",'
+    b' "tags": ["admin"], "deadline": "2025-04-15", "level": 2},'
+    b' {"id": "t2", "heading": "Buy milk", "todo": "DONE"}]'
+)
+
+
+def test_round_trips_wire_format():
+    tasks = parse_tasks(RAW)
+    assert [t.id for t in tasks] == ["t1", "t2"]
+    assert tasks[0].state == "TODO" and tasks[0].tags == ("admin",)
+    assert tasks[0].to_dict() == {
+        "id": "t1", "heading": "File taxes", "todo": "TODO", "priority": "A",
+        "tags": ["admin"], "deadline": "2025-04-15", "scheduled": None, "level": 2,
+    }
+
+
+def test_accepts_wrapped_result_and_state_key():
+    tasks = parse_tasks({"tasks": [{"id": "t1", "heading": "Buy milk", "state": "NEXT"}]})
+    assert tasks[0].state == "NEXT"
+
+
+def test_repeated_values_are_shared():
+    a, b = parse_tasks(b'[{"id": "a", "todo": "TODO"}, {"id": "b", "todo": "TODO"}]')
+    assert a.state is b.state
+
+
+def test_update_rejects_unknown_fields_without_changing_anything():
+    task = Task("t1", "Buy milk")
+    with pytest.raises(KeyError):
+        task.update({"todo": "DONE", "colour": "red"})
+    assert task.state == "TODO"
+
+    task.update({"todo": "DONE", "tags": ["errand"]})
+    assert task.state == "DONE" and task.tags == ("errand",)
+
+
+def test_formatter_reads_the_todo_keyword():
+    text = _format_task_list([{"id": "t2", "heading": "Buy milk", "todo": "DONE", "priority": "B"}])
+    assert "DONE !! Buy milk" in text
+
+
+def test_formatter_caps_long_lists():
+    text = _format_task_list([{"id": f"t{i}", "heading": f"Task {i}"} for i in range(100)])
+    assert text.count("\n") == MAX_LISTED_TASKS + 1
+    assert text.endswith("… and 75 more")
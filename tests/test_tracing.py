@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+
+from concierge import tracing
+from concierge.burst import BurstDetector
+from concierge.config import settings
+from concierge.metrics import Registry
+from concierge.models import Message
+
+
+def test_span_without_trace_is_noop():
+    assert tracing.current() is None
+    with tracing.span("classify") as span:
+        span.set(intents=1)
+    assert span is tracing.NOOP
+
+
+def test_sampling_off_starts_no_trace(monkeypatch):
+    monkeypatch.setattr(settings, "trace_sample_rate", 0.0)
+    with tracing.trace("burst") as t:
+        assert tracing.current() is None
+        with tracing.span("classify"):
+            pass
+    assert t is tracing.NOOP
+
+
+@pytest.mark.asyncio
+async def test_spans_follow_the_task_and_write_jsonl(monkeypatch, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "trace_sample_rate", 1.0)
+    monkeypatch.setattr(settings, "trace_file", str(path))
+
+    async def call_tool():
+        with tracing.span("spacecadet.add_task"):
+            await asyncio.sleep(0)
+
+    with tracing.trace("burst", messages=2) as t:
+        with tracing.span("reconcile"):
+            await asyncio.create_task(call_tool())
+        tracing.annotate(session=7)
+    assert tracing.current() is None
+
+    record = json.loads(path.read_text().splitlines()[-1])
+    assert record["trace_id"] == t.id
+    assert record["attrs"] == {"messages": 2, "session": 7}
+    assert [s["name"] for s in record["spans"]] == ["reconcile", "spacecadet.add_task"]
+    assert all(s["duration"] >= 0 for s in record["spans"])
+    assert tracing.stage_histogram("spacecadet.add_task").count >= 1
+
+
+@pytest.mark.asyncio
+async def test_burst_trace_covers_quiet_window(monkeypatch):
+    monkeypatch.setattr(settings, "trace_sample_rate", 1.0)
+    traces = []
+
+    async def on_burst(burst):
+        traces.append(tracing.current())
+
+    detector = BurstDetector(on_burst=on_burst, quiet_window=0.02, max_wait=1.0)
+    detector.push(Message(text="hello"))
+    await asyncio.sleep(0.1)
+
+    (trace,) = traces
+    (quiet,) = trace.spans
+    assert quiet.name == "quiet_window"
+    assert quiet.end - quiet.start >= 0.02
+
+
+def test_prometheus_rendering():
+    registry = Registry()
+    registry.counter("frames_total", "Frames sent").inc(3)
+    h = registry.histogram("stage_seconds", "Stage time", labels={"stage": "classify"}, buckets=(0.1, 1.0))
+    h.observe(0.05)
+    h.observe(0.5)
+    registry.histogram("stage_seconds", labels={"stage": "reconcile"}, buckets=(0.1, 1.0)).observe(2.0)
+
+    lines = registry.render_prometheus().splitlines()
+    assert lines.count("# TYPE stage_seconds histogram") == 1
+    assert "frames_total 3" in lines
+    assert 'stage_seconds_bucket{stage="classify",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="classify",le="1.0"} 2' in lines
+    assert 'stage_seconds_bucket{stage="classify",le="+Inf"} 2' in lines
+    assert 'stage_seconds_count{stage="reconcile"} 1' in lines
+    assert 'stage_seconds_sum{stage="reconcile"} 2.0' in lines